@@ -0,0 +1,38 @@
+"""Question bank
+
+Revision ID: 4c1e8f2a9b37
+Revises: d24f0fbcc166
+Create Date: 2024-12-09 11:20:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e8f2a9b37'
+down_revision: Union[str, None] = 'd24f0fbcc166'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('question_bank',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('difficulty', sa.String(), nullable=False),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_question_bank_id'), 'question_bank', ['id'], unique=False)
+    op.create_index('ix_question_bank_job_id_difficulty', 'question_bank', ['job_id', 'difficulty'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_bank_job_id_difficulty', table_name='question_bank')
+    op.drop_index(op.f('ix_question_bank_id'), table_name='question_bank')
+    op.drop_table('question_bank')
@@ -0,0 +1,68 @@
+"""Job search indexes
+
+Revision ID: 7b2d9e4f1c58
+Revises: 4c1e8f2a9b37
+Create Date: 2024-12-10 09:42:17.336910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d9e4f1c58'
+down_revision: Union[str, None] = '4c1e8f2a9b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "ALTER TABLE jobs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(requirements, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED"
+        )
+        op.execute("CREATE INDEX ix_jobs_search_vector ON jobs USING gin (search_vector)")
+        op.execute("CREATE INDEX ix_jobs_title_trgm ON jobs USING gin (title gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+            "title, description, requirements, content='jobs', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN "
+            "INSERT INTO jobs_fts(rowid, title, description, requirements) "
+            "VALUES (new.id, new.title, new.description, new.requirements); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN "
+            "INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements) "
+            "VALUES ('delete', old.id, old.title, old.description, old.requirements); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE ON jobs BEGIN "
+            "INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements) "
+            "VALUES ('delete', old.id, old.title, old.description, old.requirements); "
+            "INSERT INTO jobs_fts(rowid, title, description, requirements) "
+            "VALUES (new.id, new.title, new.description, new.requirements); END"
+        )
+        # Index the jobs that already exist
+        op.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_jobs_title_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_jobs_search_vector")
+        op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS jobs_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS jobs_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS jobs_fts_ai")
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
@@ -0,0 +1,35 @@
+"""Access path indexes
+
+Revision ID: a3f6c2d8e915
+Revises: 7b2d9e4f1c58
+Create Date: 2024-12-10 15:06:52.104733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f6c2d8e915'
+down_revision: Union[str, None] = '7b2d9e4f1c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_statements_interview_id_timestamp', 'statements', ['interview_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_statements_timestamp_id', 'statements', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_interviews_user_id_start_time', 'interviews', ['user_id', 'start_time'], unique=False)
+    op.create_index('ix_interviews_job_id', 'interviews', ['job_id'], unique=False)
+    op.create_index('ix_interviews_status', 'interviews', ['status'], unique=False)
+    op.create_index(op.f('ix_jobs_industry_id'), 'jobs', ['industry_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_jobs_industry_id'), table_name='jobs')
+    op.drop_index('ix_interviews_status', table_name='interviews')
+    op.drop_index('ix_interviews_job_id', table_name='interviews')
+    op.drop_index('ix_interviews_user_id_start_time', table_name='interviews')
+    op.drop_index('ix_statements_timestamp_id', table_name='statements')
+    op.drop_index('ix_statements_interview_id_timestamp', table_name='statements')
@@ -0,0 +1,52 @@
+"""Progress rollups
+
+Revision ID: d5e1a7c4b902
+Revises: a3f6c2d8e915
+Create Date: 2024-12-11 10:21:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e1a7c4b902'
+down_revision: Union[str, None] = 'a3f6c2d8e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('progress_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.Date(), nullable=False),
+    sa.Column('scored_interviews', sa.Integer(), nullable=False),
+    sa.Column('score_total', sa.Integer(), nullable=False),
+    sa.Column('completed_interviews', sa.Integer(), nullable=False),
+    sa.Column('completed_score_total', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope', 'scope_id', 'period', 'bucket_start', name='uq_progress_rollups_bucket')
+    )
+    op.create_table('progress_rollup_tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.Date(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope', 'scope_id', 'period', 'bucket_start', 'kind', 'tag', name='uq_progress_rollup_tags_bucket')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('progress_rollup_tags')
+    op.drop_table('progress_rollups')
@@ -0,0 +1,38 @@
+"""Answer scores
+
+Revision ID: e8c3f1b6a274
+Revises: d5e1a7c4b902
+Create Date: 2024-12-12 14:03:11.782519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3f1b6a274'
+down_revision: Union[str, None] = 'd5e1a7c4b902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('answer_scores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('dimensions', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('strengths', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('weaknesses', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['interview_id'], ['interviews.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_answer_scores_interview_id_id', 'answer_scores', ['interview_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answer_scores_interview_id_id', table_name='answer_scores')
+    op.drop_table('answer_scores')
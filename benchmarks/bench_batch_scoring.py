@@ -0,0 +1,109 @@
+"""
+Re-scoring cost over synthetic answer scores, per-answer Python loop vs
+the vectorized batch scorer.
+
+The loop mirrors HRManager.update_interview (running total, insights
+appended one answer at a time) plus the per-interview means, decayed
+score and percentiles the batch scorer also produces. Both start from
+the same (interview_id, score, dimensions, strengths, weaknesses) rows,
+as services.batch_scoring.load_answers reads them. Runs without a
+database:
+
+    python -m benchmarks.bench_batch_scoring --interviews 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from services.batch_scoring import DIMENSIONS, PERCENTILES, AnswerBatch, score_batch
+
+TAGS = [
+    "clear communication", "structured answers", "system design", "testing", "sql", "ownership",
+    "vague examples", "rambling", "missed edge cases", "no metrics", "weak fundamentals", "pace",
+]
+
+
+def synthetic_rows(interviews: int, answers: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for interview_id in range(1, interviews + 1):
+        for _ in range(rng.randint(1, 2 * answers - 1)):
+            rows.append((
+                interview_id,
+                float(rng.randint(0, 10)),
+                {name: rng.randint(0, 10) for name in DIMENSIONS if rng.random() < 0.9},
+                rng.sample(TAGS[:6], rng.randint(0, 2)),
+                rng.sample(TAGS[6:], rng.randint(0, 2)),
+            ))
+    return rows
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def python_loop(rows: list, decay: float) -> dict:
+    interviews = {}
+    for interview_id, score, dimensions, strengths, weaknesses in rows:
+        state = interviews.setdefault(interview_id, {
+            "total": 0.0, "scores": [], "dimensions": {name: [] for name in DIMENSIONS},
+            "insights": {"strengths": [], "weaknesses": []},
+        })
+        state["total"] += score
+        state["scores"].append(score)
+        for name, value in dimensions.items():
+            state["dimensions"][name].append(value)
+        for kind, tags in (("strengths", strengths), ("weaknesses", weaknesses)):
+            state["insights"][kind] += [tag for tag in tags if tag not in state["insights"][kind]]
+
+    for state in interviews.values():
+        scores = state["scores"]
+        weights = [decay ** (len(scores) - 1 - index) for index in range(len(scores))]
+        state["mean"] = statistics.fmean(scores)
+        state["decayed"] = sum(weight * score for weight, score in zip(weights, scores)) / sum(weights)
+        state["percentiles"] = [percentile(scores, q) for q in PERCENTILES]
+        state["dimension_means"] = {name: statistics.fmean(values) for name, values in state["dimensions"].items() if values}
+        state["dimension_percentiles"] = {
+            name: [percentile(values, q) for q in PERCENTILES] for name, values in state["dimensions"].items() if values
+        }
+    return interviews
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interviews", type=int, default=100_000)
+    parser.add_argument("--answers", type=int, default=8, help="Mean answers per interview")
+    parser.add_argument("--decay", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.interviews, args.answers)
+    print(f"{args.interviews} interviews, {len(rows)} answers")
+
+    start = time.perf_counter()
+    expected = python_loop(rows, args.decay)
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = AnswerBatch.from_rows(rows)
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = score_batch(batch, decay=args.decay)
+    score_s = time.perf_counter() - start
+
+    for index in (0, len(scores.interview_ids) // 2, len(scores.interview_ids) - 1):
+        state = expected[int(scores.interview_ids[index])]
+        assert abs(state["decayed"] - scores.decayed[index]) < 1e-9
+        assert abs(state["percentiles"][-1] - scores.percentiles[-1, index]) < 1e-9
+
+    print(f"python loop          {loop_s:8.2f} s")
+    print(f"batch (arrays)       {load_s:8.2f} s")
+    print(f"batch (score_batch)  {score_s:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
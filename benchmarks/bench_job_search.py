@@ -0,0 +1,122 @@
+"""
+Job search latency, ILIKE scan vs the search index, over synthetic jobs.
+
+Builds a throwaway SQLite database (the FTS5 path; point --db-url at a
+Postgres database with the job_search migration applied to measure the
+tsvector/pg_trgm path), loads --jobs random jobs and times each query:
+
+    python -m benchmarks.bench_job_search --jobs 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from itertools import accumulate
+
+from sqlalchemy import create_engine, func, insert, or_, select
+
+from services.job_search import apply_search
+import utils.models as models
+
+WORDS = [
+    "python", "java", "golang", "rust", "react", "django", "fastapi", "kubernetes", "aws", "terraform",
+    "sql", "spark", "airflow", "pandas", "tableau", "figma", "swift", "kotlin", "linux", "docker",
+    "payments", "healthcare", "logistics", "retail", "security", "analytics", "mobile", "platform",
+]
+ROLES = ["Engineer", "Developer", "Analyst", "Designer", "Manager", "Scientist", "Architect", "Consultant"]
+SENIORITY = ["Junior", "Mid-level", "Senior", "Staff", "Lead", "Principal"]
+# Long-tail vocabulary so, as in real postings, most terms are selective
+VOCABULARY = WORDS + [f"tool{index}" for index in range(5000)]
+CUM_WEIGHTS = list(accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+QUERIES = ["python", "senior rust", "kubernetes terraform", "tool1234", "platform tool42"]
+
+
+def synthetic_jobs(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield {
+            "title": f"{rng.choice(SENIORITY)} {rng.choice(WORDS).title()} {rng.choice(ROLES)}",
+            "description": " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=25)),
+            "requirements": ", ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=5)),
+            "level": rng.randint(1, 10),
+            "industry_id": 1,
+        }
+
+
+def load(engine, count: int, batch: int = 20_000):
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Industry), [{"name": "Synthetic"}])
+    rows = []
+    for row in synthetic_jobs(count):
+        rows.append(row)
+        if len(rows) == batch:
+            with engine.begin() as conn:
+                conn.execute(insert(models.Job), rows)
+            rows = []
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(insert(models.Job), rows)
+
+
+def ilike_scan(search: str):
+    pattern = f"%{search}%"
+    return select(models.Job.id, models.Job.title).where(or_(
+        models.Job.title.ilike(pattern),
+        models.Job.description.ilike(pattern),
+        models.Job.requirements.ilike(pattern),
+    ))
+
+
+def count(stmt):
+    return select(func.count()).select_from(stmt.subquery())
+
+
+def timed(engine, stmt, repeats: int) -> tuple[float, int]:
+    best, rows = None, 0
+    for _ in range(repeats):
+        with engine.connect() as conn:
+            start = time.perf_counter()
+            rows = len(conn.execute(stmt).all())
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--db-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    path = None
+    if args.db_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+        args.db_url = f"sqlite:///{path}"
+    engine = create_engine(args.db_url)
+    try:
+        start = time.perf_counter()
+        load(engine, args.jobs)
+        print(f"loaded {args.jobs} jobs in {time.perf_counter() - start:.1f}s ({engine.dialect.name})")
+
+        columns = select(models.Job.id, models.Job.title)
+        print(f"{'query':22} {'ilike count':>12} {'index count':>12} {'ranked top ' + str(args.limit):>15}")
+        for search in QUERIES:
+            # Counting every match forces ILIKE to scan the whole table
+            scan_ms, _ = timed(engine, count(ilike_scan(search)), args.repeats)
+            index_ms, _ = timed(engine, count(apply_search(columns, engine.dialect.name, search, ranked=False)), args.repeats)
+            ranked_ms, _ = timed(engine, apply_search(columns, engine.dialect.name, search).limit(args.limit), args.repeats)
+            with engine.connect() as conn:
+                matches = conn.execute(count(apply_search(columns, engine.dialect.name, search, ranked=False))).scalar_one()
+            print(f"{search!r:22} {scan_ms:9.2f} ms {index_ms:9.2f} ms {ranked_ms:12.2f} ms   ({matches} matches)")
+    finally:
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
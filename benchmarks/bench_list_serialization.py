@@ -0,0 +1,79 @@
+"""
+Serialization cost of one page of jobs, response_model path vs row fast path.
+
+The response_model path mirrors what FastAPI does for `List[JobDetails]`
+with the stdlib encoder: validate ORM instances, dump to JSON-able
+python, json.dumps. The fast path serializes selected row mappings with
+orjson (utils.helpers.rows_response). Runs without a database:
+
+    python -m benchmarks.bench_list_serialization --items 1000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from utils.helpers import rows_response
+import utils.models as models
+import utils.schemas as schemas
+
+
+def orm_page(items: int) -> list:
+    return [
+        models.Job(
+            id=index,
+            title=f"Backend Developer {index}",
+            description="Build and run the APIs behind our interview platform.",
+            requirements="Python, FastAPI, SQL",
+            level=index % 10 + 1,
+            industry_id=index % 7 + 1,
+        )
+        for index in range(items)
+    ]
+
+
+def row_page(items: int) -> list:
+    fields = list(schemas.JobDetails.model_fields)
+    return [{field: getattr(job, field) for field in fields} for job in orm_page(items)]
+
+
+def best_of(repeats: int, func) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        func()
+        timings.append(time.perf_counter_ns() - start)
+    return min(timings) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[schemas.JobDetails])
+    jobs = orm_page(args.items)
+    rows = row_page(args.items)
+
+    def response_model_path():
+        validated = adapter.validate_python(jobs, from_attributes=True)
+        content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def fast_path():
+        return rows_response(rows).body
+
+    assert json.loads(response_model_path()) == json.loads(fast_path())
+    before = best_of(args.repeats, response_model_path)
+    after = best_of(args.repeats, fast_path)
+    print(f"{args.items} jobs, best of {args.repeats}")
+    print(f"response_model + json: {before:.2f} ms")
+    print(f"rows + orjson:         {after:.2f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
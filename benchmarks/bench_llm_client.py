@@ -0,0 +1,133 @@
+"""
+LLM call latency with a new HTTP client per call vs the shared,
+connection-pooled client (services.llm_client), against a local mock of
+the OpenAI chat completions API.
+
+The mock charges --handshake-ms on every new connection, standing in
+for the TCP and TLS handshakes to the real provider, and --latency-ms per
+completion. --fail-rate answers that share of requests with a 503, to
+exercise the retries:
+
+    python -m benchmarks.bench_llm_client --interviews 20 --calls 10
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import orjson
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from config import config
+from services import hr_manager
+from services.llm_client import LLMHttpClients, RetryPolicy
+
+COMPLETION = orjson.dumps({
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Tell me more about that."}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 12, "completion_tokens": 6, "total_tokens": 18},
+})
+OVERLOADED = orjson.dumps({"error": {"message": "overloaded", "type": "server_error"}})
+
+
+class MockProvider:
+    """
+    Keep-alive HTTP/1.1 server answering every request with a canned chat
+    completion, counting the connections clients open.
+    """
+
+    def __init__(self, handshake: float, latency: float, fail_rate: float, seed: int = 7):
+        self.handshake = handshake
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        await asyncio.sleep(self.handshake)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n")[1:]:
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                if length:
+                    await reader.readexactly(length)
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                status, body = (503, OVERLOADED) if self.rng.random() < self.fail_rate else (200, COMPLETION)
+                writer.write(b"HTTP/1.1 %d OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (status, len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def interview(model_for_call, calls: int, timings: list):
+    for turn in range(calls):
+        started = time.perf_counter()
+        await model_for_call().ainvoke([HumanMessage(f"Answer {turn}")])
+        timings.append(time.perf_counter() - started)
+
+
+async def run_mode(name: str, model_for_call, provider: MockProvider, args):
+    provider.connections = provider.requests = 0
+    timings = []
+    started = time.perf_counter()
+    await asyncio.gather(*(interview(model_for_call, args.calls, timings) for _ in range(args.interviews)))
+    wall = time.perf_counter() - started
+    timings.sort()
+    print(
+        f"{name:16} wall {wall * 1000:8.1f} ms   mean {statistics.fmean(timings) * 1000:7.2f} ms   "
+        f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms   "
+        f"connections {provider.connections:4}   requests {provider.requests}"
+    )
+
+
+async def run(args):
+    provider = MockProvider(args.handshake_ms / 1000, args.latency_ms / 1000, args.fail_rate)
+    server = await asyncio.start_server(provider.handle, "127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+
+    config.LLM_PROVIDER = "openai"
+    config.LLM_BASE_URL = base_url
+    policy = RetryPolicy(retries=args.retries, base_delay=0.01, max_delay=0.1)
+    hr_manager.llm_http = LLMHttpClients(base_url=base_url, max_keepalive=args.keepalive, policy=policy)
+
+    def per_call():
+        # What every call did before: ChatOpenAI builds its own HTTP client
+        return ChatOpenAI(model=config.OPENAI_MODEL, api_key="bench", base_url=base_url, max_retries=args.retries)
+
+    try:
+        await run_mode("client per call", per_call, provider, args)
+        await run_mode("shared client", hr_manager.HRManager.chat_model, provider, args)
+        print(f"shared client stats: {hr_manager.llm_http.stats()}")
+    finally:
+        await hr_manager.llm_http.aclose()
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interviews", type=int, default=20, help="Concurrent interviews")
+    parser.add_argument("--calls", type=int, default=10, help="LLM calls per interview")
+    parser.add_argument("--handshake-ms", type=float, default=30.0, help="Cost of opening a connection")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Time to answer one completion")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--keepalive", type=int, default=20, help="Keep-alive connections in the shared pool")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Caller-side cost of one access log call through the queued logger,
+against a NullHandler baseline (the cost of building the LogRecord).
+
+    python -m benchmarks.bench_logging --records 100000
+"""
+import argparse
+import logging
+import time
+
+from services.logger import log_stats, logger, stop_logging
+
+
+def time_records(records: int) -> float:
+    start = time.perf_counter_ns()
+    for index in range(records):
+        log_dict = {"url": "/health", "method": "GET", "status_code": 200, "req_process_time": index * 1e-6}
+        logger.info(log_dict, extra=log_dict)
+    return (time.perf_counter_ns() - start) / records / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    queued = time_records(args.records)
+    stop_logging()
+    stats = log_stats()
+
+    handlers = logger.handlers
+    logger.handlers = [logging.NullHandler()]
+    baseline = time_records(args.records)
+    logger.handlers = handlers
+
+    print(f"queued logger:  {queued:.2f} us per record")
+    print(f"null handler:   {baseline:.2f} us per record")
+    print(f"handler cost:   {queued - baseline:.2f} us per record")
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cold import cost of the app: runs `python -X importtime -c "import main"`
+in fresh interpreters and reports the wall time, the slowest modules by
+cumulative import time and the total per top-level package. With
+--warm-up it also times the startup warm-up (services.warmup) that loads
+the lazily imported AI and speech libraries:
+
+    python -m benchmarks.bench_startup --runs 5 --top 15 --warm-up
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+WARM_UP = "import asyncio, json, main; from services import warmup; print(json.dumps(asyncio.run(warmup.warm_up())))"
+
+
+def import_profile(target: str) -> tuple[float, list[tuple[str, int, int, int]]]:
+    """
+    Import `target` in a new interpreter. Returns the wall time and
+    (module, self µs, cumulative µs, depth) for every module it imported.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - started
+    modules = []
+    for match in LINE.finditer(result.stderr):
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", default="main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--warm-up", action="store_true", help="Also time services.warmup after the import")
+    args = parser.parse_args()
+
+    walls, profiles = [], []
+    for _ in range(args.runs):
+        wall, modules = import_profile(args.target)
+        walls.append(wall)
+        profiles.append(modules)
+    # The median run by wall time stands for all of them
+    modules = profiles[walls.index(sorted(walls)[len(walls) // 2])]
+
+    print(f"import {args.target}: median {statistics.median(walls) * 1000:8.1f} ms   "
+          f"min {min(walls) * 1000:8.1f} ms   ({len(modules)} modules)")
+
+    print(f"\nslowest {args.top} modules (cumulative)")
+    for name, _, cumulative_us, depth in sorted(modules, key=lambda row: -row[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {'  ' * min(depth, 8)}{name}")
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        packages[name.partition(".")[0]] += self_us
+    print(f"\nslowest {args.top} packages (self time)")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    heavy = [package for package in ("langchain_openai", "openai", "gtts", "speech_recognition", "nltk") if package in packages]
+    print(f"\nheavy libraries imported with {args.target}: {', '.join(heavy) or 'none'}")
+
+    if args.warm_up:
+        result = subprocess.run([sys.executable, "-c", WARM_UP], capture_output=True, text=True, check=True)
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"\nwarm-up {report['seconds'] * 1000:8.1f} ms")
+        for name, step in report["steps"].items():
+            print(f"  {step['ms']:8.1f} ms  {name}{'  (failed: ' + step['error'] + ')' if 'error' in step else ''}")
+
+
+if __name__ == "__main__":
+    main()
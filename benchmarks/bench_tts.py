@@ -0,0 +1,75 @@
+"""
+Time to first audio for a spoken reply: the whole reply rendered in one
+call vs sentence-by-sentence streaming, cold and from the speech cache.
+
+Uses the offline stub engine with a per-character render delay standing
+in for a real TTS service (--ms-per-char), so it runs anywhere:
+
+    python -m benchmarks.bench_tts --replies 50
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from config import config
+from services import tts
+
+OPENERS = ["Thanks for that answer.", "Great, that makes sense.", "Interesting.", "Good to hear."]
+QUESTIONS = [
+    "Could you walk me through a recent project you are proud of?",
+    "How did you decide between the designs you considered?",
+    "What would you do differently if you started again today?",
+    "How did you measure whether the change actually worked?",
+    "Tell me about a time you disagreed with a teammate and how it ended.",
+]
+
+
+def replies(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(OPENERS)} {' '.join(rng.sample(QUESTIONS, 2))}" for _ in range(count)]
+
+
+async def whole(speech: tts.SpeechSynthesizer, reply: str) -> float:
+    start = time.perf_counter()
+    await speech.synthesize(reply)
+    return time.perf_counter() - start
+
+
+async def streamed(speech: tts.SpeechSynthesizer, reply: str) -> float:
+    start = time.perf_counter()
+    async for _ in speech.stream(reply):
+        return time.perf_counter() - start
+
+
+async def run(args):
+    config.TTS_STUB_SECONDS_PER_CHAR = args.ms_per_char / 1000
+    texts = replies(args.replies)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, first_audio in (("whole reply", whole), ("per sentence", streamed)):
+            speech = tts.SpeechSynthesizer(engine="stub", workers=args.workers, cache=tts.SpeechCache(backend="disk", directory=f"{directory}/{name}"))
+            try:
+                # First pass starts cold; openers and questions recur, so later
+                # replies are partly cached. Second pass is fully cached.
+                for label in ("first pass", "second pass"):
+                    timings = [await first_audio(speech, reply) for reply in texts]
+                    median = sorted(timings)[len(timings) // 2] * 1000
+                    print(
+                        f"{name:14} {label:12} first reply {timings[0] * 1000:8.2f} ms   "
+                        f"median {median:8.2f} ms   (rendered {speech.rendered})"
+                    )
+            finally:
+                speech.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replies", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ms-per-char", type=float, default=2.0, help="Render time of the stub engine")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
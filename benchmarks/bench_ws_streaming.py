@@ -0,0 +1,62 @@
+"""
+Time-to-first-byte of the interviewer reply, blocking vs streaming.
+
+Runs fully offline against FakeStreamingChatModel:
+
+    python -m benchmarks.bench_ws_streaming --tokens 60 --token-delay 0.02
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from services.fake_llm import FakeStreamingChatModel
+from services.hr_manager import HRManager
+
+CONTEXT = {
+    "id": 1,
+    "hr_ai": "iHR AI",
+    "difficulty": "Beginner",
+    "job": {"title": "Junior Python Developer", "description": None, "requirements": "Python"},
+    "statements": [],
+}
+
+
+async def blocking_reply() -> tuple[float, float]:
+    start = time.perf_counter()
+    await HRManager.get_ai_response("I enjoy building APIs.", CONTEXT)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def streaming_reply() -> tuple[float, float]:
+    start = time.perf_counter()
+    first = None
+    async for _ in HRManager.stream_ai_response("I enjoy building APIs.", CONTEXT):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def main(tokens: int, token_delay: float, first_token_delay: float, runs: int):
+    model = FakeStreamingChatModel(
+        reply=" ".join(["word"] * tokens),
+        token_delay=token_delay,
+        first_token_delay=first_token_delay,
+    )
+    with patch.object(HRManager, "chat_model", return_value=model):
+        for name, run in [("blocking", blocking_reply), ("streaming", streaming_reply)]:
+            samples = [await run() for _ in range(runs)]
+            ttfb = sum(sample[0] for sample in samples) / runs
+            total = sum(sample[1] for sample in samples) / runs
+            print(f"{name:<10} ttfb={ttfb * 1000:8.1f} ms  total={total * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.token_delay, args.first_token_delay, args.runs))
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class GlobalConfig(BaseSettings):
     ENVT_STATE: str
@@ -9,6 +10,124 @@ class GlobalConfig(BaseSettings):
     APP_SECRET_KEY: str
     ALGORITHM: str
 
+    # Logging; records are written as JSON lines by a background listener
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "/logs/server.logs"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_ROTATE_WHEN: Optional[str] = None
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0
+
+    # Async engine pool sizing, per worker process
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Redis; the in-process stand-in is used when no URL is set
+    REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    # Extra lifetime for cached interview contexts beyond the interview duration
+    CONTEXT_CACHE_GRACE_SECONDS: int = 900
+
+    # LLM interviewer; LLM_PROVIDER=fake uses the offline streaming stub
+    LLM_PROVIDER: str = "openai"
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    LLM_TEMPERATURE: float = 0.7
+    LLM_HISTORY_WINDOW: int = 20
+
+    # One HTTP client per process for the LLM provider: keep-alive pool,
+    # HTTP/2 when h2 is installed, timeouts in seconds and jittered retries
+    LLM_BASE_URL: Optional[str] = None
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP2: bool = True
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_TIMEOUT: float = 60.0
+    LLM_POOL_TIMEOUT: float = 10.0
+    LLM_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.25
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_WARM_CONNECTIONS: int = 2
+
+    # Question generation; only calls at or below the temperature gate are cached
+    QUESTION_TEMPERATURE: float = 0.0
+    QUESTION_CACHE_MAX_TEMPERATURE: float = 0.0
+    QUESTION_CACHE_HISTORY: int = 4
+    QUESTION_CACHE_SIZE: int = 1024
+    QUESTION_CACHE_TTL: int = 86400
+
+    # Background answer scoring
+    SCORING_WORKERS: int = 4
+    SCORING_QUEUE_SIZE: int = 256
+    SCORING_SUBMIT_TIMEOUT: float = 2.0
+
+    # Password hashing runs on its own thread pool, off the event loop
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Verified JWTs are cached until they expire; principals for a short TTL
+    TOKEN_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60
+
+    # Pre-generated opening questions per job and difficulty
+    QUESTION_BANK_SIZE: int = 10
+    QUESTION_BANK_TEMPERATURE: float = 0.8
+    QUESTION_BANK_WORKERS: int = 2
+    QUESTION_BANK_QUEUE_SIZE: int = 128
+
+    # Progress rollups are rebuilt from scratch this often (seconds; 0 disables)
+    PROGRESS_COMPACTION_INTERVAL: float = 3600
+
+    # Batch re-scoring: weight of an answer relative to the one after it
+    SCORE_DECAY: float = 0.8
+
+    # Spoken answers: 16-bit mono PCM in binary WebSocket frames, split into
+    # segments on silence and transcribed in a process pool
+    AUDIO_SAMPLE_RATE: int = 16000
+    AUDIO_FRAME_MS: int = 30
+    AUDIO_VAD_THRESHOLD: float = 500.0
+    AUDIO_SILENCE_MS: int = 700
+    AUDIO_PARTIAL_MS: int = 1500
+    AUDIO_MAX_SEGMENT_SECONDS: float = 15.0
+    AUDIO_MAX_CHUNK_BYTES: int = 65536
+    # Closed segments of one answer awaiting transcription before reads pause
+    AUDIO_MAX_PENDING_SEGMENTS: int = 4
+    SPEECH_RECOGNIZER: str = "services.recognizers:google"
+    TRANSCRIBE_WORKERS: int = 2
+
+    # Spoken replies: rendered per sentence on a thread pool and cached by
+    # content ("disk", "redis" or "none") so recurring phrases are instant
+    TTS_ENGINE: str = "gtts"
+    TTS_VOICE: str = "en"
+    TTS_WORKERS: int = 4
+    TTS_CACHE_BACKEND: str = "disk"
+    TTS_CACHE_DIR: str = ".cache/tts"
+    TTS_CACHE_MAX_BYTES: int = 268435456
+    TTS_MEMORY_CACHE_BYTES: int = 16777216
+    TTS_CACHE_TTL: int = 2592000
+    TTS_STUB_SECONDS_PER_CHAR: float = 0.0
+
+    # The AI and speech libraries load lazily; the startup warm-up imports
+    # them and builds the LLM client before the worker takes traffic
+    WARMUP_ENABLED: bool = True
+    WARMUP_TOKENIZER: bool = True
+    WARMUP_TIMEOUT: float = 60.0
+
+    # Opened before the first request, and how long shutdown waits for live
+    # interviews and background jobs to write what they hold
+    STARTUP_DB_CONNECTIONS: int = 5
+    STARTUP_REDIS_CONNECTIONS: int = 5
+    STARTUP_WARM_CONTEXTS: int = 200
+    SHUTDOWN_DRAIN_SECONDS: float = 20.0
+    # How long a closing interview socket keeps retrying its unwritten statements
+    SESSION_CLOSE_SECONDS: float = 10.0
+
     class Config:
         env_file = ".env"
 
@@ -27,6 +146,7 @@ class TestConfig(GlobalConfig):
         env_prefix: str = "TEST_"
 
 class ProdConfig(GlobalConfig):
+    DATABASE_URL: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
     class Config:
@@ -1,4 +1,5 @@
 import os
+import sys
 from typing import AsyncGenerator, Generator
 
 import pytest
@@ -8,6 +9,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from main import app
+import services.database as database
 from services.database import Base, get_async_db_session
 
 DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -36,8 +38,19 @@ async def db_engine() -> AsyncGenerator:
     await test_engine.dispose()
 
 @pytest.fixture(scope="function")
-async def async_db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
-    async with TestSessionLocal() as session:
+def test_session_local(db_engine, monkeypatch):
+    """
+    Point every module that opens its own sessions (background flushers,
+    workers, startup) at the test database instead of the configured one.
+    """
+    for name, module in list(sys.modules.items()):
+        if name.startswith("services.") and getattr(module, "AsyncSessionLocal", None) is database.AsyncSessionLocal:
+            monkeypatch.setattr(module, "AsyncSessionLocal", TestSessionLocal)
+    return TestSessionLocal
+
+@pytest.fixture(scope="function")
+async def async_db_session(test_session_local) -> AsyncGenerator[AsyncSession, None]:
+    async with test_session_local() as session:
         yield session
 
 @pytest.fixture(scope="module")
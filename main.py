@@ -1,35 +1,47 @@
 from typing import Annotated
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from services import hr_manager
+from services import hr_manager, interview_session, lifecycle, progress, question_bank
+from services.auth_cache import principal_cache, token_cache
+from services.password_hasher import password_hasher
+from services.speech import transcriber
+from services.tts import synthesizer
 from starlette import status
-from starlette.middleware.base import BaseHTTPMiddleware
 import os
 from decouple import config as decouple_config
-import nltk
 from utils.dependencies import async_db_session_dependency
-from middleware import app_middleware 
-from services.database import async_engine
-from services.logger import logger
+from middleware import TimingMiddleware
+from services.database import init_models, pool_status
+from services.logger import log_stats
+from services.metrics import render_metrics
 from config import config
-from routers import auth, interviews, jobs, statements, industries, ws_interview, users
-import uvicorn
+from routers import auth, dashboard, interviews, jobs, statements, industries, ws_interview, users
+import asyncio
 import logging
 import sys
-from contextlib import asynccontextmanager
-from services.database import database
+from contextlib import asynccontextmanager, suppress
 import utils.models as models, utils.schemas as schemas, utils.crud as crud
 
 
 @asynccontextmanager
-async def lifeespan(app: FastAPI):
-    await database.connect()
-    yield 
-    await database.disconnect()
+async def lifespan(app: FastAPI):
+    await init_models()
+    await lifecycle.startup()
+    compaction = None
+    if config.PROGRESS_COMPACTION_INTERVAL > 0:
+        compaction = asyncio.create_task(progress.compaction_loop(config.PROGRESS_COMPACTION_INTERVAL))
+    yield
+    if compaction:
+        compaction.cancel()
+        # Let a rebuild in progress roll back before the engine is disposed
+        with suppress(asyncio.CancelledError):
+            await compaction
+    await lifecycle.shutdown(config.SHUTDOWN_DRAIN_SECONDS)
 
 
-app = FastAPI(title=config.PROJECT_NAME, docs_url="/api/docs")
+app = FastAPI(title=config.PROJECT_NAME, docs_url="/api/docs", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 
 # Register Routers
@@ -40,14 +52,15 @@ app.include_router(interviews.router)
 app.include_router(ws_interview.router)
 app.include_router(statements.router)
 app.include_router(industries.router)
+app.include_router(dashboard.router)
 
 # Add Middleware
-app.add_middleware(BaseHTTPMiddleware, dispatch=app_middleware)
+app.add_middleware(TimingMiddleware)
 
 
 # --- Basic Endpoints ---
 @app.get("/", response_model=None)
-async def home(db: AsyncSession = Depends(async_db_session_dependency)):
+async def home(db: async_db_session_dependency):
     base_url = decouple_config('DOMAIN', cast=str, default="http://localhost:8000")
     
     web_socket_links = [f"{base_url}/ws/{endpoint}" for endpoint in ["simulate-interview/{interview_id}"]]
@@ -60,5 +73,122 @@ async def home(db: AsyncSession = Depends(async_db_session_dependency)):
     }
 
 
+@app.get("/health/db-pool", response_model=None)
+async def db_pool_health():
+    """
+    Connection pool occupancy and checkout latency for this worker.
+    """
+    return pool_status()
+
+
+@app.get("/health/scoring-queue", response_model=None)
+async def scoring_queue_health():
+    """
+    Depth, throughput and backpressure of the background answer scorer.
+    """
+    return hr_manager.scoring_queue.stats()
+
+
+@app.get("/health/llm-client", response_model=None)
+async def llm_client_health():
+    """
+    Pooled connections, retries and failures of the shared LLM HTTP client.
+    """
+    return hr_manager.llm_http.stats()
+
+
+@app.get("/health/question-cache", response_model=None)
+async def question_cache_health():
+    """
+    Hit/miss counters of the question generation cache.
+    """
+    return hr_manager.question_cache.stats()
+
+
+@app.get("/health/question-bank", response_model=None)
+async def question_bank_health():
+    """
+    Depth and throughput of the background question bank refills.
+    """
+    return question_bank.refill_queue.stats()
+
+
+@app.get("/health/password-hasher", response_model=None)
+async def password_hasher_health():
+    """
+    Queue depth and timings of the bcrypt thread pool.
+    """
+    return password_hasher.stats()
+
+
+@app.get("/health/auth-cache", response_model=None)
+async def auth_cache_health():
+    """
+    Hit/miss counters of the verified-token and principal caches.
+    """
+    return {"tokens": token_cache.stats(), "principals": principal_cache.stats()}
+
+
+@app.get("/health/logging", response_model=None)
+async def logging_health():
+    """
+    Backlog and drop counters of the background log writer.
+    """
+    return log_stats()
+
+
+@app.get("/health/transcriber", response_model=None)
+async def transcriber_health():
+    """
+    Backlog and timings of the speech recognition process pool.
+    """
+    return transcriber.stats()
+
+
+@app.get("/health/tts", response_model=None)
+async def tts_health():
+    """
+    Render counts and speech cache hit rate of the reply synthesizer.
+    """
+    return synthesizer.stats()
+
+
+@app.get("/health/startup", response_model=None)
+async def startup_health():
+    """
+    Whether startup has finished, how long each connection, cache and
+    library warm-up took, and what the last shutdown drain left unwritten.
+    """
+    return lifecycle.status
+
+
+@app.get("/health/sessions", response_model=None)
+async def sessions_health():
+    """
+    Live interview sockets in this worker and their unwritten statements.
+    """
+    return interview_session.stats()
+
+
+@app.get("/health/progress-rollups", response_model=None)
+async def progress_rollups_health():
+    """
+    Outcome of the last progress rollup rebuild, including how many buckets
+    had drifted from the incremental updates.
+    """
+    return progress.last_compaction
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Request and WebSocket message latencies (p50/p95/p99) in the Prometheus
+    text format.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="0.0.0.0", reload=True, port=8000)
@@ -1,20 +1,49 @@
-from fastapi import Request
 import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from services.logger import logger
+from services.metrics import http_request_duration
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware: times each HTTP request with perf_counter_ns,
+    records it under its route template, method and status, and writes the
+    access log. Responses pass through untouched, so streaming keeps working.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-async def app_middleware(request: Request, call_next):
+        start = time.perf_counter_ns()
+        status_code = 500
 
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-    # if request.url == "xxx" ---> implement authorization or check auth
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            # The router stores the matched route in the scope; raw paths of
+            # unmatched requests would give unbounded label cardinality
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            http_request_duration.record(elapsed, route_path, scope["method"], status_code)
 
-    log_dict = {
-        "url": request.url.path,
-        "method": request.method,
-        "status_code": response.status_code,
-        "req_process_time": process_time
-    }
-    logger.info(log_dict, extra=log_dict)
-    return response
\ No newline at end of file
+            log_dict = {
+                "url": scope["path"],
+                "method": scope["method"],
+                "status_code": status_code,
+                "req_process_time": elapsed / 1e9
+            }
+            logger.info(log_dict, extra=log_dict)
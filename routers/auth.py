@@ -6,19 +6,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status 
 
 from utils.models import User
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer 
 from jose import jwt, JWTError
 from utils.schemas import Token, UserCreate, UserDetail
 from utils.dependencies import async_db_session_dependency
 from config import config
+from services.auth_cache import principal_cache, token_cache
+from services.password_hasher import password_hasher
 
 router = APIRouter(
     prefix="/auth",
     tags=["auth"]
 )
 
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated="auto")
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 # --- User Registration ---
@@ -28,7 +28,7 @@ async def create_user(user: UserCreate, db: async_db_session_dependency):
         db_user = User(
             username=user.username, 
             email=user.email, 
-            password=bcrypt_context.hash(user.password)
+            password=await password_hasher.hash(user.password)
         )
         db.add(db_user)
         await db.commit()
@@ -44,14 +44,14 @@ async def create_user(user: UserCreate, db: async_db_session_dependency):
 # --- Login for JWT ---
 @router.post("/token/", response_model=Token)
 async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], 
-                                 db: AsyncSession = Depends(async_db_session_dependency)):
+                                 db: async_db_session_dependency):
     user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate user"
         )
-    token = create_access_token(user.username, user.id, timedelta(minutes=30))
+    token = await create_access_token(user.username, user.id, timedelta(minutes=30))
 
     return {
         "access_token": token,
@@ -69,28 +69,38 @@ async def authenticate_user(username: str, password: str, db: AsyncSession):
     user = result.scalars().first()
     if not user:
         return False
-    if not bcrypt_context.verify(password, user.password):
+    if not await password_hasher.verify(password, user.password):
         return False
     return user
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
-    try:
-        payload = jwt.decode(token, config.APP_SECRET_KEY, algorithms=[config.ALGORITHM])
+async def resolve_token(token: str) -> dict:
+    """
+    Verify a JWT and return its user's principal (id, username, role).
+    Verified tokens and principals are cached, so in steady state this
+    costs no signature check and no database query.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate user"
+    )
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            payload = jwt.decode(token, config.APP_SECRET_KEY, algorithms=[config.ALGORITHM])
+        except JWTError:
+            raise credentials_exception
         username: str = payload.get("sub")
         user_id: int = payload.get("id")
-        print("Payload  ", payload)
         if username is None or user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, 
-                detail="Could not validate user"
-            )
-        return {
-            "username": username,
-            "id": user_id
-        }
+            raise credentials_exception
+        claims = {"username": username, "id": user_id}
+        if payload.get("exp") is not None:
+            token_cache.set(token, claims, payload["exp"])
 
-    except JWTError:
-        raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, 
-                detail="Could not validate user"
-            )
+    principal = await principal_cache.get(claims["id"])
+    if principal is None:
+        raise credentials_exception
+    return principal
+
+async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
+    return await resolve_token(token)
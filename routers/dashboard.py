@@ -0,0 +1,42 @@
+from typing import Annotated, Literal
+from fastapi import APIRouter, Depends, Query
+from routers.auth import get_current_user
+from services import progress
+import utils.schemas as schemas
+from utils.dependencies import async_db_session_dependency
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"]
+)
+
+user_dependency = Annotated[dict, Depends(get_current_user)]
+
+
+@router.get("/progress", response_model=schemas.ProgressDashboard)
+async def get_my_progress(
+    user: user_dependency,
+    db: async_db_session_dependency,
+    period: Literal["day", "week"] = "week",
+    limit: int = Query(12, ge=1, le=366),
+):
+    """
+    The current user's average score over time, by day or week, with their
+    most frequent strengths and weaknesses over the same buckets. Read from
+    the progress rollups, never from the interviews themselves.
+    """
+    return await progress.dashboard(db, "user", user["id"], period, limit)
+
+
+@router.get("/progress/industries/{industry_id}", response_model=schemas.ProgressDashboard)
+async def get_industry_progress(
+    industry_id: int,
+    user: user_dependency,
+    db: async_db_session_dependency,
+    period: Literal["day", "week"] = "week",
+    limit: int = Query(12, ge=1, le=366),
+):
+    """
+    The same progress summary across every candidate in an industry.
+    """
+    return await progress.dashboard(db, "industry", industry_id, period, limit)
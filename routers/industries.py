@@ -1,9 +1,9 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from fastapi import APIRouter, HTTPException, status
 import utils.crud as crud 
 import utils.schemas as schemas 
 from utils.dependencies import async_db_session_dependency
+from utils.helpers import decode_cursor, encode_cursor
 
 router = APIRouter(
     prefix="/industries",
@@ -11,7 +11,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.IndustryResponse, status_code=status.HTTP_201_CREATED)
-async def create_industry(industry: schemas.IndustryCreate, db: AsyncSession = Depends(async_db_session_dependency)):
+async def create_industry(industry: schemas.IndustryCreate, db: async_db_session_dependency):
     """
     Create a new industry.
     """
@@ -24,9 +24,22 @@ async def create_industry(industry: schemas.IndustryCreate, db: AsyncSession = D
             detail=f"Error creating industry: {str(e)}"
         )
 
-@router.get("/", response_model=List[schemas.IndustryResponse])
-async def get_industries(db: AsyncSession = Depends(async_db_session_dependency), skip: int = 0, limit: int = 10):
+@router.get("/", response_model=Union[List[schemas.IndustryResponse], schemas.CursorPage[schemas.IndustryResponse]])
+async def get_industries(db: async_db_session_dependency, skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
     """
     Fetch a list of industries with optional pagination.
+    Passing `cursor` (empty for the first page) switches to keyset
+    pagination and returns `{"items": [...], "next_cursor": ...}`.
     """
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        industries, next_key = await crud.get_industries_page(db, after, limit=limit)
+        return schemas.CursorPage[schemas.IndustryResponse](
+            items=[schemas.IndustryResponse.model_validate(industry) for industry in industries],
+            next_cursor=encode_cursor(next_key) if next_key is not None else None,
+        )
+
     return await crud.get_industries(db, skip=skip, limit=limit)
\ No newline at end of file
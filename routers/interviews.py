@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional, Union
+from services import context_cache, progress, question_bank
+from services.hr_manager import HRManager
 import utils.crud as crud
 import utils.schemas as schemas
 from utils.dependencies import async_db_session_dependency
-from sqlalchemy.ext.asyncio import AsyncSession
+from utils.helpers import decode_cursor, page_response, rows_response
 
 router = APIRouter(
     prefix="/interviews",
@@ -11,25 +13,39 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.InterviewResponse, status_code=status.HTTP_201_CREATED)
-async def create_interview(interview: schemas.InterviewCreate, db: AsyncSession = Depends(async_db_session_dependency)):
+async def create_interview(interview: schemas.InterviewCreate, db: async_db_session_dependency):
     try:
-        new_interview = await crud.create_interview(db, interview)
-        return new_interview
+        new_interview = await progress.create_interview(db, interview)
     except Exception as e:
         raise HTTPException(
             status_code=400,
             detail=f"Error creating interview: {str(e)}"
         )
+    # Warm the bank so the opening question is ready when the interview starts
+    if not await question_bank.count_questions(db, new_interview.job_id, new_interview.difficulty):
+        question_bank.schedule_refill(new_interview.job_id, [new_interview.difficulty])
+    return new_interview
 
-@router.get("/", response_model=List[schemas.InterviewResponse])
-async def get_interviews(db: AsyncSession = Depends(async_db_session_dependency), skip: int = 0, limit: int = 10):
+@router.get("/", response_model=Union[List[schemas.InterviewResponse], schemas.CursorPage[schemas.InterviewResponse]])
+async def get_interviews(db: async_db_session_dependency, skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
     """
     Fetch a list of interviews with optional pagination.
+    Passing `cursor` (empty for the first page) switches to keyset
+    pagination and returns `{"items": [...], "next_cursor": ...}`.
     """
-    return await crud.get_interviews(db, skip=skip, limit=limit)
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        rows, next_key = await crud.get_interviews_page(db, after, limit=limit, as_rows=True)
+        return page_response(rows, next_key)
+
+    rows = await crud.get_interviews(db, skip=skip, limit=limit, as_rows=True)
+    return rows_response(rows)
 
 @router.get("/{interview_id}", response_model=schemas.InterviewResponse)
-async def get_interview(interview_id: str, db: AsyncSession = Depends(async_db_session_dependency)):
+async def get_interview(interview_id: int, db: async_db_session_dependency):
     """
     Fetch a single interview by ID.
     """
@@ -39,35 +55,37 @@ async def get_interview(interview_id: str, db: AsyncSession = Depends(async_db_s
     return interview
 
 @router.get("/ctx/{interview_id}", response_model=schemas.InterviewContext)
-async def get_interview_context(interview_id: str, db: AsyncSession = Depends(async_db_session_dependency)):
+async def get_interview_context(interview_id: int, db: async_db_session_dependency):
     """
-    Fetch a single interview's context by ID.
+    Fetch a single interview's context (with its user, job and statements) by ID.
     """
-    interview = await crud.get_interview_by_id(db, interview_id)
-    if not interview:
+    interview_ctx = await HRManager.load_conversation_context(db, interview_id)
+    if not interview_ctx:
         raise HTTPException(status_code=404, detail="Interview not found")
-    return interview
+    return interview_ctx
 
 @router.patch("/{interview_id}", response_model=schemas.InterviewResponse)
 async def update_interview(
-    interview_id: str,
+    interview_id: int,
     interview_update: schemas.InterviewUpdate,
-    db: AsyncSession = Depends(async_db_session_dependency)
+    db: async_db_session_dependency
 ):
     """
     Update an interview's details by its ID.
     """
-    updated_interview = await crud.update_interview(db, interview_id, interview_update)
+    updated_interview = await progress.update_interview(db, interview_id, interview_update)
     if not updated_interview:
         raise HTTPException(status_code=404, detail="Interview not found")
+    await context_cache.invalidate(interview_id)
     return updated_interview
 
 @router.delete("/{interview_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_interview(interview_id: str, db: AsyncSession = Depends(async_db_session_dependency)):
+async def delete_interview(interview_id: int, db: async_db_session_dependency):
     """
     Delete an interview by its ID.
     """
-    deleted = await crud.delete_interview(db, interview_id)
+    deleted = await progress.delete_interview(db, interview_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Interview not found")
+    await context_cache.invalidate(interview_id)
     return {"message": "Interview deleted successfully"}
\ No newline at end of file
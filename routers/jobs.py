@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional, Union
+from services import progress, question_bank
 import utils.crud as crud
 import utils.schemas as schemas
-from utils.dependencies import get_async_db_session
+from utils.dependencies import async_db_session_dependency
+from utils.helpers import decode_cursor, page_response, rows_response
 
 router = APIRouter(
     prefix="/jobs",
@@ -11,30 +12,43 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.JobDetails, status_code=status.HTTP_201_CREATED)
-async def create_job(job: schemas.JobCreate, db: AsyncSession = Depends(get_async_db_session)):
+async def create_job(job: schemas.JobCreate, db: async_db_session_dependency):
     try:
         new_job = await crud.create_job(db, job)
-        return new_job
     except Exception as e:
         raise HTTPException(
             status_code=400,
             detail=f"Error creating job: {str(e)}"
         )
+    question_bank.schedule_refill(new_job.id)
+    return new_job
 
-@router.get("/", response_model=List[schemas.JobDetails])
+@router.get("/", response_model=Union[List[schemas.JobDetails], schemas.CursorPage[schemas.JobDetails]])
 async def get_jobs(
-    db: AsyncSession = Depends(get_async_db_session),
+    db: async_db_session_dependency,
     skip: int = 0, 
     limit: int = 10, 
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
     Fetch a list of jobs with optional pagination and search.
+    Passing `cursor` (empty for the first page) switches to keyset
+    pagination and returns `{"items": [...], "next_cursor": ...}`.
     """
-    return await crud.get_jobs(db, skip=skip, limit=limit, search=search)
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        rows, next_key = await crud.get_jobs_page(db, after, limit=limit, search=search, as_rows=True)
+        return page_response(rows, next_key)
+
+    rows = await crud.get_jobs(db, skip=skip, limit=limit, search=search, as_rows=True)
+    return rows_response(rows)
 
 @router.get("/{job_id}", response_model=schemas.JobDetails)
-async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db_session)):
+async def get_job(job_id: int, db: async_db_session_dependency):
     """
     Fetch a single job by ID using the CRUD function.
     """
@@ -47,22 +61,25 @@ async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db_session))
 async def update_job(
     job_id: int, 
     job_update: schemas.JobUpdate, 
-    db: AsyncSession = Depends(get_async_db_session)
+    db: async_db_session_dependency
 ):
     """
-    Update a job's details by its ID using the CRUD function.
+    Update a job's details by its ID using the CRUD function. Changes to
+    what the interviewer is prompted with queue a question bank refill.
     """
-    updated_job = await crud.update_job(db, job_id, job_update)
+    updated_job = await progress.update_job(db, job_id, job_update)
     if not updated_job:
         raise HTTPException(status_code=404, detail="Job not found")
+    if question_bank.prompt_changed(job_update):
+        question_bank.schedule_refill(job_id)
     return updated_job
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_job(job_id: int, db: AsyncSession = Depends(get_async_db_session)):
+async def delete_job(job_id: int, db: async_db_session_dependency):
     """
     Delete a job by its ID using the CRUD function.
     """
-    deleted = await crud.delete_job(db, job_id)
+    deleted = await progress.delete_job(db, job_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Job not found")
     return {"message": "Job deleted successfully"}
\ No newline at end of file
@@ -1,37 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, status
+from pydantic import ValidationError
+from datetime import datetime
+from typing import List, Optional, Union
+import orjson
+from services import context_cache
 import utils.crud as crud
 import utils.schemas as schemas
 from utils.dependencies import async_db_session_dependency
+from utils.helpers import PayloadTooLarge, decode_cursor, iter_json_records, page_response, rows_response
 
 router = APIRouter(
     prefix="/statements",
     tags=["statements"]
 )
 
+# Upper bounds on one bulk request; either body form is decoded record by
+# record as it arrives, so the byte cap bounds work, not memory
+BULK_MAX_STATEMENTS = 5000
+BULK_MAX_BYTES = 16 * 1024 * 1024
+
 @router.post("/", response_model=schemas.StatementResponse, status_code=status.HTTP_201_CREATED)
-def create_statement(statement: schemas.StatementCreate, db: async_db_session_dependency):
+async def create_statement(statement: schemas.StatementCreate, db: async_db_session_dependency):
     try:
-        new_statement = crud.create_statement(db, statement)
-        return new_statement
+        new_statement = await crud.create_statement(db, statement)
     except Exception as e:
         raise HTTPException(
             status_code=400,
             detail=f"Error creating statement: {str(e)}"
         )
+    await context_cache.append_statement(new_statement.interview_id, context_cache.serialize_statement(new_statement))
+    return new_statement
+
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.StatementBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": schemas.StatementBulkCreate.model_json_schema()}},
+                "application/x-ndjson": {"schema": schemas.StatementBulkCreate.model_json_schema()},
+            },
+        }
+    },
+)
+async def create_statements_bulk(request: Request, db: async_db_session_dependency):
+    """
+    Create many statements at once, e.g. when replaying an interview transcript.
+    Accepts a JSON array or newline-delimited JSON, read as a stream; bodies
+    over BULK_MAX_BYTES are rejected with 413 while still arriving.
+    `replies_index` links a statement to an earlier one in the same batch.
+    """
+    statements = []
+    try:
+        async for record in iter_json_records(request.stream(), max_bytes=BULK_MAX_BYTES):
+            statement = schemas.StatementBulkCreate.model_validate(record)
+            position = len(statements)
+            if statement.replies_index is not None and not 0 <= statement.replies_index < position:
+                raise ValueError(f"Statement {position}: replies_index must point to an earlier statement in the batch")
+            statements.append(statement)
+            if len(statements) > BULK_MAX_STATEMENTS:
+                raise ValueError(f"At most {BULK_MAX_STATEMENTS} statements per request")
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except (orjson.JSONDecodeError, ValidationError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid bulk payload: {str(e)}"
+        )
 
+    try:
+        ids = await crud.create_statements_bulk(db, statements)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Error creating statements: {str(e)}"
+        )
+    # Replayed transcripts may not sort after what is already cached
+    await context_cache.invalidate(*{statement.interview_id for statement in statements})
+    return {"ids": ids}
 
-@router.get("/", response_model=List[schemas.StatementResponse])
-async def get_statements(skip: int = 0, limit: int = 10, db: AsyncSession = Depends(async_db_session_dependency)):
+@router.get("/", response_model=Union[List[schemas.StatementResponse], schemas.CursorPage[schemas.StatementResponse]])
+async def get_statements(db: async_db_session_dependency, skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
     """
     Fetch a list of statements with optional pagination.
+    Passing `cursor` (empty for the first page) switches to keyset
+    pagination in (timestamp, id) order and returns
+    `{"items": [...], "next_cursor": ...}`.
     """
-    return await crud.get_statements(db, skip=skip, limit=limit)
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, datetime.fromisoformat, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        rows, next_key = await crud.get_statements_page(db, after, limit=limit, as_rows=True)
+        return page_response(rows, next_key)
+
+    rows = await crud.get_statements(db, skip=skip, limit=limit, as_rows=True)
+    return rows_response(rows)
 
 
 @router.get("/{statement_id}", response_model=schemas.StatementResponse)
-async def get_statement(statement_id: str, db: AsyncSession = Depends(async_db_session_dependency)):
+async def get_statement(statement_id: int, db: async_db_session_dependency):
     """
     Fetch a single statement by ID.
     """
@@ -43,9 +116,9 @@ async def get_statement(statement_id: str, db: AsyncSession = Depends(async_db_s
 
 @router.patch("/{statement_id}", response_model=schemas.StatementResponse)
 async def update_statement(
-    statement_id: str,
+    statement_id: int,
     statement_update: schemas.StatementUpdate,
-    db: AsyncSession = Depends(async_db_session_dependency)
+    db: async_db_session_dependency
 ):
     """
     Update a statement's details by its ID.
@@ -53,15 +126,17 @@ async def update_statement(
     updated_statement = await crud.update_statement(db, statement_id, statement_update)
     if not updated_statement:
         raise HTTPException(status_code=404, detail="Statement not found")
+    await context_cache.invalidate(updated_statement.interview_id)
     return updated_statement
 
 
 @router.delete("/{statement_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_statement(statement_id: str, db: async_db_session_dependency):
+async def delete_statement(statement_id: int, db: async_db_session_dependency):
     """
     Delete a statement by its ID.
     """
-    deleted = crud.delete_statement(db, statement_id)
-    if not deleted:
+    interview_id = await crud.delete_statement_returning(db, statement_id)
+    if interview_id is None:
         raise HTTPException(status_code=404, detail="Statement not found")
+    await context_cache.invalidate(interview_id)
     return {"message": "Statement deleted successfully"}
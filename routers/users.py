@@ -1,16 +1,22 @@
+from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi import status
+from services.password_hasher import password_hasher
 from utils import crud, schemas
-from utils.dependencies import async_db_session_dependency, user_dependency
+from utils.dependencies import async_db_session_dependency
+from routers.auth import get_current_user
 
 router = APIRouter(
     prefix="/users",
     tags=["users"]
 )
+
+user_dependency = Annotated[dict, Depends(get_current_user)]
+
 #  ---- User CRUD ------
 @router.post("/users/", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(user: schemas.UserCreate, db: async_db_session_dependency):
-    db_user = await crud.create_user(db, user)
+    db_user = await crud.create_user(db, user, hashed_password=await password_hasher.hash(user.password))
     if not db_user:
         raise HTTPException(status_code=400, detail="User already exists")
     return db_user
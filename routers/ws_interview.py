@@ -1,11 +1,20 @@
 from datetime import datetime
-import json
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+import time
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
 
 import utils.crud as crud
 from utils.dependencies import async_db_session_dependency
 from sqlalchemy.ext.asyncio import AsyncSession
+from config import config
+from routers.auth import resolve_token
 from services.hr_manager import HRManager
+from services.interview_session import InterviewSession
+from services.logger import logger
+from services.metrics import ws_message_duration
+from services.speech import AudioTurn, transcriber
+from services.tts import SpeechStream, synthesizer
 
 router = APIRouter(
     prefix="/ws",
@@ -14,36 +23,129 @@ router = APIRouter(
 
 hr_manager = HRManager()
 
+INPUT_TYPES = ["text", "audio", "video", "transcript", "audio_end"]
+# Binary frames carry spoken answers as 16-bit mono PCM
+AUDIO_CHUNK = "audio_chunk"
+
 @router.websocket("/simulate-interview/{interview_id}")
-async def interview_simulate(websocket: WebSocket, interview_id: int, mode: str = "text"):
+async def interview_simulate(websocket: WebSocket, interview_id: int, mode: str = "text", token: Optional[str] = None):
+    """
+    Run an interview over a WebSocket. With `mode=audio` the AI's replies
+    are also sent as speech: an `audio` JSON frame, then the audio itself
+    as a binary frame, per sentence.
+    """
+    # Browsers cannot set headers on a WebSocket, so the JWT comes as a query param
+    if token is not None:
+        try:
+            await resolve_token(token)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
     await websocket.accept()
+
+    async def send(frame: dict):
+        await websocket.send_text(orjson.dumps(frame).decode())
+
+    session = await InterviewSession.open(interview_id)
+    if session is None:
+        await send({"error": "Interview not found"})
+        await websocket.close()
+        return
+
+    route_path = websocket.scope["route"].path
+    audio_turn = None
+    # In audio mode the AI's replies are also spoken, sentence by sentence
+    speaker = SpeechStream(send, websocket.send_bytes, synthesizer, persona=session.context.get("hr_ai", "")) if mode == "audio" else None
+
+    async def reply(frame: dict):
+        await send(frame)
+        if speaker:
+            speaker.relay(frame)
+
     try:
+        try:
+            opening = await hr_manager.open_interview(session)
+        except Exception as e:
+            logger.error(f"Could not open interview {interview_id}: {e}")
+            opening = {"error": "Could not get the first question"}
+        if opening:
+            await reply(opening)
+
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
-            
-            input_type = message.get("type")
-            role = message.get("role")
-            content = message.get("content")
-            
-            if input_type not in ["text", "audio", "video", "transcript"]:
-                await websocket.send_text(json.dumps({"error": "Invalid input type"}))
-                continue
-
-            interview_ctx = await hr_manager.get_conversation_context(interview_id)
-
-            if input_type == "text":
-                response = await hr_manager.process_text_input(content, interview_ctx)
-            elif input_type == "audio":
-                response = await hr_manager.process_audio_input(content, interview_ctx)
-            elif input_type == "video":
-                response = await hr_manager.process_video_input(content, interview_ctx)
-            elif input_type == "transcript":
-                response = await hr_manager.process_transcript_input(content, interview_ctx)
-            else:
-                response = {"error": "Invalid input type"}
-
-            await websocket.send_text(json.dumps(response))
+            data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(data.get("code", status.WS_1000_NORMAL_CLOSURE))
+            # Handling time of one message, from receipt to its last frame sent
+            start = time.perf_counter_ns()
+            input_type = None
+            try:
+                if data.get("bytes") is not None:
+                    input_type = AUDIO_CHUNK
+                    if len(data["bytes"]) > config.AUDIO_MAX_CHUNK_BYTES:
+                        await send({"error": "Audio chunk too large"})
+                        continue
+                    if audio_turn is None:
+                        audio_turn = AudioTurn(send, transcriber)
+                    # Partial and segment transcripts are sent as they are ready
+                    await audio_turn.feed(data["bytes"])
+                    continue
+
+                message = orjson.loads(data["text"])
+
+                input_type = message.get("type")
+                role = message.get("role")
+                content = message.get("content")
+
+                if input_type not in INPUT_TYPES:
+                    await send({"error": "Invalid input type"})
+                    continue
+
+                # Replies to text are streamed token by token, then a final frame
+                if input_type in ["text", "transcript", "audio"]:
+                    if input_type == "text":
+                        stream_input = hr_manager.stream_text_input
+                    elif input_type == "transcript":
+                        stream_input = hr_manager.stream_transcript_input
+                    else:
+                        stream_input = hr_manager.stream_audio_input
+                    async for frame in stream_input(content, session):
+                        await reply(frame)
+                    continue
+
+                # The candidate stopped talking: answer the whole spoken turn
+                if input_type == "audio_end":
+                    answer = await audio_turn.finish() if audio_turn else ""
+                    if not answer:
+                        await send({"error": "No speech detected"})
+                        continue
+                    async for frame in hr_manager.stream_transcript_input(answer, session):
+                        await reply(frame)
+                    continue
+
+                if input_type == "video":
+                    response = await hr_manager.process_video_input(content, session)
+                else:
+                    response = {"error": "Invalid input type"}
+
+                await send(response)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                # A failed LLM or speech call ends this message, not the interview
+                logger.error(f"Could not handle {input_type} message for interview {interview_id}: {e}")
+                if speaker:
+                    speaker.abort()
+                await send({"error": "Could not handle the message, please try again"})
+            finally:
+                label = input_type if input_type in INPUT_TYPES or input_type == AUDIO_CHUNK else "invalid"
+                ws_message_duration.record(time.perf_counter_ns() - start, route_path, label)
 
     except WebSocketDisconnect:
         print("Client disconnected")
+    finally:
+        if audio_turn:
+            audio_turn.close()
+        if speaker:
+            speaker.close()
+        await session.close(config.SESSION_CLOSE_SECONDS)
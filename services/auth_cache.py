@@ -0,0 +1,120 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, select
+
+from config import config
+from services.database import AsyncSessionLocal
+import utils.models as models
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class VerifiedTokenCache:
+    """
+    LRU of JWTs that already passed signature verification, keyed by the
+    token's digest so raw tokens are not kept in memory. An entry never
+    outlives the token's own `exp` claim.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = token_digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def set(self, token: str, claims: dict, expires_at: float):
+        key = token_digest(token)
+        self._entries[key] = (claims, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses, "expired": self.expired}
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of the user fields authorization needs (id, username,
+    role). Entries are dropped when the user row changes in this process;
+    the TTL bounds staleness across processes.
+    """
+
+    def __init__(self, ttl: float = 60, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int) -> Optional[dict]:
+        """
+        The user's principal, loaded from the database on a miss. None if
+        the user no longer exists.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.User.id, models.User.username, models.User.role).where(models.User.id == user_id)
+            )
+            row = result.first()
+        if row is None:
+            self._entries.pop(user_id, None)
+            return None
+
+        principal = {"id": row.id, "username": row.username, "role": row.role.value if row.role else None}
+        self._entries[user_id] = (principal, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+token_cache = VerifiedTokenCache(maxsize=config.TOKEN_CACHE_SIZE)
+principal_cache = PrincipalCache(ttl=config.PRINCIPAL_CACHE_TTL, maxsize=config.PRINCIPAL_CACHE_SIZE)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
@@ -0,0 +1,307 @@
+from dataclasses import dataclass
+from itertools import chain
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import config
+from services import context_cache, progress
+from services.logger import logger
+import utils.models as models
+
+DIMENSIONS = ("communication", "technical", "problem_solving")
+TAG_KINDS = ("strengths", "weaknesses")
+PERCENTILES = (50, 90)
+
+
+@dataclass
+class AnswerBatch:
+    """
+    Answer scores of many interviews, one entry per answer, grouped by
+    interview in the order the answers were scored.
+    """
+    interview_ids: np.ndarray  # (answers,) int64
+    scores: np.ndarray  # (answers,) float64
+    dimensions: np.ndarray  # (answers, len(DIMENSIONS)) float64, NaN where not scored
+    tags: dict  # kind -> list of tag lists, one per answer
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "AnswerBatch":
+        """
+        Build a batch from (interview_id, score, dimensions, strengths,
+        weaknesses) rows, in answer order within each interview.
+        """
+        rows = list(rows)
+        dimensions = np.full((len(rows), len(DIMENSIONS)), np.nan)
+        for index, row in enumerate(rows):
+            for column, name in enumerate(DIMENSIONS):
+                value = (row[2] or {}).get(name)
+                if value is not None:
+                    dimensions[index, column] = value
+        batch = cls(
+            interview_ids=np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            scores=np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows)),
+            dimensions=dimensions,
+            tags={kind: [row[3 + offset] or [] for row in rows] for offset, kind in enumerate(TAG_KINDS)},
+        )
+        # Group by interview, keeping answer order within each one
+        order = np.argsort(batch.interview_ids, kind="stable")
+        if np.any(order != np.arange(len(order))):
+            batch = cls(
+                interview_ids=batch.interview_ids[order],
+                scores=batch.scores[order],
+                dimensions=batch.dimensions[order],
+                tags={kind: [tags[index] for index in order] for kind, tags in batch.tags.items()},
+            )
+        return batch
+
+
+@dataclass
+class BatchScores:
+    """
+    Per-interview results of `score_batch`, aligned with `interview_ids`,
+    plus the decayed running score after each answer.
+    """
+    interview_ids: np.ndarray  # (interviews,)
+    answers: np.ndarray  # (interviews,) answers per interview
+    total: np.ndarray  # (interviews,) sum of answer scores
+    points: np.ndarray  # (interviews,) sum of answer_points(), as Interview.current_score
+    mean: np.ndarray  # (interviews,)
+    decayed: np.ndarray  # (interviews,) recency-weighted mean
+    running: np.ndarray  # (answers,) decayed mean up to and including each answer
+    percentiles: np.ndarray  # (len(PERCENTILES), interviews)
+    dimension_means: np.ndarray  # (interviews, len(DIMENSIONS)), NaN where never scored
+    dimension_percentiles: np.ndarray  # (len(PERCENTILES), interviews, len(DIMENSIONS))
+    insights: list  # per interview {"strengths": [...], "weaknesses": [...]}, most frequent first
+
+
+def answer_points(score: float) -> int:
+    """
+    What one answer adds to Interview.current_score.
+    """
+    return int(round(score))
+
+
+def merge_insights(insights: Optional[dict], new: dict) -> dict:
+    """
+    `insights` with one more answer's tags added after them, skipping tags
+    already there (case-insensitively), as each answer is scored.
+    """
+    merged = dict(insights or {})
+    for kind in TAG_KINDS:
+        tags = list(merged.get(kind) or [])
+        seen = {tag.strip().casefold() for tag in tags}
+        for tag in new.get(kind) or []:
+            key = tag.strip().casefold()
+            if key and key not in seen:
+                seen.add(key)
+                tags.append(tag.strip())
+        merged[kind] = tags
+    return merged
+
+
+def _group_cumsum(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Cumulative sums restarting at each group.
+    """
+    totals = np.cumsum(values, axis=0)
+    offsets = np.concatenate((np.zeros((1,) + values.shape[1:]), totals))[starts]
+    return totals - np.repeat(offsets, counts, axis=0)
+
+
+def group_percentiles(values: np.ndarray, group: np.ndarray, groups: int, percentiles: Sequence[float] = PERCENTILES) -> np.ndarray:
+    """
+    Percentiles of `values` within each group, ignoring NaN, with the same
+    linear interpolation as np.percentile. NaN for groups with no values.
+    """
+    valid = ~np.isnan(values)
+    values, group = values[valid], group[valid]
+    values = values[np.lexsort((values, group))]
+    counts = np.bincount(group, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = np.full((len(percentiles), groups), np.nan)
+    present = counts > 0
+    for row, percentile in enumerate(percentiles):
+        rank = (counts[present] - 1) * (percentile / 100)
+        low = np.floor(rank).astype(np.int64)
+        high = np.ceil(rank).astype(np.int64)
+        fraction = rank - low
+        base = starts[present]
+        result[row, present] = values[base + low] * (1 - fraction) + values[base + high] * fraction
+    return result
+
+
+def rank_tags(tag_lists: Sequence[Sequence[str]], group: np.ndarray, groups: int, limit: Optional[int] = None) -> list[list[str]]:
+    """
+    Each group's distinct tags (case-insensitively), most frequent first,
+    counting each tag once per answer; ties keep first-mentioned order.
+    """
+    flat = list(chain.from_iterable(tag_lists))
+    if not flat:
+        return [[] for _ in range(groups)]
+    # Code the distinct raw tags (few) once, then map every mention at C speed
+    raw = dict.fromkeys(flat)
+    vocabulary, names, canonical = {}, [], []
+    for index, tag in enumerate(raw):
+        raw[tag] = index
+        key = tag.strip().casefold()
+        if key and key not in vocabulary:
+            vocabulary[key] = len(names)
+            names.append(tag.strip())
+        canonical.append(vocabulary.get(key, -1))
+    codes = np.asarray(canonical, dtype=np.int64)[np.fromiter(map(raw.__getitem__, flat), dtype=np.int64, count=len(flat))]
+    owners = np.repeat(np.arange(len(tag_lists)), np.fromiter(map(len, tag_lists), dtype=np.int64, count=len(tag_lists)))
+    owners, codes = owners[codes >= 0], codes[codes >= 0]
+    if not len(codes):
+        return [[] for _ in range(groups)]
+
+    # One mention per answer, then count answers per (group, tag)
+    _, first_in_answer = np.unique(owners * len(names) + codes, return_index=True)
+    first_in_answer.sort()
+    codes, owners = codes[first_in_answer], owners[first_in_answer]
+    pairs, first_seen, mentions = np.unique(group[owners] * len(names) + codes, return_index=True, return_counts=True)
+    pair_groups, pair_codes = np.divmod(pairs, len(names))
+
+    order = np.lexsort((first_seen, -mentions, pair_groups))
+    pair_groups, pair_codes = pair_groups[order], pair_codes[order]
+    counts = np.bincount(pair_groups, minlength=groups)
+    if limit is not None:
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        keep = np.arange(len(pair_groups)) - np.repeat(starts, counts) < limit
+        pair_groups, pair_codes = pair_groups[keep], pair_codes[keep]
+        counts = np.minimum(counts, limit)
+    ranked = np.array(names, dtype=object)[pair_codes].tolist()
+    bounds = np.concatenate(([0], np.cumsum(counts))).tolist()
+    return [ranked[low:high] for low, high in zip(bounds, bounds[1:])]
+
+
+def score_batch(batch: AnswerBatch, decay: Optional[float] = None, percentiles: Sequence[float] = PERCENTILES, tag_limit: Optional[int] = None) -> BatchScores:
+    """
+    Every interview's total, mean, decayed and percentile scores, its mean
+    and percentile score per dimension, and its ranked insights.
+
+    With `decay` d, an answer k places before the latest weighs d**k, so
+    recent answers dominate the decayed score.
+    """
+    if decay is None:
+        decay = config.SCORE_DECAY
+    interview_ids, starts, counts = np.unique(batch.interview_ids, return_index=True, return_counts=True)
+    groups = len(interview_ids)
+    group = np.repeat(np.arange(groups), counts)
+    position = np.arange(len(group)) - starts[group]
+
+    total = np.bincount(group, weights=batch.scores, minlength=groups)
+    # np.round rounds half to even, like answer_points()
+    points = np.bincount(group, weights=np.round(batch.scores), minlength=groups)
+    mean = np.divide(total, counts, out=np.full(groups, np.nan), where=counts > 0)
+
+    # decay**(distance from the group's last answer); the running mean after
+    # answer i is the same ratio of prefix sums, since the shared factor cancels
+    weights = decay ** (counts[group] - 1 - position).astype(np.float64)
+    weighted = _group_cumsum(weights * batch.scores, starts, counts)
+    weight_sums = _group_cumsum(weights, starts, counts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        running = np.where(weight_sums > 0, weighted / weight_sums, batch.scores)
+    last = starts + counts - 1
+    decayed = running[last] if groups else np.zeros(0)
+
+    scored = ~np.isnan(batch.dimensions)
+    dimension_sums = np.stack(
+        [np.bincount(group, weights=np.where(scored[:, column], batch.dimensions[:, column], 0), minlength=groups) for column in range(len(DIMENSIONS))],
+        axis=-1,
+    ).reshape(groups, len(DIMENSIONS))
+    dimension_counts = np.stack(
+        [np.bincount(group, weights=scored[:, column], minlength=groups) for column in range(len(DIMENSIONS))],
+        axis=-1,
+    ).reshape(groups, len(DIMENSIONS))
+    dimension_means = np.divide(dimension_sums, dimension_counts, out=np.full_like(dimension_sums, np.nan), where=dimension_counts > 0)
+    dimension_percentiles = np.stack(
+        [group_percentiles(batch.dimensions[:, column], group, groups, percentiles) for column in range(len(DIMENSIONS))],
+        axis=-1,
+    ) if groups else np.full((len(percentiles), 0, len(DIMENSIONS)), np.nan)
+
+    ranked = {kind: rank_tags(batch.tags[kind], group, groups, tag_limit) for kind in TAG_KINDS}
+    return BatchScores(
+        interview_ids=interview_ids,
+        answers=counts,
+        total=total,
+        points=points,
+        mean=mean,
+        decayed=decayed,
+        running=running,
+        percentiles=group_percentiles(batch.scores, group, groups, percentiles),
+        dimension_means=dimension_means,
+        dimension_percentiles=dimension_percentiles,
+        insights=[{kind: ranked[kind][index] for kind in TAG_KINDS} for index in range(groups)],
+    )
+
+
+async def load_answers(db: AsyncSession, interview_ids: Optional[Sequence[int]] = None, chunk: int = 10_000) -> AnswerBatch:
+    """
+    Stored answer scores of the given interviews (all when None), read in
+    (interview_id, id) index order, `chunk` interviews per query.
+    """
+    answer = models.AnswerScore
+    stmt = select(answer.interview_id, answer.score, answer.dimensions, answer.strengths, answer.weaknesses)
+    stmt = stmt.order_by(answer.interview_id, answer.id)
+    if interview_ids is None:
+        result = await db.execute(stmt)
+        return AnswerBatch.from_rows(result.all())
+    rows = []
+    for offset in range(0, len(interview_ids), chunk):
+        result = await db.execute(stmt.where(answer.interview_id.in_(interview_ids[offset:offset + chunk])))
+        rows += result.all()
+    return AnswerBatch.from_rows(rows)
+
+
+async def load_current_scores(db: AsyncSession, interview_ids: Sequence[int], chunk: int = 10_000) -> np.ndarray:
+    """
+    Stored current_score of each interview, aligned with `interview_ids`.
+    """
+    stored = {}
+    for offset in range(0, len(interview_ids), chunk):
+        result = await db.execute(
+            select(models.Interview.id, models.Interview.current_score)
+            .where(models.Interview.id.in_(interview_ids[offset:offset + chunk]))
+        )
+        stored.update(result.tuples().all())
+    return np.fromiter((stored.get(interview_id) or 0 for interview_id in interview_ids), dtype=np.float64, count=len(interview_ids))
+
+
+async def rescore(db: AsyncSession, interview_ids: Optional[Sequence[int]] = None, chunk: int = 10_000) -> int:
+    """
+    Recompute current_score and insights of interviews from their stored
+    answer scores, then rebuild the progress rollups once. Returns how many
+    were updated.
+
+    Only interviews whose answer scores add up to at least their stored
+    current_score are eligible. A higher stored score holds points from
+    answers scored before answer scores were kept, which a rescore would
+    lose, so those interviews are left alone, as are interviews with no
+    stored answers.
+
+    Scores and insights are rebuilt the way HRManager.update_interview adds
+    each answer, so an interview whose answers did not change keeps them.
+    """
+    batch = await load_answers(db, interview_ids, chunk)
+    scores = score_batch(batch)
+    ids = scores.interview_ids.tolist()
+    insights = {}
+    for interview_id, *tags in zip(batch.interview_ids.tolist(), *(batch.tags[kind] for kind in TAG_KINDS)):
+        insights[interview_id] = merge_insights(insights.get(interview_id), dict(zip(TAG_KINDS, tags)))
+    eligible = scores.points >= await load_current_scores(db, ids, chunk)
+    rows = [
+        {"id": ids[index], "current_score": int(scores.points[index]), "insights": insights[ids[index]]}
+        for index in np.flatnonzero(eligible).tolist()
+    ]
+    if len(rows) < len(ids):
+        logger.warning(f"Rescore skipped {len(ids) - len(rows)} interviews scored partly before answer scores were stored")
+    for offset in range(0, len(rows), chunk):
+        await db.execute(update(models.Interview), rows[offset:offset + chunk])
+    # Bulk updates bypass the per-interview rollup hooks; rebuild commits
+    await progress.rebuild(db)
+    for offset in range(0, len(rows), chunk):
+        await context_cache.invalidate(*[row["id"] for row in rows[offset:offset + chunk]])
+    return len(rows)
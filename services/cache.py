@@ -0,0 +1,153 @@
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+from redis.exceptions import WatchError
+
+from config import config
+
+
+class LocalRedis:
+    """
+    In-process stand-in for the subset of the redis.asyncio API the app uses.
+    Used when REDIS_URL is not configured (local dev, tests). Values are
+    stored as bytes, like a real Redis client returns them.
+    """
+    def __init__(self):
+        self._data: dict[str, bytes] = {}
+        self._expires: dict[str, float] = {}
+        # Bumped on every write, for WATCH
+        self._versions: dict[str, int] = {}
+
+    def _touch(self, name: str):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _alive(self, name: str) -> bool:
+        expires_at = self._expires.get(name)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return name in self._data
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    async def get(self, name: str) -> Optional[bytes]:
+        return self._data.get(name) if self._alive(name) else None
+
+    async def set(self, name: str, value, ex: Optional[int] = None, nx: bool = False, keepttl: bool = False):
+        if nx and self._alive(name):
+            return None
+        self._touch(name)
+        self._data[name] = self._encode(value)
+        if ex is not None:
+            self._expires[name] = time.monotonic() + ex
+        elif not keepttl:
+            self._expires.pop(name, None)
+        return True
+
+    async def append(self, name: str, value) -> int:
+        current = self._data.get(name, b"") if self._alive(name) else b""
+        self._touch(name)
+        self._data[name] = current + self._encode(value)
+        return len(self._data[name])
+
+    async def expire(self, name: str, time_seconds: int, nx: bool = False) -> bool:
+        if not self._alive(name) or (nx and name in self._expires):
+            return False
+        self._expires[name] = time.monotonic() + time_seconds
+        return True
+
+    async def ttl(self, name: str) -> int:
+        if not self._alive(name):
+            return -2
+        if name not in self._expires:
+            return -1
+        return int(self._expires[name] - time.monotonic())
+
+    async def exists(self, *names: str) -> int:
+        return sum(1 for name in names if self._alive(name))
+
+    async def delete(self, *names: str) -> int:
+        removed = 0
+        for name in names:
+            if self._alive(name):
+                removed += 1
+                self._touch(name)
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return removed
+
+    async def ping(self) -> bool:
+        return True
+
+    async def flushall(self):
+        self._data.clear()
+        self._expires.clear()
+
+    def pipeline(self, transaction: bool = True) -> "LocalPipeline":
+        return LocalPipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class LocalPipeline:
+    """
+    Queues LocalRedis commands and runs them back to back on execute().
+    As in redis-py, after watch() commands run at once until multi(), and
+    execute() raises WatchError if a watched key was written since.
+    """
+    def __init__(self, client: LocalRedis):
+        self._client = client
+        self._commands = []
+        self._watched: Optional[dict[str, int]] = None
+        self._immediate = False
+
+    async def watch(self, *names: str):
+        self._watched = {name: self._client._versions.get(name, 0) for name in names}
+        self._immediate = True
+
+    def multi(self):
+        self._immediate = False
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+        if self._immediate:
+            return method
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        watched, self._watched = self._watched, None
+        if watched and any(self._client._versions.get(name, 0) != version for name, version in watched.items()):
+            raise WatchError("Watched variable changed.")
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._commands = []
+        self._watched = None
+        self._immediate = False
+
+
+def create_redis_client():
+    """
+    Shared Redis client for the process, or the local stand-in when no
+    REDIS_URL is configured.
+    """
+    if config.REDIS_URL:
+        return redis.Redis.from_url(config.REDIS_URL, max_connections=config.REDIS_MAX_CONNECTIONS)
+    return LocalRedis()
+
+
+redis_client = create_redis_client()
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+import orjson
+from redis.exceptions import RedisError, WatchError
+
+from config import config
+from services.cache import redis_client
+from services.logger import logger
+import utils.schemas as schemas
+
+# Cached contexts are newline-delimited orjson: the first line holds the
+# interview, user and job; every following line is one statement. New
+# statements are added with a single APPEND instead of rewriting the entry.
+CONTEXT_KEY = "interview:{interview_id}:context"
+
+DEFAULT_DURATION = timedelta(minutes=30)
+
+
+def context_key(interview_id: int) -> str:
+    return CONTEXT_KEY.format(interview_id=interview_id)
+
+
+def context_ttl(duration: Optional[timedelta]) -> int:
+    """
+    Keep a context around for the length of the interview plus a grace period.
+    """
+    return int((duration or DEFAULT_DURATION).total_seconds()) + config.CONTEXT_CACHE_GRACE_SECONDS
+
+
+def serialize_statement(statement) -> dict:
+    """
+    JSON-ready form of a Statement row, as stored in the cached context.
+    """
+    return schemas.StatementResponse.model_validate(statement).model_dump(mode="json")
+
+
+async def get_context(interview_id: int) -> Optional[dict]:
+    """
+    Return the cached context for an interview, or None on a miss.
+    """
+    try:
+        raw = await redis_client.get(context_key(interview_id))
+    except (RedisError, OSError) as e:
+        logger.warning(f"Context cache read failed for interview {interview_id}: {e}")
+        return None
+    if not raw:
+        return None
+
+    header, *lines = raw.split(b"\n")
+    if not header:
+        # Statements appended after the entry expired; rebuild from the DB
+        return None
+    context = orjson.loads(header)
+    context["statements"] = [orjson.loads(line) for line in lines if line]
+    return context
+
+
+def _encode(context: dict) -> bytes:
+    header = {field: value for field, value in context.items() if field != "statements"}
+    return b"\n".join([orjson.dumps(header), *(orjson.dumps(statement) for statement in context["statements"])])
+
+
+async def set_context(context: dict, ttl: int):
+    """
+    Store a full context, replacing any existing entry.
+    """
+    try:
+        await redis_client.set(context_key(context["id"]), _encode(context), ex=ttl)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Context cache write failed for interview {context['id']}: {e}")
+
+
+async def rebuild_context(interview_id: int, load: Callable[[], Awaitable[Optional[tuple[dict, int]]]]) -> Optional[dict]:
+    """
+    Load a context after a miss with `load()`, which returns it with its TTL,
+    and cache it without losing a statement appended in the meantime.
+
+    An empty (headless) entry is placed first, so statements appended while
+    loading land in it and are merged into the loaded copy, which replaces
+    it only if nothing changed since. An invalidation while loading drops
+    the entry, and the loaded copy, possibly stale, is then not cached.
+    """
+    key = context_key(interview_id)
+    try:
+        await redis_client.set(key, b"", ex=config.CONTEXT_CACHE_GRACE_SECONDS, nx=True)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Context cache write failed for interview {interview_id}: {e}")
+    loaded = await load()
+    if loaded is None:
+        return None
+    context, ttl = loaded
+
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            await pipe.watch(key)
+            raw = await pipe.get(key)
+            if raw is None or (raw and not raw.startswith(b"\n")):
+                # Invalidated, or already rebuilt by someone else
+                return context
+            known = {statement["id"] for statement in context["statements"]}
+            appended = [orjson.loads(line) for line in raw.split(b"\n") if line]
+            context["statements"] += [statement for statement in appended if statement.get("id") not in known]
+            pipe.multi()
+            pipe.set(key, _encode(context), ex=ttl)
+            await pipe.execute()
+    except WatchError:
+        # Changed between the read and the write; the next read rebuilds
+        pass
+    except (RedisError, OSError) as e:
+        logger.warning(f"Context cache write failed for interview {interview_id}: {e}")
+    return context
+
+
+async def append_statement(interview_id: int, statement: dict):
+    """
+    Add one statement to a cached context with a single APPEND round trip.
+    """
+    await append_statements(interview_id, [statement])
+
+
+async def append_statements(interview_id: int, statements: list[dict]):
+    """
+    Add statements, in order, to a cached context with a single APPEND.
+    """
+    if not statements:
+        return
+    key = context_key(interview_id)
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.append(key, b"".join(b"\n" + orjson.dumps(statement) for statement in statements))
+            # Only applies when APPEND created a fresh (headless) key
+            pipe.expire(key, config.CONTEXT_CACHE_GRACE_SECONDS, nx=True)
+            await pipe.execute()
+    except (RedisError, OSError) as e:
+        logger.warning(f"Context cache append failed for interview {interview_id}: {e}")
+        await invalidate(interview_id)
+
+
+async def invalidate(*interview_ids: int):
+    """
+    Drop cached contexts so the next read rebuilds them from the database.
+    """
+    if not interview_ids:
+        return
+    try:
+        await redis_client.delete(*(context_key(interview_id) for interview_id in interview_ids))
+    except (RedisError, OSError) as e:
+        logger.warning(f"Context cache invalidation failed for interviews {interview_ids}: {e}")
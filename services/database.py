@@ -1,21 +1,142 @@
+import time
+from typing import AsyncGenerator
 
-import databases
-import sqlalchemy
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import config
+from utils.models import Base
 
-metadata = sqlalchemy.MetaData()
+metadata = Base.metadata
 
+# Sync driver names mapped to their async counterparts
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+class PoolStats:
+    """
+    Running checkout counters for the shared engine pool.
+    """
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ns_total = 0
+        self.wait_ns_max = 0
+
+    def record(self, wait_ns: int):
+        self.checkouts += 1
+        self.wait_ns_total += wait_ns
+        if wait_ns > self.wait_ns_max:
+            self.wait_ns_max = wait_ns
+
+    def reset(self):
+        self.__init__()
 
-engine = sqlalchemy.create_engine(
-    config.DATABASE_URL, connect_args={"check_same_thread: False"}
-    )
 
+pool_stats = PoolStats()
 
 
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection.
+    """
+    def _do_get(self):
+        start = time.perf_counter_ns()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record(time.perf_counter_ns() - start)
 
-metadata.create_all(engine)
 
-database = databases.Database(
-    config.DATABASE_URL, force_rollback=config.DB_FORCE_ROLLBACK
+def async_database_url(url: str) -> URL:
+    """
+    Rewrite a configured database URL to use its asyncio driver.
+    """
+    db_url = make_url(url)
+    return db_url.set(drivername=ASYNC_DRIVERS.get(db_url.drivername, db_url.drivername))
+
+
+def engine_options(db_url: URL) -> dict:
+    """
+    Build create_async_engine() keyword arguments for the given URL.
+    In-memory SQLite keeps its single static connection.
+    """
+    options = {}
+    if db_url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if db_url.database in (None, "", ":memory:"):
+            return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+DATABASE_URL = async_database_url(config.DATABASE_URL)
+
+async_engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
 )
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Request-scoped session drawn from the shared engine pool.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def init_models():
+    """
+    Create any missing tables. Alembic owns schema changes; this only
+    bootstraps fresh development databases.
+    """
+    async with async_engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+
+def pool_status() -> dict:
+    """
+    Snapshot of pool occupancy and checkout latency for sizing per worker.
+    """
+    pool = async_engine.pool
+    status = {
+        "pool": type(pool).__name__,
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "avg_wait_ms": (pool_stats.wait_ns_total / pool_stats.checkouts / 1e6) if pool_stats.checkouts else 0.0,
+        "max_wait_ms": pool_stats.wait_ns_max / 1e6,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = pool.size() + config.DB_MAX_OVERFLOW
+        status.update(
+            size=pool.size(),
+            max_overflow=config.DB_MAX_OVERFLOW,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            saturation=pool.checkedout() / capacity if capacity else 0.0,
+        )
+    return status
@@ -1 +1,503 @@
+import asyncio
+import base64
+import binascii
+import importlib
+import sys
+from io import BytesIO
+from typing import TYPE_CHECKING, AsyncIterator, Optional
 
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import config
+from services import batch_scoring, context_cache, progress, question_bank
+from services.database import AsyncSessionLocal
+from services.job_queue import KeyedJobQueue
+from services.llm_cache import TwoTierCache, prompt_key
+from services.logger import logger
+import utils.crud as crud
+import utils.schemas as schemas
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+# langchain, the OpenAI client, httpx and the speech libraries take seconds
+# to import, so they load on first use (or during services.warmup) instead
+# of with this module. They are still module attributes and can be patched.
+LAZY_IMPORTS = {
+    "AIMessage": "langchain_core.messages",
+    "HumanMessage": "langchain_core.messages",
+    "SystemMessage": "langchain_core.messages",
+    "ChatOpenAI": "langchain_openai",
+    "llm_http": "services.llm_client",
+    "FakeStreamingChatModel": "services.fake_llm",
+    "gTTS": "gtts",
+    "AudioFile": "speech_recognition",
+    "Recognizer": "speech_recognition",
+}
+
+
+def __getattr__(name: str):
+    if name not in LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(LAZY_IMPORTS[name]), name)
+    return value
+
+
+# Attribute lookups through the module object reach __getattr__; bare
+# global names inside functions would not
+_lazy = sys.modules[__name__]
+
+
+def preload(*names: str):
+    """
+    Import the lazily loaded names now (all of them by default).
+    """
+    for name in names or LAZY_IMPORTS:
+        getattr(_lazy, name)
+
+
+INTERVIEWER_PROMPT = (
+    "You are {hr_ai}, an HR interviewer running a {difficulty} mock interview "
+    "for the role of {title}.\n"
+    "Job description: {description}\n"
+    "Requirements: {requirements}\n"
+    "Ask one question at a time, follow up on the candidate's answers and keep "
+    "your replies short and conversational."
+)
+
+NEXT_QUESTION_PROMPT = (
+    "Ask the candidate your next interview question. If the interview has not "
+    "started yet, greet them briefly and ask an opening question. Reply with "
+    "the question only."
+)
+
+QUESTION_SET_PROMPT = (
+    "Write {count} distinct opening questions for this interview, varied in "
+    "topic. Reply with JSON only, shaped as "
+    '{{"questions": ["...", "..."]}}.'
+)
+
+SCORING_PROMPT = (
+    "You are assessing a candidate in a {difficulty} mock interview for the role "
+    "of {title}.\n"
+    "Score the candidate's latest answer from 0 to 10 and list its strengths and "
+    "weaknesses as short phrases. Also score it from 0 to 10 on communication, "
+    "technical knowledge and problem solving. Reply with JSON only, shaped as "
+    '{{"score": <number>, "insights": {{"strengths": [...], "weaknesses": [...]}}, '
+    '"dimensions": {{"communication": <number>, "technical": <number>, "problem_solving": <number>}}}}.'
+)
+
+# How long a final reply frame waits for its statement to be stored
+STORE_TIMEOUT_SECONDS = 5.0
+
+
+class AIResponse(BaseModel):
+    score: float
+    insights: dict = Field(default_factory=lambda: {"strengths": [], "weaknesses": []})
+    dimensions: dict[str, float] = Field(default_factory=dict)
+
+
+class QuestionSet(BaseModel):
+    questions: list[str]
+
+
+class HRManager:
+    """
+    The AI interviewer: keeps each interview's conversation context and
+    drives the question/answer flow over the WebSocket.
+    """
+
+    @staticmethod
+    async def load_conversation_context(db: AsyncSession, interview_id: int) -> Optional[schemas.InterviewContext]:
+        """
+        Build an interview's full context (interview, user, job and statements)
+        from the database, in two queries.
+        """
+        interview = await crud.get_interview_context(db, interview_id)
+        if not interview:
+            return None
+        user, job, statements = interview.user, interview.job, interview.statements
+
+        return schemas.InterviewContext(
+            id=interview.id,
+            hr_ai=interview.hr_ai,
+            status=interview.status,
+            user_id=interview.user_id,
+            user=schemas.UserPublic(
+                id=user.id,
+                username=user.username,
+                email=user.email,
+                role=user.role.value if user.role else None,
+            ),
+            job_id=interview.job_id,
+            job=schemas.JobDetails.model_validate(job),
+            difficulty=interview.difficulty,
+            duration=interview.duration,
+            start_time=interview.start_time,
+            end_time=interview.end_time,
+            current_score=interview.current_score or 0,
+            insights=interview.insights or {"strengths": [], "weaknesses": []},
+            statements=[schemas.StatementResponse.model_validate(statement) for statement in statements],
+        )
+
+    @staticmethod
+    async def get_conversation_context(interview_id: int) -> Optional[dict]:
+        """
+        Return the interview's context as a JSON-ready dict, served from the
+        context cache when possible and rebuilt from the database on a miss.
+        """
+        context = await context_cache.get_context(interview_id)
+        if context is not None:
+            return context
+
+        async def load():
+            async with AsyncSessionLocal() as db:
+                interview_ctx = await HRManager.load_conversation_context(db, interview_id)
+            if interview_ctx is None:
+                return None
+            return interview_ctx.model_dump(mode="json"), context_cache.context_ttl(interview_ctx.duration)
+
+        return await context_cache.rebuild_context(interview_id, load)
+
+    @staticmethod
+    def build_messages(interview_ctx: dict, history: list[dict], prompt: Optional[str] = None) -> list["BaseMessage"]:
+        """
+        Turn the interview context and recent statements into chat messages.
+        """
+        job = interview_ctx["job"]
+        messages: list["BaseMessage"] = [_lazy.SystemMessage(INTERVIEWER_PROMPT.format(
+            hr_ai=interview_ctx.get("hr_ai", "iHR AI"),
+            difficulty=interview_ctx["difficulty"],
+            title=job["title"],
+            description=job.get("description") or "not provided",
+            requirements=job.get("requirements") or "not provided",
+        ))]
+        for statement in history:
+            message_class = _lazy.AIMessage if statement["speaker"] == "AI" else _lazy.HumanMessage
+            messages.append(message_class(statement["content"]))
+        if prompt is not None:
+            messages.append(_lazy.HumanMessage(prompt))
+        return messages
+
+    @staticmethod
+    def chat_model(**overrides):
+        if config.LLM_PROVIDER == "fake":
+            return _lazy.FakeStreamingChatModel()
+        llm_http = _lazy.llm_http
+        options = {
+            "model": config.OPENAI_MODEL,
+            "temperature": config.LLM_TEMPERATURE,
+            "api_key": config.OPENAI_API_KEY,
+            "base_url": config.LLM_BASE_URL,
+            # Every model shares the process-wide clients and their pooled
+            # connections; retries happen there, with jittered backoff
+            "http_client": llm_http.client(),
+            "http_async_client": llm_http.async_client(),
+            "timeout": llm_http.timeout,
+            "max_retries": 0,
+        }
+        options.update(overrides)
+        return _lazy.ChatOpenAI(**options)
+
+    @staticmethod
+    async def get_ai_response(prompt: str, interview_ctx: dict, history: Optional[list[dict]] = None) -> str:
+        """
+        Ask the LLM for the interviewer's next reply to `prompt`.
+        Only the last LLM_HISTORY_WINDOW statements are sent, so the request
+        size stays flat however long the interview runs.
+        """
+        if history is None:
+            history = interview_ctx["statements"][-config.LLM_HISTORY_WINDOW:]
+        messages = HRManager.build_messages(interview_ctx, history, prompt)
+        response = await HRManager.chat_model().ainvoke(messages)
+        return response.content
+
+    @staticmethod
+    async def stream_ai_response(prompt: str, interview_ctx: dict, history: Optional[list[dict]] = None) -> AsyncIterator[str]:
+        """
+        Streaming form of get_ai_response: yields the reply as the LLM
+        produces it, token by token.
+        """
+        if history is None:
+            history = interview_ctx["statements"][-config.LLM_HISTORY_WINDOW:]
+        messages = HRManager.build_messages(interview_ctx, history, prompt)
+        async for chunk in HRManager.chat_model().astream(messages):
+            if chunk.content:
+                yield chunk.content
+
+    @staticmethod
+    async def stream_text_input(text: str, session) -> AsyncIterator[dict]:
+        """
+        Handle one typed answer as a stream of WebSocket frames:
+        `delta` frames carry reply tokens as they arrive, then a `final` frame
+        carries the full reply and the id of its stored statement.
+
+        If the LLM fails mid-reply an `error` frame ends the stream and
+        nothing is stored, so the candidate can send the answer again.
+        """
+        history = session.recent_statements(config.LLM_HISTORY_WINDOW)
+        question = session.last_question()
+
+        parts = []
+        try:
+            async for token in HRManager.stream_ai_response(text, session.context, history):
+                parts.append(token)
+                yield {"type": "delta", "role": "AI", "content": token}
+        except Exception as e:
+            logger.error(f"LLM reply failed for interview {session.interview_id}: {e}")
+            yield {"error": "Could not get a reply, please send your answer again"}
+            return
+
+        # The answer is only kept together with the reply to it
+        answer = session.add_statement("USER", text, replies_to=question)
+        reply = "".join(parts)
+        statement = session.add_statement("AI", reply, is_question=True, replies_to=answer)
+        statement_id = await session.wait_stored(statement, timeout=STORE_TIMEOUT_SECONDS)
+        yield {"type": "final", "role": "AI", "content": reply, "statement_id": statement_id}
+
+        # Runs once the final frame has been sent; scoring never delays the reply
+        await HRManager.queue_scoring(session, answer["content"], history)
+
+    @staticmethod
+    async def process_text_input(text: str, session) -> dict:
+        """
+        Handle one typed answer and return only the final reply frame.
+        """
+        frame = None
+        async for frame in HRManager.stream_text_input(text, session):
+            pass
+        return frame
+
+    @staticmethod
+    async def generate_question(interview_ctx: dict, history: Optional[list[dict]] = None, temperature: Optional[float] = None) -> str:
+        """
+        Ask the LLM for the next interview question.
+
+        Calls at or below QUESTION_CACHE_MAX_TEMPERATURE are deterministic, so
+        they are served from the question cache, keyed by the job, the
+        difficulty and the last QUESTION_CACHE_HISTORY statements.
+        """
+        if temperature is None:
+            temperature = config.QUESTION_TEMPERATURE
+        if history is None:
+            history = interview_ctx["statements"]
+        history = history[-config.QUESTION_CACHE_HISTORY:] if config.QUESTION_CACHE_HISTORY else []
+
+        cacheable = temperature <= config.QUESTION_CACHE_MAX_TEMPERATURE
+        job = interview_ctx["job"]
+        key = prompt_key(
+            "question",
+            model=config.OPENAI_MODEL,
+            job=[job.get("title"), job.get("description"), job.get("requirements"), job.get("level")],
+            difficulty=interview_ctx["difficulty"],
+            history=[[statement["speaker"], statement["content"]] for statement in history],
+        )
+        if cacheable:
+            question = await question_cache.get(key)
+            if question is not None:
+                return question
+        else:
+            question_cache.skipped += 1
+
+        messages = HRManager.build_messages(interview_ctx, history)
+        messages.append(_lazy.SystemMessage(NEXT_QUESTION_PROMPT))
+        response = await HRManager.chat_model(temperature=temperature).ainvoke(messages)
+        question = response.content.strip()
+
+        if cacheable and question:
+            await question_cache.set(key, question)
+        return question
+
+    @staticmethod
+    async def generate_question_set(job: dict, difficulty: str, count: int) -> list[str]:
+        """
+        Ask the LLM for `count` opening questions in one call, for the
+        question bank.
+        """
+        interview_ctx = {"job": job, "difficulty": difficulty}
+        messages = HRManager.build_messages(interview_ctx, [])
+        messages.append(_lazy.SystemMessage(QUESTION_SET_PROMPT.format(count=count)))
+        model = HRManager.chat_model(
+            temperature=config.QUESTION_BANK_TEMPERATURE,
+            model_kwargs={"response_format": {"type": "json_object"}},
+        )
+        response = await model.ainvoke(messages)
+        try:
+            questions = QuestionSet.model_validate_json(response.content).questions
+        except (ValidationError, ValueError):
+            # Not JSON: take one question per line
+            questions = [line.strip(" -*\t") for line in response.content.splitlines()]
+        return [question.strip() for question in questions if question.strip()][:count]
+
+    @staticmethod
+    async def open_interview(session) -> Optional[dict]:
+        """
+        Ask the opening question when a session starts on an interview that
+        has no statements yet. Returns the frame to send, if any.
+
+        The question comes from the job's question bank when it has one;
+        otherwise it is generated now and a bank refill is queued.
+        """
+        if session.statements:
+            return None
+        job_id, difficulty = session.context["job_id"], session.context["difficulty"]
+        async with AsyncSessionLocal() as db:
+            question = await question_bank.pick_question(db, job_id, difficulty)
+        if question is None:
+            question_bank.schedule_refill(job_id, [difficulty])
+            question = await HRManager.generate_question(session.context, [])
+        statement = session.add_statement("AI", question, is_question=True)
+        statement_id = await session.wait_stored(statement, timeout=STORE_TIMEOUT_SECONDS)
+        return {"type": "final", "role": "AI", "content": question, "statement_id": statement_id}
+
+    @staticmethod
+    def stream_transcript_input(transcript: str, session) -> AsyncIterator[dict]:
+        """
+        A client-side transcript of spoken input is handled like typed text.
+        """
+        return HRManager.stream_text_input(transcript, session)
+
+    @staticmethod
+    async def process_transcript_input(transcript: str, session) -> dict:
+        return await HRManager.process_text_input(transcript, session)
+
+    @staticmethod
+    def convert_audio_to_text(audio_data: bytes) -> str:
+        """
+        Recognize a whole recorded answer (WAV, AIFF or FLAC bytes). Blocking;
+        streamed answers go through services.speech instead.
+        """
+        recognizer = _lazy.Recognizer()
+        with _lazy.AudioFile(BytesIO(audio_data)) as source:
+            audio = recognizer.record(source)
+        return recognizer.recognize_google(audio)
+
+    @staticmethod
+    def convert_text_to_audio(text: str, lang: str = "en") -> bytes:
+        """
+        Render a whole reply to MP3 in one blocking call, uncached. Replies
+        spoken over the WebSocket go through services.tts instead, sentence
+        by sentence and through the speech cache.
+        """
+        buffer = BytesIO()
+        _lazy.gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    async def stream_audio_input(audio: str, session) -> AsyncIterator[dict]:
+        """
+        A whole recorded answer sent base64-encoded in a JSON frame: its
+        transcript comes first, then the reply as for typed text. Binary
+        PCM frames avoid the base64 overhead and stream partial transcripts.
+        """
+        try:
+            audio_data = base64.b64decode(audio or "", validate=True)
+        except (binascii.Error, ValueError):
+            yield {"error": "Audio must be base64-encoded"}
+            return
+        try:
+            text = await asyncio.to_thread(HRManager.convert_audio_to_text, audio_data)
+        except Exception as e:
+            logger.warning(f"Could not transcribe audio: {e}")
+            yield {"error": "Could not transcribe audio"}
+            return
+        yield {"type": "transcript", "role": "USER", "content": text}
+        async for frame in HRManager.stream_transcript_input(text, session):
+            yield frame
+
+    @staticmethod
+    async def process_audio_input(audio, session) -> dict:
+        frame = None
+        async for frame in HRManager.stream_audio_input(audio, session):
+            pass
+        return frame
+
+    @staticmethod
+    async def process_video_input(video, session) -> dict:
+        return {"error": "Video input is not supported yet"}
+
+    @staticmethod
+    async def queue_scoring(session, answer: str, history: list[dict]) -> bool:
+        """
+        Hand an answer to the background scorer. Jobs for one interview run
+        in order, so score and insight merges never race.
+        """
+        question = next((statement["content"] for statement in reversed(history) if statement["speaker"] == "AI"), None)
+        interview_ctx = {"job": session.context["job"], "difficulty": session.context["difficulty"]}
+        return await scoring_queue.submit(
+            session.interview_id, session.interview_id, interview_ctx, answer, question,
+            timeout=config.SCORING_SUBMIT_TIMEOUT,
+        )
+
+    @staticmethod
+    async def score_answer(interview_id: int, interview_ctx: dict, answer: str, question: Optional[str] = None):
+        ai_response = await HRManager.updateScoreInsights(interview_ctx, answer, question)
+        if ai_response is not None:
+            await HRManager.update_interview(interview_id, ai_response)
+
+    @staticmethod
+    async def updateScoreInsights(interview_ctx, new_response: str, question: Optional[str] = None) -> Optional[AIResponse]:
+        """
+        Ask the LLM to score one answer. Returns None if the model's reply
+        cannot be read as a score.
+        """
+        if isinstance(interview_ctx, BaseModel):
+            interview_ctx = interview_ctx.model_dump(mode="json")
+        job = interview_ctx.get("job") or {}
+        messages = [_lazy.SystemMessage(SCORING_PROMPT.format(
+            difficulty=interview_ctx.get("difficulty", "Beginner"),
+            title=job.get("title", "the advertised role"),
+        ))]
+        if question:
+            messages.append(_lazy.AIMessage(question))
+        messages.append(_lazy.HumanMessage(new_response))
+
+        model = HRManager.chat_model(temperature=0, model_kwargs={"response_format": {"type": "json_object"}})
+        response = await model.ainvoke(messages)
+        if isinstance(response, AIResponse):
+            return response
+        try:
+            return AIResponse.model_validate_json(response.content)
+        except (ValidationError, ValueError) as e:
+            logger.warning(f"Unreadable score from LLM: {e}")
+            return None
+
+    @staticmethod
+    async def update_interview(interview_id: int, ai_response: AIResponse) -> dict:
+        """
+        Add an answer's score to the interview's running score and merge its
+        strengths and weaknesses into the stored insights. The answer's own
+        score is kept too, for batch re-scoring.
+        """
+        async with AsyncSessionLocal() as db:
+            # Locked until the update commits, so concurrent answers add up
+            interview = await crud.get_interview_by_id(db, interview_id, for_update=True)
+            if not interview:
+                return {"status": "Not found", "interview": None}
+
+            insights = batch_scoring.merge_insights(interview.insights, ai_response.insights)
+            interview.current_score = (interview.current_score or 0) + batch_scoring.answer_points(ai_response.score)
+            interview.insights = insights
+            await progress.update_interview(db, interview_id, schemas.InterviewUpdate(
+                current_score=interview.current_score,
+                insights=insights,
+            ), answer_score=schemas.AnswerScoreCreate(
+                interview_id=interview_id,
+                score=ai_response.score,
+                dimensions=ai_response.dimensions,
+                strengths=ai_response.insights.get("strengths") or [],
+                weaknesses=ai_response.insights.get("weaknesses") or [],
+            ))
+        await context_cache.invalidate(interview_id)
+        return {"status": "Updated", "interview": interview}
+
+
+question_cache = TwoTierCache(maxsize=config.QUESTION_CACHE_SIZE, ttl=config.QUESTION_CACHE_TTL)
+
+scoring_queue = KeyedJobQueue(
+    HRManager.score_answer,
+    workers=config.SCORING_WORKERS,
+    maxsize=config.SCORING_QUEUE_SIZE,
+    name="scoring",
+)
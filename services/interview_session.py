@@ -0,0 +1,194 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from services import context_cache
+from services.database import AsyncSessionLocal
+from services.hr_manager import HRManager
+from services.logger import logger
+import utils.crud as crud
+import utils.schemas as schemas
+
+# Pause between attempts to write what is left when a session closes
+FLUSH_RETRY_DELAY = 0.2
+
+
+class InterviewSession:
+    """
+    Conversation state for one live interview WebSocket.
+
+    The context is loaded once when the socket opens. New statements are
+    appended in memory straight away and written to the database and the
+    context cache by a background flusher, so a turn never waits on, or
+    re-reads, the interview's history.
+    """
+
+    def __init__(self, interview_id: int, context: dict):
+        self.interview_id = interview_id
+        self.context = context
+        self._pending: list[tuple[dict, Optional[dict]]] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+        self._stored = asyncio.Event()
+
+    @classmethod
+    async def open(cls, interview_id: int) -> Optional["InterviewSession"]:
+        """
+        Load the interview context and start the background flusher.
+        Returns None when the interview does not exist.
+        """
+        context = await HRManager.get_conversation_context(interview_id)
+        if context is None:
+            return None
+        session = cls(interview_id, context)
+        session._flusher = asyncio.create_task(session._flush_loop())
+        live_sessions.add(session)
+        return session
+
+    @property
+    def statements(self) -> list[dict]:
+        return self.context["statements"]
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def recent_statements(self, limit: int) -> list[dict]:
+        return self.statements[-limit:] if limit else []
+
+    def last_question(self) -> Optional[dict]:
+        for statement in reversed(self.statements):
+            if statement["speaker"] == "AI" and statement["is_question"]:
+                return statement
+        return None
+
+    def add_statement(self, speaker: str, content: str, is_question: bool = False, replies_to: Optional[dict] = None) -> dict:
+        """
+        Append a statement to the in-memory context and queue it for writing.
+        Its `id` is filled in once the background flush has stored it.
+        """
+        statement = {
+            "id": None,
+            "speaker": speaker,
+            "content": content,
+            "is_question": is_question,
+            "timestamp": datetime.now().isoformat(),
+        }
+        self.statements.append(statement)
+        self._pending.append((statement, replies_to))
+        self._wakeup.set()
+        return statement
+
+    async def _flush_loop(self):
+        while not self._closing:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush()
+        # Closing: keep writing until nothing is pending, retrying failed
+        # batches, until close() gives up on us
+        while self._pending:
+            await self.flush()
+            if self._pending:
+                await asyncio.sleep(FLUSH_RETRY_DELAY)
+
+    async def flush(self):
+        """
+        Write every pending statement with one bulk insert. Failed batches are
+        put back at the front of the queue for the next attempt.
+        """
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+
+            positions = {id(statement): position for position, (statement, _) in enumerate(batch)}
+            items = []
+            for statement, replies_to in batch:
+                replies_id = replies_to["id"] if replies_to else None
+                replies_index = positions.get(id(replies_to)) if replies_to and replies_id is None else None
+                items.append(schemas.StatementBulkCreate(
+                    interview_id=self.interview_id,
+                    speaker=statement["speaker"],
+                    content=statement["content"],
+                    is_question=statement["is_question"],
+                    timestamp=statement["timestamp"],
+                    replies_id=replies_id,
+                    replies_index=replies_index,
+                ))
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    ids = await crud.create_statements_bulk(db, items)
+            except Exception as e:
+                logger.error(f"Could not store statements for interview {self.interview_id}: {e}")
+                self._pending = batch + self._pending
+                return
+            except asyncio.CancelledError:
+                # Cancelled by close() timing out; keep the batch counted as pending
+                self._pending = batch + self._pending
+                raise
+
+            for (statement, _), statement_id in zip(batch, ids):
+                statement["id"] = statement_id
+            # Live turns always follow what is cached, so they are appended in place
+            await context_cache.append_statements(self.interview_id, [statement for statement, _ in batch])
+            self._stored.set()
+            self._stored = asyncio.Event()
+
+    async def wait_stored(self, statement: dict, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Wait for a statement added to this session to be written and return
+        its id, or None if that takes longer than `timeout` seconds.
+        """
+        async def stored():
+            while statement["id"] is None:
+                await self._stored.wait()
+
+        try:
+            await asyncio.wait_for(stored(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return statement["id"]
+
+    async def close(self, timeout: Optional[float] = None) -> int:
+        """
+        Stop the background flusher once it has written whatever is pending,
+        retrying failed writes for up to `timeout` seconds. Returns the
+        number of statements left unwritten, which are dropped.
+        """
+        self._closing = True
+        self._wakeup.set()
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        try:
+            await asyncio.wait_for(self._flusher, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._flusher = None
+            live_sessions.discard(self)
+        if self._pending:
+            logger.error(f"Gave up flushing {self.pending_count} statements for interview {self.interview_id}")
+        return self.pending_count
+
+
+# Sessions whose socket is open in this worker, drained on shutdown
+live_sessions: set[InterviewSession] = set()
+
+
+async def close_all(timeout: Optional[float] = None) -> int:
+    """
+    Close every live session, flushing their pending statements within
+    `timeout` seconds in total. Returns the number of statements that could
+    not be written in time.
+    """
+    return sum(await asyncio.gather(*(session.close(timeout) for session in list(live_sessions))))
+
+
+def stats() -> dict:
+    return {
+        "live": len(live_sessions),
+        "pending_statements": sum(session.pending_count for session in live_sessions),
+    }
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from services.logger import logger
+
+
+class KeyedJobQueue:
+    """
+    Bounded background job queue served by a fixed set of worker coroutines.
+
+    Jobs are sharded by key onto one queue per worker, so all jobs sharing
+    a key (e.g. an interview id) run one at a time, in submission order,
+    while different keys run concurrently. Each shard holds at most
+    `maxsize // workers` jobs; submit() waits for room, which is the
+    backpressure on producers, and the wait is recorded in stats().
+    Once stop() is called, submits are rejected until start() reopens it.
+    """
+
+    def __init__(self, handler: Callable[..., Awaitable[Any]], workers: int = 4, maxsize: int = 256, name: str = "jobs"):
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.maxsize = max(maxsize, self.workers)
+        self.name = name
+        self._queues: list[asyncio.Queue] = []
+        self._tasks: list[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._active = 0
+        self._closed = False
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.wait_ns_total = 0
+        self.wait_ns_max = 0
+        self.run_ns_total = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and self._loop is asyncio.get_running_loop()
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def start(self):
+        """
+        Start the workers on the running event loop, reopening a stopped
+        queue. Safe to call repeatedly.
+        """
+        self._closed = False
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        shard_size = self.maxsize // self.workers
+        self._queues = [asyncio.Queue(maxsize=shard_size) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._work(queue), name=f"{self.name}-worker-{index}")
+            for index, queue in enumerate(self._queues)
+        ]
+
+    async def submit(self, key: Hashable, *args, timeout: Optional[float] = None, **kwargs) -> bool:
+        """
+        Queue `handler(*args, **kwargs)` behind earlier jobs with the same key.
+        Waits while the shard is full; gives up and returns False after
+        `timeout` seconds, or at once if the queue is stopped.
+        """
+        if not self._open(key):
+            return False
+        queue = self._queues[hash(key) % self.workers]
+        start = time.perf_counter_ns()
+        try:
+            await asyncio.wait_for(queue.put((args, kwargs)), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            logger.warning(f"{self.name} queue full, dropped job for {key}")
+            return False
+
+        waited = time.perf_counter_ns() - start
+        self.submitted += 1
+        self.wait_ns_total += waited
+        self.wait_ns_max = max(self.wait_ns_max, waited)
+        self.max_depth = max(self.max_depth, self.depth)
+        return True
+
+    def submit_nowait(self, key: Hashable, *args, **kwargs) -> bool:
+        """
+        Queue a job without waiting; returns False if its shard is full
+        or the queue is stopped.
+        """
+        if not self._open(key):
+            return False
+        queue = self._queues[hash(key) % self.workers]
+        try:
+            queue.put_nowait((args, kwargs))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"{self.name} queue full, dropped job for {key}")
+            return False
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        return True
+
+    def _open(self, key: Hashable) -> bool:
+        """
+        Start the workers for a submit, unless stop() closed the queue.
+        """
+        if self._closed:
+            self.rejected += 1
+            logger.warning(f"{self.name} queue stopped, dropped job for {key}")
+            return False
+        if not self.running:
+            self.start()
+        return True
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            args, kwargs = await queue.get()
+            start = time.perf_counter_ns()
+            self._active += 1
+            try:
+                await self.handler(*args, **kwargs)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"{self.name} job failed: {e}")
+            finally:
+                self._active -= 1
+                self.run_ns_total += time.perf_counter_ns() - start
+                queue.task_done()
+
+    async def join(self):
+        """
+        Wait until every queued job has been processed.
+        """
+        for queue in self._queues:
+            await queue.join()
+
+    async def stop(self, timeout: Optional[float] = None) -> int:
+        """
+        Let queued jobs finish for up to `timeout` seconds, then stop the
+        workers. Returns the number of jobs left unprocessed, counting the
+        ones cut off while running. Later submits are rejected.
+        """
+        self._closed = True
+        if not self.running:
+            return 0
+        unprocessed = 0
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            unprocessed = self.depth + self._active
+            logger.error(f"{self.name} queue stopped with {unprocessed} jobs unprocessed")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+        return unprocessed
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "workers": self.workers,
+            "capacity": self.maxsize,
+            "depth": self.depth,
+            "active": self._active,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_submit_wait_ms": self.wait_ns_total / self.submitted / 1e6 if self.submitted else 0.0,
+            "max_submit_wait_ms": self.wait_ns_max / 1e6,
+            "avg_run_ms": self.run_ns_total / finished / 1e6 if finished else 0.0,
+        }
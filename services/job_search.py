@@ -0,0 +1,59 @@
+import re
+
+from sqlalchemy import column, false, func, literal_column, or_, table, text
+from sqlalchemy.sql import Select
+
+import utils.models as models
+
+# bm25 column weights for title, description, requirements
+FTS_WEIGHTS = (10.0, 1.0, 5.0)
+
+jobs_fts = table("jobs_fts", column("rowid"))
+
+
+def fts_query(search: str) -> str:
+    """
+    FTS5 query for free text: every word must match, as a prefix. Words are
+    quoted so FTS5 operators in user input are taken literally.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search))
+
+
+def apply_search(stmt: Select, dialect: str, search: str, ranked: bool = True) -> Select:
+    """
+    Restrict a select over jobs to those matching `search` in the title,
+    description or requirements, through the dialect's search index. With
+    `ranked`, best matches come first (ties by id).
+
+    Postgres matches the weighted tsvector or a fuzzy title (pg_trgm);
+    SQLite uses the jobs_fts table; other dialects fall back to ILIKE.
+    """
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery("english", search)
+        vector = literal_column("jobs.search_vector")
+        stmt = stmt.where(or_(vector.op("@@")(query), models.Job.title.op("%")(search)))
+        if ranked:
+            rank = func.ts_rank_cd(vector, query) + func.similarity(models.Job.title, search)
+            stmt = stmt.order_by(rank.desc(), models.Job.id)
+        return stmt
+
+    if dialect == "sqlite":
+        match = fts_query(search)
+        if not match:
+            return stmt.where(false())
+        stmt = (
+            stmt.join(jobs_fts, jobs_fts.c.rowid == models.Job.id)
+            .where(text("jobs_fts MATCH :job_search").bindparams(job_search=match))
+        )
+        if ranked:
+            # bm25 is lower for better matches
+            stmt = stmt.order_by(text(f"bm25(jobs_fts, {', '.join(map(str, FTS_WEIGHTS))})"), models.Job.id)
+        return stmt
+
+    pattern = f"%{search}%"
+    stmt = stmt.where(or_(
+        models.Job.title.ilike(pattern),
+        models.Job.description.ilike(pattern),
+        models.Job.requirements.ilike(pattern),
+    ))
+    return stmt.order_by(models.Job.id) if ranked else stmt
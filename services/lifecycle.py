@@ -0,0 +1,149 @@
+import asyncio
+import importlib
+import sys
+import time
+
+from sqlalchemy import text
+
+from config import config
+from services import context_cache, interview_session, question_bank, warmup
+from services.cache import redis_client
+from services.database import AsyncSessionLocal, async_engine
+from services.hr_manager import HRManager, scoring_queue
+from services.logger import logger
+from services.password_hasher import password_hasher
+from services.speech import transcriber
+from services.tts import synthesizer
+import utils.crud as crud
+import utils.models as models
+
+# What startup opened and warmed, and what the last drain left behind
+status = {"ready": False, "startup": {}, "drain": None}
+
+
+async def open_database(connections: int) -> int:
+    """
+    Open `connections` pooled connections at once (capped at the pool size),
+    so the first requests find them ready instead of connecting.
+    """
+    connections = min(connections, config.DB_POOL_SIZE)
+
+    async def touch():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(touch() for _ in range(connections)))
+    return connections
+
+
+async def open_redis(connections: int) -> int:
+    # Concurrent commands each take their own connection from the pool
+    await asyncio.gather(*(redis_client.ping() for _ in range(connections)))
+    return connections
+
+
+async def open_llm(connections: int) -> int:
+    # Imported off the event loop: httpx is slow to load
+    llm_client = await asyncio.to_thread(importlib.import_module, "services.llm_client")
+    return await llm_client.llm_http.connect(connections)
+
+
+async def warm_contexts(limit: int) -> int:
+    """
+    Cache the contexts of ongoing interviews, whose candidates reconnect
+    straight after a deploy. Returns how many were loaded.
+    """
+    loaded = 0
+    async with AsyncSessionLocal() as db:
+        for interview_id in await crud.get_interview_ids_by_status(db, models.InterviewStatus.ONGOING.value, limit):
+            if await context_cache.get_context(interview_id) is not None:
+                continue
+
+            async def load():
+                interview_ctx = await HRManager.load_conversation_context(db, interview_id)
+                if interview_ctx is None:
+                    return None
+                return interview_ctx.model_dump(mode="json"), context_cache.context_ttl(interview_ctx.duration)
+
+            if await context_cache.rebuild_context(interview_id, load) is not None:
+                loaded += 1
+    return loaded
+
+
+async def _step(name: str, opening):
+    started = time.perf_counter()
+    try:
+        result = await opening
+        status["startup"][name] = {"ms": round((time.perf_counter() - started) * 1000, 1), "result": result}
+    except Exception as e:
+        logger.warning(f"Startup step {name} failed: {e}")
+        status["startup"][name] = {"ms": round((time.perf_counter() - started) * 1000, 1), "error": str(e)}
+
+
+async def startup():
+    """
+    Open connections and warm libraries, worker pools and caches
+    concurrently before the worker takes traffic. A failed step is logged
+    and left to happen lazily on first use.
+    """
+    status.update(ready=False, startup={}, drain=None)
+    # Reopen the job queues a previous shutdown in this process closed
+    scoring_queue.start()
+    question_bank.refill_queue.start()
+    steps = [
+        _step("database", open_database(config.STARTUP_DB_CONNECTIONS)),
+        _step("redis", open_redis(config.STARTUP_REDIS_CONNECTIONS)),
+    ]
+    if config.LLM_PROVIDER != "fake" and config.LLM_WARM_CONNECTIONS > 0:
+        steps.append(_step("llm", open_llm(config.LLM_WARM_CONNECTIONS)))
+    if config.STARTUP_WARM_CONTEXTS > 0:
+        steps.append(_step("contexts", warm_contexts(config.STARTUP_WARM_CONTEXTS)))
+    if config.WARMUP_ENABLED:
+        steps.append(_step("libraries", warmup.warm_up(config.WARMUP_TIMEOUT)))
+        steps.append(_step("transcriber", transcriber.start()))
+    await asyncio.gather(*steps)
+    status["ready"] = True
+    logger.info(f"Startup finished: {status['startup']}")
+
+
+async def drain(timeout: float) -> dict:
+    """
+    Let live interviews write their pending statements, then let queued
+    scoring and question bank jobs finish, all within `timeout` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    def remaining() -> float:
+        return max(deadline - loop.time(), 0)
+
+    report = {
+        "sessions": len(interview_session.live_sessions),
+        "dropped_statements": await interview_session.close_all(remaining()),
+        "dropped_scores": await scoring_queue.stop(remaining()),
+        "dropped_refills": await question_bank.refill_queue.stop(remaining()),
+        "seconds": round(timeout - remaining(), 3),
+    }
+    status["drain"] = report
+    logger.info(f"Drained on shutdown: {report}")
+    return report
+
+
+async def shutdown(timeout: float):
+    """
+    Drain, then close every pool and connection this worker opened. The
+    worker pools get what is left of `timeout` to wind down, off the loop.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    status["ready"] = False
+    await drain(timeout)
+    pools = [asyncio.to_thread(pool.shutdown) for pool in (password_hasher, transcriber, synthesizer)]
+    try:
+        await asyncio.wait_for(asyncio.gather(*pools), max(deadline - loop.time(), 0))
+    except asyncio.TimeoutError:
+        logger.error("Worker pools were still shutting down at the deadline")
+    if "services.llm_client" in sys.modules:
+        await sys.modules["services.llm_client"].llm_http.aclose()
+    await redis_client.aclose()
+    await async_engine.dispose()
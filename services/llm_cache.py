@@ -0,0 +1,102 @@
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+from redis.exceptions import RedisError
+
+from services.cache import redis_client
+from services.logger import logger
+
+
+def normalize_text(text: str) -> str:
+    """
+    Case- and whitespace-insensitive form of a prompt fragment.
+    """
+    return " ".join(text.lower().split())
+
+
+def prompt_key(namespace: str, **parts) -> str:
+    """
+    Stable cache key for a prompt built from `parts`. Strings are normalized
+    and keys sorted, so equivalent prompts share an entry.
+    """
+    def normalize(value):
+        if isinstance(value, str):
+            return normalize_text(value)
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    digest = hashlib.sha256(orjson.dumps(normalize(parts), option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return f"llm:{namespace}:{digest}"
+
+
+class TwoTierCache:
+    """
+    LLM response cache: a bounded in-process LRU in front of Redis.
+    Redis hits are promoted into the LRU; writes go to both tiers.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local: OrderedDict[str, str] = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, value: str):
+        self._local[key] = value
+        self._local.move_to_end(key)
+        while len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._local.get(key)
+        if value is not None:
+            self._local.move_to_end(key)
+            self.local_hits += 1
+            return value
+
+        try:
+            raw = await redis_client.get(key)
+        except (RedisError, OSError) as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+
+        value = raw.decode("utf-8")
+        self._remember(key, value)
+        self.redis_hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        self._remember(key, value)
+        try:
+            await redis_client.set(key, value.encode("utf-8"), ex=self.ttl)
+        except (RedisError, OSError) as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def clear_local(self):
+        self._local.clear()
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._local),
+            "maxsize": self.maxsize,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "evictions": self.evictions,
+            "hit_ratio": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
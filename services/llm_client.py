@@ -0,0 +1,291 @@
+import asyncio
+import importlib.util
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from config import config
+from services.logger import logger
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Worth another attempt: rate limits, overload and gateway errors
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+# Raised before the provider could have acted on the request, e.g. a
+# keep-alive connection the server closed while it sat in the pool
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits a random time up
+    to min(max_delay, base_delay * 2**n), so clients that failed together
+    do not retry together. A Retry-After header, if any, sets the minimum;
+    one asking for longer than max_delay is not retried at all, so the
+    caller sees the rate limit instead of a retry that comes too early.
+    """
+
+    def __init__(self, retries: int = 3, base_delay: float = 0.25, max_delay: float = 8.0):
+        self.retries = max(retries, 0)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def retry_after(response: Optional[httpx.Response]) -> float:
+        value = response.headers.get("retry-after") if response is not None else None
+        if not value:
+            return 0.0
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None to give up.
+        """
+        retry_after = self.retry_after(response)
+        if retry_after > self.max_delay:
+            return None
+        return max(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)), retry_after)
+
+
+class TransportStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def count(self, field: str):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    Sync transport that retries transient failures per RetryPolicy.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, policy: RetryPolicy, stats: TransportStats):
+        self.transport = transport
+        self.policy = policy
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.count("requests")
+        for attempt in range(self.policy.retries + 1):
+            last = attempt == self.policy.retries
+            try:
+                response = self.transport.handle_request(request)
+            except RETRY_ERRORS as e:
+                if last:
+                    self.stats.count("failures")
+                    raise
+                logger.warning(f"LLM request failed ({e!r}), retrying")
+                delay = self.policy.delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or last:
+                    return response
+                delay = self.policy.delay(attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+            self.stats.count("retries")
+            time.sleep(delay)
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """
+    Async form of RetryTransport.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: RetryPolicy, stats: TransportStats):
+        self.transport = transport
+        self.policy = policy
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.count("requests")
+        for attempt in range(self.policy.retries + 1):
+            last = attempt == self.policy.retries
+            try:
+                response = await self.transport.handle_async_request(request)
+            except RETRY_ERRORS as e:
+                if last:
+                    self.stats.count("failures")
+                    raise
+                logger.warning(f"LLM request failed ({e!r}), retrying")
+                delay = self.policy.delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or last:
+                    return response
+                delay = self.policy.delay(attempt, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            self.stats.count("retries")
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class LLMHttpClients:
+    """
+    The process-wide HTTP clients every ChatOpenAI instance is given, so
+    concurrent interviews share keep-alive connections (and HTTP/2 streams
+    when the h2 package is installed) instead of each call opening its own.
+
+    The async client's connections belong to the event loop that opened
+    them; a client first used on another loop gets a fresh pool, and the
+    old one is closed.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: Optional[httpx.Timeout] = None,
+        policy: Optional[RetryPolicy] = None,
+    ):
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive, keepalive_expiry=keepalive_expiry)
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.timeout = timeout or httpx.Timeout(60.0, connect=5.0)
+        self.policy = policy or RetryPolicy()
+        self.stats_sync = TransportStats()
+        self.stats_async = TransportStats()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._closing: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls) -> "LLMHttpClients":
+        return cls(
+            base_url=config.LLM_BASE_URL,
+            max_connections=config.LLM_MAX_CONNECTIONS,
+            max_keepalive=config.LLM_MAX_KEEPALIVE,
+            keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY,
+            http2=config.LLM_HTTP2,
+            timeout=httpx.Timeout(config.LLM_TIMEOUT, connect=config.LLM_CONNECT_TIMEOUT, pool=config.LLM_POOL_TIMEOUT),
+            policy=RetryPolicy(retries=config.LLM_RETRIES, base_delay=config.LLM_RETRY_BASE_DELAY, max_delay=config.LLM_RETRY_MAX_DELAY),
+        )
+
+    def client(self) -> httpx.Client:
+        """
+        The shared sync client, for LLM calls made from worker threads.
+        """
+        with self._lock:
+            if self._client is None:
+                transport = httpx.HTTPTransport(limits=self.limits, http2=self.http2)
+                self._client = httpx.Client(
+                    transport=RetryTransport(transport, self.policy, self.stats_sync),
+                    timeout=self.timeout, limits=self.limits,
+                )
+            return self._client
+
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        The shared async client for the current event loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        stale = None
+        with self._lock:
+            if self._async_client is not None and loop is not None and self._loop not in (None, loop):
+                # Opened on a loop that is gone or different; its connections cannot be reused here
+                stale, stale_loop = self._async_client, self._loop
+                self._async_client = None
+            if self._async_client is None:
+                transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+                self._async_client = httpx.AsyncClient(
+                    transport=AsyncRetryTransport(transport, self.policy, self.stats_async),
+                    timeout=self.timeout, limits=self.limits,
+                )
+                self._loop = loop
+            elif self._loop is None:
+                self._loop = loop
+            client = self._async_client
+        if stale is not None:
+            self._close_stale(stale, stale_loop)
+        return client
+
+    def _close_stale(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        """
+        Close a client left behind by another event loop: on that loop if it
+        still runs, else here, where closing its connections only has to
+        release their sockets.
+        """
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+
+        async def close():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Closing the LLM client of a finished event loop: {e!r}")
+
+        task = asyncio.get_running_loop().create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def connect(self, connections: int = 1) -> int:
+        """
+        Open keep-alive connections to the provider now, so the first
+        interviews skip the TCP and TLS handshakes. One is enough over
+        HTTP/2. Returns the number of pooled connections.
+        """
+        client = self.async_client()
+        # Any response will do; the request is only there to open a connection
+        await asyncio.gather(*(client.head(self.base_url) for _ in range(1 if self.http2 else connections)))
+        return self.pooled_connections()
+
+    def pooled_connections(self) -> int:
+        if self._async_client is None:
+            return 0
+        pool = getattr(self._async_client._transport.transport, "_pool", None)
+        return len(pool.connections) if pool is not None else 0
+
+    async def aclose(self):
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "pooled_connections": self.pooled_connections(),
+            "requests": self.stats_sync.requests + self.stats_async.requests,
+            "retries": self.stats_sync.retries + self.stats_async.retries,
+            "failures": self.stats_sync.failures + self.stats_async.failures,
+        }
+
+
+llm_http = LLMHttpClients.from_config()
@@ -1,21 +1,154 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+from datetime import datetime, timezone
+
+import orjson
+
+from config import config
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line. A dict passed as the message (as the request
+    middleware does) is merged into the object instead of stringified.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if isinstance(record.msg, dict) and not record.args:
+            entry.update(record.msg)
+        else:
+            entry["message"] = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class AccessLogSampler(logging.Filter):
+    """
+    Keeps only a `rate` fraction of successful (2xx) access log records,
+    identified by their `status_code` extra. Everything else passes.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        status_code = getattr(record, "status_code", None)
+        if status_code is None or not 200 <= status_code < 300 or self.rate >= 1.0:
+            return True
+        if random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without blocking the caller.
+
+    Formatting happens on the listener thread; only exception tracebacks
+    are rendered here, while the frames are still alive. When the queue is
+    full, records below WARNING are dropped; WARNING and above evict the
+    oldest queued record instead.
+
+    The queue is a lock-free SimpleQueue bounded here by `maxsize`; the
+    bound is approximate under contention, which is fine for a log buffer.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, maxsize: int):
+        super().__init__(log_queue)
+        self.maxsize = maxsize
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.queue.qsize() < self.maxsize:
+            self.queue.put_nowait(record)
+            return
+        self.dropped += 1
+        if record.levelno < logging.WARNING:
+            return
+        try:
+            self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.queue.put_nowait(record)
+
+
+def create_file_handler() -> logging.FileHandler:
+    """
+    Size-based rotation by default; LOG_ROTATE_WHEN (e.g. "midnight")
+    switches to time-based rotation.
+    """
+    if config.LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(
+            config.LOG_FILE, when=config.LOG_ROTATE_WHEN, backupCount=config.LOG_BACKUP_COUNT, utc=True,
+        )
+    return logging.handlers.RotatingFileHandler(
+        config.LOG_FILE, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT,
+    )
+
+
+def stop_logging():
+    """
+    Flush queued records and stop the listener thread. Safe to call twice.
+    """
+    global listener_running
+    if listener_running:
+        listener_running = False
+        listener.stop()
+
+
+def log_stats() -> dict:
+    return {
+        "queue_depth": log_queue.qsize(),
+        "queue_size": queue_handler.maxsize,
+        "dropped": queue_handler.dropped,
+        "sampled_out": access_sampler.sampled_out,
+    }
 
-# Configure logger
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
 # Create formatter
-formatter = logging.Formatter(fmt="%(asctime)s - %(levelname)s - %(message)s")
+formatter = JSONFormatter()
 
 # Create and configure stream handler
 stream_handler = logging.StreamHandler(sys.stdout)
 stream_handler.setFormatter(formatter)
 
 # Create and configure file handler
-file_handler = logging.FileHandler("/logs/server.logs")
+file_handler = create_file_handler()
 file_handler.setFormatter(formatter)
 
-# Add handlers to logger
-logger.handlers = [stream_handler, file_handler]
+# Callers only enqueue; the listener thread formats and writes
+log_queue = queue.SimpleQueue()
+access_sampler = AccessLogSampler(config.LOG_ACCESS_SAMPLE_RATE)
+queue_handler = DroppingQueueHandler(log_queue, config.LOG_QUEUE_SIZE)
+queue_handler.addFilter(access_sampler)
 
+listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+listener.start()
+listener_running = True
+atexit.register(stop_logging)
+
+# Configure logger
+logger = logging.getLogger()
+logger.setLevel(config.LOG_LEVEL)
+logger.handlers = [queue_handler]
@@ -0,0 +1,119 @@
+from typing import Optional
+
+# Each power of two is split into 2**SUB_BUCKET_BITS buckets, so any
+# recorded value is off by at most 1/32 (~3%) of itself
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return max(value, 0)
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - SUB_BUCKETS
+
+
+def bucket_midpoint(index: int) -> float:
+    if index < SUB_BUCKETS:
+        return float(index)
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    low = ((index & (SUB_BUCKETS - 1)) + SUB_BUCKETS) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of nanosecond latencies. Memory grows
+    with the dynamic range of the values, not with how many are recorded.
+    """
+
+    def __init__(self):
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, value_ns: int):
+        index = bucket_index(value_ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ns += value_ns
+        self.max_ns = max(self.max_ns, value_ns)
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate `q`-quantile in nanoseconds; 0 when empty.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(bucket_midpoint(index), float(self.max_ns))
+        return float(self.max_ns)
+
+
+class LatencyMetric:
+    """
+    A family of histograms sharing a name, one per label combination,
+    rendered as a Prometheus summary.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.histograms: dict[tuple, LatencyHistogram] = {}
+
+    def record(self, value_ns: int, *labels):
+        histogram = self.histograms.get(labels)
+        if histogram is None:
+            histogram = self.histograms[labels] = LatencyHistogram()
+        histogram.record(value_ns)
+
+    def get(self, *labels) -> Optional[LatencyHistogram]:
+        return self.histograms.get(labels)
+
+    def reset(self):
+        self.histograms.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} summary"]
+        for labels, histogram in sorted(self.histograms.items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)]
+            for q in QUANTILES:
+                quantile_labels = ",".join(pairs + [f'quantile="{q}"'])
+                lines.append(f"{self.name}{{{quantile_labels}}} {histogram.quantile(q) / 1e9:.9f}")
+            base_labels = ",".join(pairs)
+            lines.append(f"{self.name}_sum{{{base_labels}}} {histogram.total_ns / 1e9:.9f}")
+            lines.append(f"{self.name}_count{{{base_labels}}} {histogram.count}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+http_request_duration = LatencyMetric(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+
+ws_message_duration = LatencyMetric(
+    "ws_message_duration_seconds",
+    "Time to handle one WebSocket message, by route and message type.",
+    ("route", "type"),
+)
+
+
+def render_metrics() -> str:
+    """
+    All latency metrics in the Prometheus text exposition format.
+    """
+    lines = http_request_duration.render() + ws_message_duration.render()
+    return "\n".join(lines) + "\n"
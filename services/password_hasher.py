@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import config
+from utils.helpers import hash_password as _hash_password, verify_password as _verify_password
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool so hashing never blocks
+    the event loop. bcrypt releases the GIL, so up to `workers` hashes run
+    in parallel; further calls wait in the pool's queue, whose depth is
+    reported by stats() to make login storms visible.
+    """
+
+    def __init__(self, workers: int = 4, rounds: int = 12):
+        self.workers = max(workers, 1)
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self.queued = 0
+        self.active = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.wait_ns_total = 0
+        self.run_ns_total = 0
+
+    async def _run(self, func, *args):
+        submitted = time.perf_counter_ns()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        waiting = True
+
+        def dequeue():
+            # Once per call: when a worker picks it up, or when the caller
+            # stops waiting first (cancelled, or the pool was shut down)
+            nonlocal waiting
+            if waiting:
+                waiting = False
+                self.queued -= 1
+
+        def started(waited_ns: int):
+            dequeue()
+            self.active += 1
+            self.wait_ns_total += waited_ns
+
+        def call():
+            started_at = time.perf_counter_ns()
+            # Counters are only touched from the event loop thread
+            loop.call_soon_threadsafe(started, started_at - submitted)
+            try:
+                return func(*args)
+            finally:
+                loop.call_soon_threadsafe(self._finished, time.perf_counter_ns() - started_at)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            dequeue()
+
+    def _finished(self, run_ns: int):
+        self.active -= 1
+        self.completed += 1
+        self.run_ns_total += run_ns
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(_verify_password, password, hashed_password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "queued": self.queued,
+            "active": self.active,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "avg_wait_ms": self.wait_ns_total / self.completed / 1e6 if self.completed else 0.0,
+            "avg_run_ms": self.run_ns_total / self.completed / 1e6 if self.completed else 0.0,
+        }
+
+
+password_hasher = PasswordHasher(workers=config.PASSWORD_HASH_WORKERS, rounds=config.BCRYPT_ROUNDS)
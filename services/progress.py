@@ -0,0 +1,388 @@
+import asyncio
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import delete, func, insert, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.database import AsyncSessionLocal
+from services.logger import logger
+import utils.crud as crud
+import utils.models as models
+import utils.schemas as schemas
+
+PERIODS = ("day", "week")
+TAG_KINDS = ("strengths", "weaknesses")
+METRICS = ("scored_interviews", "score_total", "completed_interviews", "completed_score_total")
+BUCKET_KEY = ("scope", "scope_id", "period", "bucket_start")
+TAG_KEY = BUCKET_KEY + ("kind", "tag")
+
+# Interview columns the rollups are computed from; other edits leave them alone.
+# The industry comes through the interview's job, so moving a job to another
+# industry or deleting it moves its interviews too. Nothing is read from the
+# user row, so no user change touches the rollups.
+PROGRESS_FIELDS = {"status", "current_score", "insights"}
+
+STATE_COLUMNS = (
+    models.Interview.user_id,
+    models.Job.industry_id,
+    models.Interview.start_time,
+    models.Interview.status,
+    models.Interview.current_score,
+    models.Interview.insights,
+)
+
+last_compaction: dict = {"finished_at": None, "rollups": 0, "tags": 0, "drift": 0}
+
+
+def bucket_start(moment: datetime, period: str) -> date:
+    """
+    First day of the bucket `moment` falls in; weeks start on Monday.
+    """
+    day = moment.date()
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+
+def contribution(state: Optional[Mapping]) -> tuple[Counter, Counter]:
+    """
+    What one interview adds to the rollups: metric values keyed by
+    (bucket key, metric) and tag counts keyed by the tag's bucket key.
+    An interview counts as scored once it has a score or any insight.
+    """
+    metrics, tags = Counter(), Counter()
+    if not state or state["start_time"] is None:
+        return metrics, tags
+
+    insights = state["insights"] or {}
+    labels = {(kind, tag) for kind in TAG_KINDS for tag in insights.get(kind) or []}
+    score = state["current_score"] or 0
+    scored = score != 0 or bool(labels)
+    completed = state["status"] == models.InterviewStatus.COMPLETED.value
+    if not (scored or completed):
+        return metrics, tags
+
+    scopes = [("user", state["user_id"])]
+    if state["industry_id"] is not None:
+        scopes.append(("industry", state["industry_id"]))
+    for scope, scope_id in scopes:
+        for period in PERIODS:
+            key = (scope, scope_id, period, bucket_start(state["start_time"], period))
+            if scored:
+                metrics[key, "scored_interviews"] += 1
+                metrics[key, "score_total"] += score
+            if completed:
+                metrics[key, "completed_interviews"] += 1
+                metrics[key, "completed_score_total"] += score
+            for label in labels:
+                tags[key + label] += 1
+    return metrics, tags
+
+
+def _rollup_rows(metrics: Mapping) -> dict:
+    """
+    Metric values grouped into one row per bucket, dropping empty buckets.
+    """
+    rows = {}
+    for (key, metric), value in metrics.items():
+        rows.setdefault(key, dict.fromkeys(METRICS, 0))[metric] += value
+    return {key: values for key, values in rows.items() if any(values.values())}
+
+
+def _state_query():
+    return (
+        select(*STATE_COLUMNS)
+        .select_from(models.Interview)
+        .outerjoin(models.Job, models.Job.id == models.Interview.job_id)
+    )
+
+
+async def load_state(db: AsyncSession, interview_id: int, for_update: bool = False) -> Optional[dict]:
+    """
+    The columns an interview's contribution is computed from, as stored.
+    Read as plain columns so in-memory edits to the ORM instance don't leak in.
+    With `for_update` the interview row stays locked until the transaction
+    ends, so a concurrent write cannot move the rollups off the same `before`.
+    """
+    query = _state_query().where(models.Interview.id == interview_id)
+    if for_update:
+        # Only the interview is locked; the job is on the nullable side of the join
+        query = query.with_for_update(of=models.Interview)
+    result = await db.execute(query)
+    row = result.mappings().first()
+    return dict(row) if row else None
+
+
+async def _increment(db: AsyncSession, model, key_names: tuple, rows: list[dict], value_names: tuple):
+    """
+    Add each row's values to the matching row of `model`, creating it if
+    missing. One INSERT ... ON CONFLICT DO UPDATE on Postgres and SQLite.
+    """
+    if not rows:
+        return
+    touched = {"updated_at": datetime.utcnow()} if model is models.ProgressRollup else {}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model).values(rows)
+        await db.execute(upsert.on_conflict_do_update(
+            index_elements=list(key_names),
+            set_={**{name: getattr(model, name) + upsert.excluded[name] for name in value_names}, **touched},
+        ))
+        return
+
+    for row in rows:
+        result = await db.execute(
+            update(model)
+            .where(*[getattr(model, name) == row[name] for name in key_names])
+            .values(**{name: getattr(model, name) + row[name] for name in value_names}, **touched)
+        )
+        if not result.rowcount:
+            await db.execute(insert(model).values(row))
+
+
+async def _job_states(db: AsyncSession, job_id: int) -> list[dict]:
+    """
+    load_state() for every interview of a job, each row locked.
+    """
+    query = _state_query().where(models.Interview.job_id == job_id).with_for_update(of=models.Interview)
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def apply_change(db: AsyncSession, before: Optional[Mapping], after: Optional[Mapping]):
+    """
+    Move the rollups from an interview's old state to its new one (None for
+    a created or deleted interview). Runs in the caller's transaction, so
+    the rollups commit or roll back together with the interview.
+    """
+    await apply_changes(db, [(before, after)])
+
+
+async def apply_changes(db: AsyncSession, changes: Iterable[tuple[Optional[Mapping], Optional[Mapping]]]):
+    """
+    apply_change() for several interviews, with one upsert per table.
+    """
+    metrics, tags = Counter(), Counter()
+    for before, after in changes:
+        before_metrics, before_tags = contribution(before)
+        after_metrics, after_tags = contribution(after)
+        metrics.update(after_metrics)
+        metrics.subtract(before_metrics)
+        tags.update(after_tags)
+        tags.subtract(before_tags)
+
+    rollups = [dict(zip(BUCKET_KEY, key), **values) for key, values in _rollup_rows(metrics).items()]
+    tag_rows = [dict(zip(TAG_KEY, key), count=count) for key, count in tags.items() if count]
+    await _increment(db, models.ProgressRollup, BUCKET_KEY, rollups, METRICS)
+    await _increment(db, models.ProgressTag, TAG_KEY, tag_rows, ("count",))
+
+
+async def create_interview(db: AsyncSession, interview: schemas.InterviewCreate) -> models.Interview:
+    """
+    crud.create_interview() plus the interview's rollups, in one transaction.
+    """
+    if getattr(interview.status, "value", interview.status) != models.InterviewStatus.COMPLETED.value:
+        # Nothing to roll up until the interview is scored or completed
+        return await crud.create_interview(db, interview)
+    try:
+        db_interview = await crud.create_interview(db, interview, commit=False)
+        await apply_change(db, None, await load_state(db, db_interview.id))
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+    return db_interview
+
+
+async def update_interview(
+    db: AsyncSession,
+    interview_id: int,
+    interview_update: schemas.InterviewUpdate,
+    answer_score: Optional[schemas.AnswerScoreCreate] = None,
+) -> Optional[models.Interview]:
+    """
+    crud.update_interview() plus the move of the rollups a new score,
+    status or insights cause, in one transaction.
+    """
+    changes = interview_update.model_dump(exclude_unset=True, exclude_none=True)
+    if not PROGRESS_FIELDS & changes.keys():
+        return await crud.update_interview(db, interview_id, interview_update, answer_score=answer_score)
+    try:
+        before = await load_state(db, interview_id, for_update=True)
+        db_interview = await crud.update_interview(db, interview_id, interview_update, commit=False, answer_score=answer_score)
+        if db_interview:
+            await apply_change(db, before, {**before, **{field: getattr(db_interview, field) for field in PROGRESS_FIELDS}})
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+    return db_interview
+
+
+async def delete_interview(db: AsyncSession, interview_id: int) -> bool:
+    """
+    crud.delete_interview() plus the removal of its rollups, in one transaction.
+    """
+    try:
+        before = await load_state(db, interview_id, for_update=True)
+        deleted = await crud.delete_interview(db, interview_id, commit=False)
+        if deleted:
+            await apply_change(db, before, None)
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+    return deleted
+
+
+async def update_job(db: AsyncSession, job_id: int, job_update: schemas.JobUpdate) -> Optional[models.Job]:
+    """
+    crud.update_job(), moving the job's interviews to its new industry's
+    rollups when the industry changes, in one transaction.
+    """
+    if job_update.industry_id is None:
+        return await crud.update_job(db, job_id, job_update)
+    try:
+        states = await _job_states(db, job_id)
+        db_job = await crud.update_job(db, job_id, job_update, commit=False)
+        if db_job:
+            await apply_changes(db, [(state, {**state, "industry_id": db_job.industry_id}) for state in states])
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+    return db_job
+
+
+async def delete_job(db: AsyncSession, job_id: int) -> bool:
+    """
+    crud.delete_job(), dropping its interviews from their industry's rollups
+    as rebuild() would for interviews whose job is gone, in one transaction.
+    """
+    try:
+        states = await _job_states(db, job_id)
+        deleted = await crud.delete_job(db, job_id, commit=False)
+        if deleted:
+            await apply_changes(db, [(state, {**state, "industry_id": None}) for state in states])
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+    return deleted
+
+
+async def rebuild(db: AsyncSession) -> dict:
+    """
+    Recompute every rollup from the interviews and replace the stored ones,
+    reporting how many buckets had drifted from the incremental updates.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Hold off incremental updates so none lands between the read and the swap
+        await db.execute(text("LOCK TABLE progress_rollups, progress_rollup_tags IN EXCLUSIVE MODE"))
+
+    metrics, tags = Counter(), Counter()
+    result = await db.stream(_state_query().execution_options(yield_per=1000))
+    async for state in result.mappings():
+        state_metrics, state_tags = contribution(state)
+        metrics.update(state_metrics)
+        tags.update(state_tags)
+    rollups = _rollup_rows(metrics)
+    tags = {key: count for key, count in tags.items() if count}
+
+    rollup_columns = [getattr(models.ProgressRollup, name) for name in BUCKET_KEY + METRICS]
+    stored_rollups = {
+        tuple(row[:len(BUCKET_KEY)]): dict(zip(METRICS, row[len(BUCKET_KEY):]))
+        for row in (await db.execute(select(*rollup_columns))).all()
+        if any(row[len(BUCKET_KEY):])
+    }
+    tag_columns = [getattr(models.ProgressTag, name) for name in TAG_KEY]
+    stored_tags = {
+        tuple(row[:-1]): row[-1]
+        for row in (await db.execute(select(*tag_columns, models.ProgressTag.count))).all()
+        if row[-1]
+    }
+    drift = sum(stored_rollups.get(key) != rollups.get(key) for key in stored_rollups.keys() | rollups.keys())
+    drift += sum(stored_tags.get(key) != tags.get(key) for key in stored_tags.keys() | tags.keys())
+
+    await db.execute(delete(models.ProgressTag))
+    await db.execute(delete(models.ProgressRollup))
+    if rollups:
+        await db.execute(insert(models.ProgressRollup), [dict(zip(BUCKET_KEY, key), **values) for key, values in rollups.items()])
+    if tags:
+        await db.execute(insert(models.ProgressTag), [dict(zip(TAG_KEY, key), count=count) for key, count in tags.items()])
+    await db.commit()
+
+    if drift:
+        logger.warning(f"Progress rollups had drifted in {drift} buckets; rebuilt from interviews")
+    return {"rollups": len(rollups), "tags": len(tags), "drift": drift}
+
+
+async def compaction_loop(interval: float):
+    """
+    Rebuild the rollups every `interval` seconds, as a consistency check on
+    the incremental updates.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                last_compaction.update(await rebuild(db), finished_at=datetime.utcnow().isoformat())
+        except Exception as e:
+            logger.error(f"Progress rollup compaction failed: {e}")
+
+
+async def progress_series(db: AsyncSession, scope: str, scope_id: int, period: str = "week", limit: int = 12) -> list[dict]:
+    """
+    The latest `limit` buckets with activity, oldest first, with average
+    scores over scored and over completed interviews.
+    """
+    rollup = models.ProgressRollup
+    stmt = (
+        select(rollup.bucket_start, *[getattr(rollup, name) for name in METRICS])
+        .where(rollup.scope == scope, rollup.scope_id == scope_id, rollup.period == period)
+        .where(or_(rollup.scored_interviews > 0, rollup.completed_interviews > 0))
+        .order_by(rollup.bucket_start.desc())
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [
+        {
+            "bucket_start": row.bucket_start,
+            "scored_interviews": row.scored_interviews,
+            "average_score": row.score_total / row.scored_interviews if row.scored_interviews else None,
+            "completed_interviews": row.completed_interviews,
+            "average_completed_score": row.completed_score_total / row.completed_interviews if row.completed_interviews else None,
+        }
+        for row in reversed(result.all())
+    ]
+
+
+async def top_tags(db: AsyncSession, scope: str, scope_id: int, period: str, kind: str, since: date, limit: int = 5) -> list[dict]:
+    """
+    The most frequent strengths or weaknesses in buckets from `since` on.
+    """
+    tag = models.ProgressTag
+    total = func.sum(tag.count).label("count")
+    stmt = (
+        select(tag.tag, total)
+        .where(tag.scope == scope, tag.scope_id == scope_id, tag.period == period, tag.bucket_start >= since, tag.kind == kind)
+        .group_by(tag.tag)
+        .having(total > 0)
+        .order_by(total.desc(), tag.tag)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [{"tag": row.tag, "count": row.count} for row in result.all()]
+
+
+async def dashboard(db: AsyncSession, scope: str, scope_id: int, period: str = "week", limit: int = 12, tags: int = 5) -> dict:
+    """
+    Score series plus the top strengths and weaknesses over the same buckets.
+    """
+    series = await progress_series(db, scope, scope_id, period, limit)
+    summary = {"scope": scope, "scope_id": scope_id, "period": period, "series": series}
+    for kind in TAG_KINDS:
+        summary[kind] = await top_tags(db, scope, scope_id, period, kind, series[0]["bucket_start"], tags) if series else []
+    return summary
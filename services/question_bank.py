@@ -0,0 +1,105 @@
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import config
+from services.database import AsyncSessionLocal
+from services.job_queue import KeyedJobQueue
+from services.logger import logger
+import utils.models as models
+
+DIFFICULTIES = [difficulty.value for difficulty in models.InterviewDifficulty]
+
+# Job columns the questions are generated from; editing one makes the bank stale
+JOB_PROMPT_FIELDS = {"title", "description", "requirements", "level"}
+
+# (job_id, difficulty) refills queued but not started. A refill reads the
+# job when it starts, so one still queued already covers later requests
+queued_refills: set[tuple[int, str]] = set()
+
+
+async def pick_question(db: AsyncSession, job_id: int, difficulty: str) -> Optional[str]:
+    """
+    One random pre-generated question for the job and difficulty, read
+    through the (job_id, difficulty) index. None when the bank is empty.
+    """
+    stmt = (
+        select(models.BankQuestion.question)
+        .where(models.BankQuestion.job_id == job_id, models.BankQuestion.difficulty == difficulty)
+        .order_by(func.random())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def count_questions(db: AsyncSession, job_id: int, difficulty: str) -> int:
+    stmt = (
+        select(func.count())
+        .select_from(models.BankQuestion)
+        .where(models.BankQuestion.job_id == job_id, models.BankQuestion.difficulty == difficulty)
+    )
+    return (await db.execute(stmt)).scalar_one()
+
+
+async def replace_questions(db: AsyncSession, job_id: int, difficulty: str, questions: list[str]):
+    """
+    Swap a job's bank for one difficulty in a single transaction.
+    """
+    await db.execute(
+        delete(models.BankQuestion)
+        .where(models.BankQuestion.job_id == job_id, models.BankQuestion.difficulty == difficulty)
+    )
+    if questions:
+        await db.execute(
+            insert(models.BankQuestion),
+            [{"job_id": job_id, "difficulty": difficulty, "question": question} for question in questions],
+        )
+    await db.commit()
+
+
+async def refill(job_id: int, difficulties: Optional[list[str]] = None):
+    """
+    Regenerate the question bank of a job, one LLM call per difficulty.
+    """
+    difficulties = difficulties or DIFFICULTIES
+    queued_refills.difference_update((job_id, difficulty) for difficulty in difficulties)
+    # hr_manager imports this module to pick questions from the bank
+    from services.hr_manager import HRManager
+
+    async with AsyncSessionLocal() as db:
+        job = await db.get(models.Job, job_id)
+        if job is None:
+            return
+        job_details = {field: getattr(job, field) for field in JOB_PROMPT_FIELDS}
+        for difficulty in difficulties:
+            questions = await HRManager.generate_question_set(job_details, difficulty, config.QUESTION_BANK_SIZE)
+            await replace_questions(db, job_id, difficulty, questions)
+            logger.info(f"Question bank for job {job_id} ({difficulty}) refilled with {len(questions)} questions")
+
+
+refill_queue = KeyedJobQueue(refill, workers=config.QUESTION_BANK_WORKERS, maxsize=config.QUESTION_BANK_QUEUE_SIZE, name="question-bank")
+
+
+def prompt_changed(job_update) -> bool:
+    """
+    Whether a job update touches what the interviewer is prompted with,
+    and so calls for a refill.
+    """
+    return bool(job_update.model_dump(exclude_unset=True, exclude_none=True).keys() & JOB_PROMPT_FIELDS)
+
+
+def schedule_refill(job_id: int, difficulties: Optional[list[str]] = None) -> bool:
+    """
+    Queue a background refill of a job's bank. Refills of the same job run
+    in order, and difficulties that already have one waiting are skipped.
+    Returns False if the queue is full or stopped.
+    """
+    wanted = [difficulty for difficulty in difficulties or DIFFICULTIES if (job_id, difficulty) not in queued_refills]
+    if not wanted:
+        return True
+    if not refill_queue.submit_nowait(job_id, job_id, wanted):
+        return False
+    queued_refills.update((job_id, difficulty) for difficulty in wanted)
+    return True
@@ -0,0 +1,61 @@
+import importlib
+from functools import lru_cache
+from typing import Callable
+
+# Speech recognizer backends: `name(pcm, sample_rate) -> text` over 16-bit
+# mono PCM. They run inside the transcription worker processes, so this
+# module imports nothing heavy until a backend is actually called. Any
+# function with the same signature can be plugged in through
+# SPEECH_RECOGNIZER as "module:function".
+
+SAMPLE_WIDTH = 2
+
+
+def google(pcm: bytes, sample_rate: int) -> str:
+    """
+    Google's web speech API (needs network).
+    """
+    from speech_recognition import AudioData, Recognizer, UnknownValueError
+    try:
+        return Recognizer().recognize_google(AudioData(pcm, sample_rate, SAMPLE_WIDTH))
+    except UnknownValueError:
+        return ""
+
+
+def sphinx(pcm: bytes, sample_rate: int) -> str:
+    """
+    CMU Sphinx, fully offline (needs the pocketsphinx package).
+    """
+    from speech_recognition import AudioData, Recognizer, UnknownValueError
+    try:
+        return Recognizer().recognize_sphinx(AudioData(pcm, sample_rate, SAMPLE_WIDTH))
+    except UnknownValueError:
+        return ""
+
+
+def stub(pcm: bytes, sample_rate: int) -> str:
+    """
+    Offline and deterministic: names the length of the audio instead of
+    recognizing it. For tests and load runs.
+    """
+    return f"[{len(pcm) / (SAMPLE_WIDTH * sample_rate):.2f}s of speech]"
+
+
+@lru_cache(maxsize=None)
+def load(path: str) -> Callable[[bytes, int], str]:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def warm(path: str):
+    """
+    Resolve the backend at `path` in this worker process ahead of its first use.
+    """
+    load(path)
+
+
+def transcribe(path: str, pcm: bytes, sample_rate: int) -> str:
+    """
+    Entry point of a worker process: recognize `pcm` with the backend at `path`.
+    """
+    return (load(path)(pcm, sample_rate) or "").strip()
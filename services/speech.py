@@ -0,0 +1,329 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from config import config
+from services import recognizers
+from services.logger import logger
+
+SAMPLE_WIDTH = recognizers.SAMPLE_WIDTH
+
+
+class RingBuffer:
+    """
+    Fixed-capacity byte buffer. Writing past capacity overwrites the oldest
+    bytes, so it never grows.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def write(self, data: bytes):
+        data = memoryview(data)
+        if len(data) >= self.capacity:
+            self._data[:] = data[len(data) - self.capacity:]
+            self._start, self.size = 0, self.capacity
+            return
+        end = (self._start + self.size) % self.capacity
+        first = min(len(data), self.capacity - end)
+        self._data[end:end + first] = data[:first]
+        self._data[:len(data) - first] = data[first:]
+        overflow = self.size + len(data) - self.capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % self.capacity
+            self.size = self.capacity
+        else:
+            self.size += len(data)
+
+    def getvalue(self) -> bytes:
+        end = self._start + self.size
+        if end <= self.capacity:
+            return bytes(self._data[self._start:end])
+        return bytes(self._data[self._start:]) + bytes(self._data[:end - self.capacity])
+
+    def clear(self):
+        self._start, self.size = 0, 0
+
+
+class AudioSegmenter:
+    """
+    Splits a stream of 16-bit mono PCM into speech segments with an energy
+    voice-activity detector. feed() returns ("partial", pcm) events every
+    `partial_ms` of an open segment and a ("final", pcm) event once it is
+    followed by `silence_ms` of silence or reaches `max_segment_seconds`.
+
+    A segment lives in a ring buffer sized for the longest segment, plus
+    a short pre-roll of the audio before speech started, so memory stays
+    flat however long the candidate talks.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        threshold: float = 500.0,
+        silence_ms: int = 700,
+        partial_ms: int = 1500,
+        max_segment_seconds: float = 15.0,
+        preroll_ms: int = 300,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        self.threshold = threshold
+        self.silence_ms = silence_ms
+        self.partial_ms = partial_ms
+        self.segment = RingBuffer(int(max_segment_seconds * sample_rate) * SAMPLE_WIDTH)
+        self.preroll = RingBuffer(max(preroll_ms // frame_ms, 1) * self.frame_bytes)
+        self.noise_floor = 0.0
+        self.in_speech = False
+        self._pending = bytearray()
+        self._silence_run = 0
+        self._since_partial = 0
+
+    @classmethod
+    def from_config(cls) -> "AudioSegmenter":
+        return cls(
+            sample_rate=config.AUDIO_SAMPLE_RATE,
+            frame_ms=config.AUDIO_FRAME_MS,
+            threshold=config.AUDIO_VAD_THRESHOLD,
+            silence_ms=config.AUDIO_SILENCE_MS,
+            partial_ms=config.AUDIO_PARTIAL_MS,
+            max_segment_seconds=config.AUDIO_MAX_SEGMENT_SECONDS,
+        )
+
+    def _is_speech(self, level: float) -> bool:
+        # Louder than the threshold and clearly above the background noise
+        if level >= max(self.threshold, 3 * self.noise_floor):
+            return True
+        self.noise_floor = 0.95 * self.noise_floor + 0.05 * level
+        return False
+
+    def _cut(self) -> bytes:
+        pcm = self.segment.getvalue()
+        self.segment.clear()
+        self._since_partial = 0
+        return pcm
+
+    def feed(self, chunk: bytes) -> list[tuple[str, bytes]]:
+        self._pending += chunk
+        usable = len(self._pending) - len(self._pending) % self.frame_bytes
+        if not usable:
+            return []
+        frames = bytes(self._pending[:usable])
+        del self._pending[:usable]
+
+        samples = np.frombuffer(frames, dtype="<i2").reshape(-1, self.frame_samples).astype(np.float64)
+        levels = np.sqrt(np.mean(samples * samples, axis=1))
+        events = []
+        for index, level in enumerate(levels.tolist()):
+            frame = memoryview(frames)[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            speech = self._is_speech(level)
+            if not self.in_speech:
+                if not speech:
+                    self.preroll.write(frame)
+                    continue
+                self.in_speech = True
+                self.segment.write(self.preroll.getvalue())
+                self.preroll.clear()
+                self._silence_run = self._since_partial = 0
+
+            self.segment.write(frame)
+            self._since_partial += self.frame_ms
+            self._silence_run = 0 if speech else self._silence_run + self.frame_ms
+            if self._silence_run >= self.silence_ms:
+                events.append(("final", self._cut()))
+                self.in_speech = False
+            elif len(self.segment) == self.segment.capacity:
+                # Still talking: close this segment and carry on in a new one
+                events.append(("final", self._cut()))
+            elif speech and self._since_partial >= self.partial_ms:
+                events.append(("partial", self.segment.getvalue()))
+                self._since_partial = 0
+        return events
+
+    def flush(self) -> list[tuple[str, bytes]]:
+        """
+        Close the open segment, if any, at the end of the answer.
+        """
+        events = []
+        if self.in_speech:
+            self.segment.write(bytes(self._pending))
+            events.append(("final", self._cut()))
+        self._pending.clear()
+        self.preroll.clear()
+        self.in_speech = False
+        self._silence_run = 0
+        return events
+
+
+class Transcriber:
+    """
+    Runs the speech recognizer in a process pool, so decoding never holds
+    the event loop or the GIL. The backend is named by a "module:function"
+    path (see services.recognizers) and resolved inside the workers.
+    """
+
+    def __init__(self, workers: int = 2, recognizer: str = "services.recognizers:google", sample_rate: int = 16000):
+        self.workers = max(workers, 1)
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.audio_seconds = 0.0
+        self.run_ns_total = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers start clean instead of forking a threaded server
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def start(self):
+        """
+        Spawn every worker and resolve the recognizer in it now, so the first
+        spoken answer does not wait for interpreters to start.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, recognizers.warm, self.recognizer) for _ in range(self.workers)))
+
+    async def transcribe(self, pcm: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter_ns()
+        self.pending += 1
+        pool = self._pool()
+        try:
+            text = await loop.run_in_executor(pool, recognizers.transcribe, self.recognizer, pcm, self.sample_rate)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); reap the broken pool
+            # and start a fresh one next time, unless another call already has
+            self.failed += 1
+            if self._executor is pool:
+                self._executor = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self.audio_seconds += len(pcm) / (SAMPLE_WIDTH * self.sample_rate)
+        self.run_ns_total += time.perf_counter_ns() - started
+        return text
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "recognizer": self.recognizer,
+            "started": self._executor is not None,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "avg_run_ms": self.run_ns_total / self.completed / 1e6 if self.completed else 0.0,
+        }
+
+
+class AudioTurn:
+    """
+    One spoken answer arriving as binary PCM frames. Each segment is
+    transcribed as soon as it closes and partial transcripts of the open
+    one are sent while the candidate is still speaking; finish() returns
+    the whole answer once the client marks its end.
+
+    At most `max_pending` segments are transcribed at once; feed() waits
+    for one to finish before starting another, which holds back reading
+    more audio from a client that talks faster than it is transcribed.
+    """
+
+    def __init__(self, send: Callable[[dict], Awaitable], transcriber: Transcriber, segmenter: Optional[AudioSegmenter] = None, max_pending: Optional[int] = None):
+        self.send = send
+        self.transcriber = transcriber
+        self.segmenter = segmenter or AudioSegmenter.from_config()
+        self._segments: list[asyncio.Task] = []
+        self._partial: Optional[asyncio.Task] = None
+        self._slots = asyncio.Semaphore(max(max_pending or config.AUDIO_MAX_PENDING_SEGMENTS, 1))
+
+    async def feed(self, chunk: bytes):
+        for kind, pcm in self.segmenter.feed(chunk):
+            await self._handle(kind, pcm)
+
+    async def _handle(self, kind: str, pcm: bytes):
+        index = len(self._segments)
+        if kind == "partial":
+            # While the last partial is still being recognized skip this one;
+            # the next covers more of the segment anyway
+            if self._partial is None or self._partial.done():
+                self._partial = asyncio.create_task(self._send_partial(index, pcm))
+            return
+        self._cancel_partial()
+        await self._slots.acquire()
+        self._segments.append(asyncio.create_task(self._finish_segment(index, pcm)))
+
+    def _cancel_partial(self):
+        if self._partial is not None:
+            self._partial.cancel()
+            self._partial = None
+
+    async def _send_partial(self, index: int, pcm: bytes):
+        try:
+            text = await self.transcriber.transcribe(pcm)
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {e}")
+            return
+        if text:
+            await self.send({"type": "partial_transcript", "role": "USER", "segment": index, "content": text})
+
+    async def _finish_segment(self, index: int, pcm: bytes) -> str:
+        try:
+            text = await self.transcriber.transcribe(pcm)
+        except Exception as e:
+            logger.warning(f"Transcription failed: {e}")
+            return ""
+        finally:
+            self._slots.release()
+        if text:
+            await self.send({"type": "transcript", "role": "USER", "segment": index, "content": text})
+        return text
+
+    async def finish(self) -> str:
+        for kind, pcm in self.segmenter.flush():
+            await self._handle(kind, pcm)
+        self._cancel_partial()
+        texts = await asyncio.gather(*self._segments)
+        self._segments = []
+        return " ".join(text for text in texts if text)
+
+    def close(self):
+        self._cancel_partial()
+        for task in self._segments:
+            task.cancel()
+        self._segments = []
+
+
+transcriber = Transcriber(
+    workers=config.TRANSCRIBE_WORKERS,
+    recognizer=config.SPEECH_RECOGNIZER,
+    sample_rate=config.AUDIO_SAMPLE_RATE,
+)
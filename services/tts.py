@@ -0,0 +1,409 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from redis.exceptions import RedisError
+
+from config import config
+from services.cache import redis_client
+from services.llm_cache import normalize_text
+from services.logger import logger
+
+# A sentence ends at . ! or ? (plus closing quotes/brackets) followed by space
+SENTENCE_END = re.compile(r"""(?<=[.!?])["')\]]*\s+""")
+
+
+def gtts_engine(text: str, voice: str) -> bytes:
+    """
+    Google Translate TTS (needs network). `voice` is a language, optionally
+    with an accent as "lang:tld", e.g. "en:co.uk". Returns MP3.
+    """
+    from gtts import gTTS
+    lang, _, tld = voice.partition(":")
+    buffer = BytesIO()
+    gTTS(text=text, lang=lang or "en", tld=tld or "com").write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def stub_engine(text: str, voice: str) -> bytes:
+    """
+    Offline and deterministic stand-in for tests and benchmarks: the same
+    text always renders to the same bytes, in time proportional to its length.
+    """
+    time.sleep(config.TTS_STUB_SECONDS_PER_CHAR * len(text))
+    return b"STUB" + hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).digest() + text.encode("utf-8")
+
+
+ENGINES: dict[str, Callable[[str, str], bytes]] = {"gtts": gtts_engine, "stub": stub_engine}
+AUDIO_FORMATS = {"gtts": "audio/mpeg", "stub": "application/octet-stream"}
+
+
+def speech_key(text: str, voice: str, persona: str, engine: str) -> str:
+    """
+    Content address of a rendered utterance: the same words in the same
+    voice and persona always map to the same audio.
+    """
+    digest = hashlib.sha256("\0".join([engine, voice, persona, normalize_text(text)]).encode("utf-8")).hexdigest()
+    return f"tts:{digest}"
+
+
+def split_sentences(text: str, min_chars: int = 20) -> list[str]:
+    """
+    Split a reply into sentences to synthesize one at a time. Fragments
+    shorter than `min_chars` ride along with the next sentence, so "Great."
+    is not rendered (and fetched) on its own.
+    """
+    sentences, carry = [], ""
+    for part in SENTENCE_END.split(text):
+        carry = f"{carry} {part}".strip() if carry else part.strip()
+        if len(carry) >= min_chars:
+            sentences.append(carry)
+            carry = ""
+    if carry:
+        sentences.append(carry)
+    return sentences
+
+
+class SentenceSplitter:
+    """
+    Incremental split_sentences over a reply arriving token by token.
+    feed() returns the sentences completed so far; flush() the rest.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, token: str) -> list[str]:
+        self._buffer += token
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            if len(self._buffer[start:match.start()].strip()) >= self.min_chars:
+                sentences.append(self._buffer[start:match.end()].strip())
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> list[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class SpeechCache:
+    """
+    Content-addressed store for rendered speech: a small in-process LRU
+    (bounded in bytes) in front of a shared backend, either files under
+    `directory` (trimmed to `max_bytes`, oldest first) or Redis.
+    """
+
+    def __init__(self, backend: str = "disk", directory: str = ".cache/tts", max_bytes: int = 256 * 2**20, memory_bytes: int = 16 * 2**20, ttl: int = 30 * 86400):
+        self.backend = backend
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.ttl = ttl
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: Optional[int] = None
+        self.memory_hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _path(self, key: str) -> str:
+        digest = key.split(":", 1)[-1]
+        return os.path.join(self.directory, digest[:2], f"{digest}.audio")
+
+    def _read_file(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                audio = file.read()
+        except FileNotFoundError:
+            return None
+        # Touch it, so trimming drops the phrases nobody uses
+        os.utime(path)
+        return audio
+
+    def _write_file(self, key: str, audio: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(audio)
+        os.replace(temporary, path)
+        if self._disk_size is None:
+            self._disk_size = sum(entry.stat().st_size for entry in self._files())
+        else:
+            self._disk_size += len(audio)
+        if self._disk_size > self.max_bytes:
+            self._trim()
+
+    def _files(self) -> list[os.DirEntry]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            entry
+            for shard in os.scandir(self.directory) if shard.is_dir()
+            for entry in os.scandir(shard.path) if entry.name.endswith(".audio")
+        ]
+
+    def _trim(self):
+        # Down to 90% of the budget, least recently used first
+        entries = sorted(self._files(), key=lambda entry: entry.stat().st_mtime)
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= 0.9 * self.max_bytes:
+                break
+            size -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        self._disk_size = size
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return audio
+
+        audio = None
+        try:
+            if self.backend == "disk":
+                audio = await asyncio.to_thread(self._read_file, key)
+            elif self.backend == "redis":
+                audio = await redis_client.get(key)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Speech cache read failed: {e}")
+        if audio is None:
+            self.misses += 1
+            return None
+        self.backend_hits += 1
+        self._remember(key, audio)
+        return audio
+
+    async def set(self, key: str, audio: bytes):
+        self._remember(key, audio)
+        try:
+            if self.backend == "disk":
+                await asyncio.to_thread(self._write_file, key, audio)
+            elif self.backend == "redis":
+                await redis_client.set(key, audio, ex=self.ttl)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Speech cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.backend_hits + self.misses
+        return {
+            "backend": self.backend,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk_size,
+            "memory_hits": self.memory_hits,
+            "backend_hits": self.backend_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.backend_hits) / lookups if lookups else 0.0,
+        }
+
+
+class SpeechSynthesizer:
+    """
+    Renders text to speech on a bounded thread pool (the engines block on
+    network or CPU), through the speech cache. Concurrent requests for the
+    same utterance share one render.
+    """
+
+    def __init__(self, engine: str = "gtts", voice: str = "en", workers: int = 4, cache: Optional[SpeechCache] = None):
+        self.engine = engine
+        self.voice = voice
+        self.workers = max(workers, 1)
+        self.cache = cache or SpeechCache(backend="none")
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tts")
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.rendered = 0
+        self.render_ns_total = 0
+
+    @property
+    def audio_format(self) -> str:
+        return AUDIO_FORMATS.get(self.engine, "application/octet-stream")
+
+    async def synthesize(self, text: str, voice: Optional[str] = None, persona: str = "") -> bytes:
+        voice = voice or self.voice
+        key = speech_key(text, voice, persona, self.engine)
+        audio = await self.cache.get(key)
+        if audio is not None:
+            return audio
+
+        render = self._inflight.get(key)
+        if render is None:
+            # Its own task, so a caller that goes away does not cancel the
+            # render for the others waiting on it
+            render = asyncio.create_task(self._render(key, text, voice))
+            self._inflight[key] = render
+            render.add_done_callback(lambda task: self._render_done(key, task))
+        return await asyncio.shield(render)
+
+    async def _render(self, key: str, text: str, voice: str) -> bytes:
+        started = time.perf_counter_ns()
+        audio = await asyncio.get_running_loop().run_in_executor(self._executor, ENGINES[self.engine], text, voice)
+        self.rendered += 1
+        self.render_ns_total += time.perf_counter_ns() - started
+        await self.cache.set(key, audio)
+        return audio
+
+    def _render_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Every caller may have left; don't let the task warn about its error
+        if not task.cancelled():
+            task.exception()
+
+    async def stream(self, text: str, voice: Optional[str] = None, persona: str = "") -> AsyncIterator[bytes]:
+        """
+        The reply's audio sentence by sentence, in order. All sentences are
+        rendered in parallel, so the first is sent as soon as it is ready.
+        """
+        tasks = [asyncio.create_task(self.synthesize(sentence, voice, persona)) for sentence in split_sentences(text)]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "engine": self.engine,
+            "voice": self.voice,
+            "workers": self.workers,
+            "inflight": len(self._inflight),
+            "rendered": self.rendered,
+            "avg_render_ms": self.render_ns_total / self.rendered / 1e6 if self.rendered else 0.0,
+            "cache": self.cache.stats(),
+        }
+
+
+class SpeechStream:
+    """
+    Speaks one connection's replies while they are still being generated:
+    reply tokens go in through say(), each completed sentence starts
+    rendering at once, and the audio is sent in sentence order as a JSON
+    header frame followed by a binary frame.
+    """
+
+    def __init__(self, send: Callable[[dict], Awaitable], send_bytes: Callable[[bytes], Awaitable], synthesizer: "SpeechSynthesizer", persona: str = ""):
+        self.send = send
+        self.send_bytes = send_bytes
+        self.synthesizer = synthesizer
+        self.persona = persona
+        self._splitter = SentenceSplitter()
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._sender = asyncio.create_task(self._send_loop())
+        self._sentence = 0
+        self._said = False
+
+    def relay(self, frame: dict):
+        """
+        Speak the AI's part of an outgoing reply frame: `delta` tokens as they
+        stream, or a `final` frame's whole content when nothing streamed.
+        An error frame abandons the reply in progress.
+        """
+        if "error" in frame:
+            self.abort()
+            return
+        if frame.get("role") != "AI":
+            return
+        if frame.get("type") == "delta":
+            self.say(frame["content"])
+            self._said = True
+        elif frame.get("type") == "final":
+            if not self._said:
+                self.say(frame["content"])
+            self.end()
+            self._said = False
+
+    def say(self, token: str):
+        for sentence in self._splitter.feed(token):
+            self._queue(sentence)
+
+    def end(self):
+        """
+        The reply is complete: speak whatever is left of it.
+        """
+        for sentence in self._splitter.flush():
+            self._queue(sentence)
+
+    def abort(self):
+        """
+        The reply broke off: drop its unfinished sentence, so the next reply
+        starts clean. Sentences already queued are still spoken.
+        """
+        self._splitter.flush()
+        self._said = False
+
+    def _queue(self, sentence: str):
+        task = asyncio.create_task(self.synthesizer.synthesize(sentence, persona=self.persona))
+        self._pending.put_nowait((self._sentence, task))
+        self._sentence += 1
+
+    async def _send_loop(self):
+        while True:
+            index, task = await self._pending.get()
+            try:
+                audio = await task
+            except asyncio.CancelledError:
+                # A cancelled sentence is skipped; only cancelling this loop ends it
+                if not task.cancelled():
+                    raise
+                continue
+            except Exception as e:
+                logger.warning(f"Speech synthesis failed: {e}")
+                continue
+            await self.send({"type": "audio", "role": "AI", "sentence": index, "format": self.synthesizer.audio_format, "bytes": len(audio)})
+            await self.send_bytes(audio)
+
+    def close(self):
+        self._sender.cancel()
+        while not self._pending.empty():
+            _, task = self._pending.get_nowait()
+            task.cancel()
+
+
+speech_cache = SpeechCache(
+    backend=config.TTS_CACHE_BACKEND,
+    directory=config.TTS_CACHE_DIR,
+    max_bytes=config.TTS_CACHE_MAX_BYTES,
+    memory_bytes=config.TTS_MEMORY_CACHE_BYTES,
+    ttl=config.TTS_CACHE_TTL,
+)
+
+synthesizer = SpeechSynthesizer(
+    engine=config.TTS_ENGINE,
+    voice=config.TTS_VOICE,
+    workers=config.TTS_WORKERS,
+    cache=speech_cache,
+)
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Callable
+
+from config import config
+from services import hr_manager
+from services.logger import logger
+
+# Outcome of the last warm-up, served by /health/startup
+status = {"ready": False, "seconds": None, "steps": {}}
+
+
+def load_llm():
+    hr_manager.preload("AIMessage", "HumanMessage", "SystemMessage")
+    # Building a client loads the provider SDK and its HTTP stack
+    return hr_manager.HRManager.chat_model()
+
+
+def load_tokenizer():
+    # tiktoken fetches and compiles the model's encoding on first use
+    hr_manager.HRManager.chat_model().get_num_tokens("warm up")
+
+
+def load_speech():
+    hr_manager.preload("AudioFile", "Recognizer")
+
+
+def load_tts():
+    hr_manager.preload("gTTS")
+
+
+def steps() -> list[tuple[str, Callable]]:
+    """
+    The loads worth doing for this configuration, in order.
+    """
+    plan = [("llm", load_llm)]
+    if config.LLM_PROVIDER != "fake" and config.WARMUP_TOKENIZER:
+        plan.append(("tokenizer", load_tokenizer))
+    plan.append(("speech", load_speech))
+    if config.TTS_ENGINE == "gtts":
+        plan.append(("tts", load_tts))
+    return plan
+
+
+async def _run(plan: list[tuple[str, Callable]]):
+    for name, load in plan:
+        started = time.perf_counter()
+        try:
+            # Imports hold the GIL but not the event loop
+            await asyncio.to_thread(load)
+            status["steps"][name] = {"ms": round((time.perf_counter() - started) * 1000, 1)}
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            status["steps"][name] = {"ms": round((time.perf_counter() - started) * 1000, 1), "error": str(e)}
+
+
+async def warm_up(timeout: float = 60.0) -> dict:
+    """
+    Import the lazily loaded AI and speech libraries and build the LLM
+    client, so the first interview does not pay for them. A failed or slow
+    step is logged and left to load on first use; it never blocks startup
+    for longer than `timeout`.
+    """
+    started = time.perf_counter()
+    status.update(ready=False, seconds=None, steps={})
+    try:
+        await asyncio.wait_for(_run(steps()), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Warm-up did not finish within {timeout}s")
+    status.update(ready=True, seconds=round(time.perf_counter() - started, 3))
+    logger.info(f"Warm-up finished in {status['seconds']}s")
+    return status
@@ -0,0 +1,40 @@
+import time
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import patch
+from routers.auth import create_access_token, resolve_token
+from services.auth_cache import VerifiedTokenCache, principal_cache, token_cache
+from utils import crud, schemas
+
+
+def test_token_cache_drops_expired_entries():
+    cache = VerifiedTokenCache(maxsize=2)
+    cache.set("expired", {"id": 1}, time.time() - 1)
+    cache.set("valid", {"id": 2}, time.time() + 60)
+    assert cache.get("expired") is None
+    assert cache.get("valid") == {"id": 2}
+    cache.set("other", {"id": 3}, time.time() + 60)
+    cache.set("newest", {"id": 4}, time.time() + 60)
+    assert cache.get("valid") is None
+    assert cache.stats()["expired"] == 1
+
+@pytest.mark.asyncio
+async def test_resolve_token_is_cached(async_db_session: AsyncSession):
+    user = await crud.create_user(async_db_session, schemas.UserCreate(username="token-user", email="token@example.com", password="password"))
+    token = await create_access_token(user.username, user.id, timedelta(minutes=30))
+    token_cache.clear()
+    principal_cache.clear()
+
+    assert await resolve_token(token) == {"id": user.id, "username": "token-user", "role": "user"}
+    with patch("routers.auth.jwt.decode") as decode, patch("services.auth_cache.AsyncSessionLocal") as session_factory:
+        assert (await resolve_token(token))["id"] == user.id
+    decode.assert_not_called()
+    session_factory.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_resolve_token_rejects_invalid_token():
+    with pytest.raises(HTTPException) as exc:
+        await resolve_token("not-a-jwt")
+    assert exc.value.status_code == 401
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from services import batch_scoring, progress
+from services.hr_manager import AIResponse, HRManager
+from utils import crud, schemas
+
+ROWS = [
+    (2, 5.0, {"communication": 6}, ["Clarity", " clarity", "pace"], ["depth"]),
+    (1, 3.0, {}, [], []),
+    (2, 7.0, {"communication": 8, "technical": 4}, ["pace", "Pace"], []),
+    (2, 9.0, None, ["pace"], ["depth", "speed"]),
+    (1, 4.0, {"technical": 2}, ["x"], []),
+]
+
+def test_score_batch_matches_per_interview_numpy():
+    batch = batch_scoring.AnswerBatch.from_rows(ROWS)
+    scores = batch_scoring.score_batch(batch, decay=0.5)
+
+    assert scores.interview_ids.tolist() == [1, 2]
+    assert scores.total.tolist() == [7.0, 21.0]
+    for index, interview_id in enumerate(scores.interview_ids):
+        answers = np.array([row[1] for row in ROWS if row[0] == interview_id])
+        weights = 0.5 ** np.arange(len(answers))[::-1]
+        assert scores.decayed[index] == pytest.approx((weights * answers).sum() / weights.sum())
+        assert scores.percentiles[:, index] == pytest.approx(np.percentile(answers, batch_scoring.PERCENTILES))
+    assert scores.running[2:].tolist() == pytest.approx([5.0, 19 / 3, 55 / 7])
+    assert scores.dimension_means[1, :2].tolist() == [7.0, 4.0]
+    assert np.isnan(scores.dimension_means[0, 0])
+
+def test_rank_tags_dedupes_and_orders_by_frequency():
+    scores = batch_scoring.score_batch(batch_scoring.AnswerBatch.from_rows(ROWS), decay=0.5)
+    assert scores.insights[1] == {"strengths": ["pace", "Clarity"], "weaknesses": ["depth", "speed"]}
+    limited = batch_scoring.score_batch(batch_scoring.AnswerBatch.from_rows(ROWS), decay=0.5, tag_limit=1)
+    assert limited.insights[1] == {"strengths": ["pace"], "weaknesses": ["depth"]}
+
+@pytest.mark.asyncio
+async def test_rescore_restores_scores_and_rollups(async_db_session: AsyncSession):
+    db = async_db_session
+    industry = await crud.create_industry(db, schemas.IndustryCreate(name="Rescore Industry"))
+    job = await crud.create_job(db, schemas.JobCreate(title="Rescore Engineer", level=1, industry_id=industry.id), commit=False)
+    user = await crud.create_user(db, schemas.UserCreate(username="rescore-user", email="rescore@example.com", password="password"))
+    interview = await crud.create_interview(db, schemas.InterviewCreate(user_id=user.id, job_id=job.id, difficulty="Beginner", start_time="2024-12-02T10:00:00"))
+
+    await HRManager.update_interview(interview.id, AIResponse(score=6, insights={"strengths": ["sql"], "weaknesses": []}, dimensions={"technical": 7}))
+    await HRManager.update_interview(interview.id, AIResponse(score=3, insights={"strengths": ["pace", "SQL"], "weaknesses": []}))
+    # Scores edited by hand drift from the answers behind them
+    await crud.update_interview(db, interview.id, schemas.InterviewUpdate(current_score=0, insights={"strengths": [], "weaknesses": []}))
+
+    interview_id, user_id = interview.id, user.id
+    assert await batch_scoring.rescore(db, [interview_id]) == 1
+    db.expire_all()
+    rescored = await crud.get_interview_by_id(db, interview_id)
+    assert rescored.current_score == 9
+    assert rescored.insights == {"strengths": ["sql", "pace"], "weaknesses": []}
+    summary = await progress.dashboard(db, "user", user_id, "week")
+    assert summary["series"][0]["average_score"] == 9
+
+@pytest.mark.asyncio
+async def test_rescore_leaves_interviews_scored_before_answers_were_stored(async_db_session: AsyncSession):
+    db = async_db_session
+    industry = await crud.create_industry(db, schemas.IndustryCreate(name="Legacy Industry"))
+    job = await crud.create_job(db, schemas.JobCreate(title="Legacy Engineer", level=1, industry_id=industry.id), commit=False)
+    user = await crud.create_user(db, schemas.UserCreate(username="legacy-user", email="legacy@example.com", password="password"))
+    interview = await crud.create_interview(db, schemas.InterviewCreate(user_id=user.id, job_id=job.id, difficulty="Beginner", start_time="2024-12-02T10:00:00"))
+    # 20 points from answers that have no stored answer score
+    await crud.update_interview(db, interview.id, schemas.InterviewUpdate(current_score=20))
+    await HRManager.update_interview(interview.id, AIResponse(score=6, insights={"strengths": ["sql"], "weaknesses": []}))
+
+    interview_id = interview.id
+    assert await batch_scoring.rescore(db, [interview_id]) == 0
+    db.expire_all()
+    assert (await crud.get_interview_by_id(db, interview_id)).current_score == 26
+
+@pytest.mark.asyncio
+async def test_rescore_keeps_scores_and_insights_of_unchanged_interviews(async_db_session: AsyncSession):
+    db = async_db_session
+    industry = await crud.create_industry(db, schemas.IndustryCreate(name="Steady Industry"))
+    job = await crud.create_job(db, schemas.JobCreate(title="Steady Engineer", level=1, industry_id=industry.id), commit=False)
+    user = await crud.create_user(db, schemas.UserCreate(username="steady-user", email="steady@example.com", password="password"))
+    interview = await crud.create_interview(db, schemas.InterviewCreate(user_id=user.id, job_id=job.id, difficulty="Beginner", start_time="2024-12-02T10:00:00"))
+    for score, strengths in [(2.5, ["pace"]), (2.5, ["SQL", "pace"]), (2.5, ["sql", "depth"])]:
+        await HRManager.update_interview(interview.id, AIResponse(score=score, insights={"strengths": strengths, "weaknesses": []}))
+
+    interview_id = interview.id
+    db.expire_all()
+    scored = await crud.get_interview_by_id(db, interview_id)
+    before = (scored.current_score, scored.insights)
+    # Chunks of one interview exercise the chunked reads
+    assert await batch_scoring.rescore(db, [interview_id, interview_id + 1000], chunk=1) == 1
+    db.expire_all()
+    rescored = await crud.get_interview_by_id(db, interview_id)
+    assert (rescored.current_score, rescored.insights) == before == (6, {"strengths": ["pace", "SQL", "depth"], "weaknesses": []})
+
+@pytest.mark.asyncio
+async def test_answer_scores_read_the_interview_under_a_lock(monkeypatch):
+    calls = []
+
+    async def get_interview_by_id(db, interview_id, for_update=False):
+        calls.append(for_update)
+        return None
+
+    monkeypatch.setattr(crud, "get_interview_by_id", get_interview_by_id)
+    assert (await HRManager.update_interview(1, AIResponse(score=1, insights={})))["status"] == "Not found"
+    assert calls == [True]
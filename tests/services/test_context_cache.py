@@ -0,0 +1,67 @@
+from datetime import timedelta
+import pytest
+from services import context_cache
+from services.cache import LocalRedis
+
+CONTEXT = {
+    "id": 7,
+    "job": {"id": 1, "title": "Junior Python Developer"},
+    "duration": "PT30M",
+    "statements": [{"id": 1, "speaker": "AI", "content": "Hello", "is_question": True, "timestamp": "2024-12-01T10:00:00"}],
+}
+
+@pytest.fixture(autouse=True)
+def local_redis(monkeypatch):
+    client = LocalRedis()
+    monkeypatch.setattr(context_cache, "redis_client", client)
+    return client
+
+@pytest.mark.asyncio
+async def test_context_round_trip():
+    await context_cache.set_context(CONTEXT, ttl=60)
+    assert await context_cache.get_context(7) == CONTEXT
+
+@pytest.mark.asyncio
+async def test_append_statement_extends_cached_context():
+    await context_cache.set_context(CONTEXT, ttl=60)
+    reply = {"id": 2, "speaker": "USER", "content": "Hi", "is_question": False, "timestamp": "2024-12-01T10:00:05"}
+    await context_cache.append_statement(7, reply)
+    context = await context_cache.get_context(7)
+    assert [statement["id"] for statement in context["statements"]] == [1, 2]
+
+@pytest.mark.asyncio
+async def test_append_without_entry_is_a_miss(local_redis):
+    await context_cache.append_statement(8, {"id": 3, "speaker": "USER"})
+    assert await context_cache.get_context(8) is None
+    assert await local_redis.ttl(context_cache.context_key(8)) > 0
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_entry():
+    await context_cache.set_context(CONTEXT, ttl=60)
+    await context_cache.invalidate(7)
+    assert await context_cache.get_context(7) is None
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_statements_appended_while_loading():
+    reply = {"id": 2, "speaker": "USER", "content": "Hi", "is_question": False, "timestamp": "2024-12-01T10:00:05"}
+
+    async def load():
+        # Written and appended by a live session while the DB read runs
+        await context_cache.append_statement(7, reply)
+        return {**CONTEXT, "statements": list(CONTEXT["statements"])}, 60
+
+    context = await context_cache.rebuild_context(7, load)
+    assert [statement["id"] for statement in context["statements"]] == [1, 2]
+    assert await context_cache.get_context(7) == context
+
+@pytest.mark.asyncio
+async def test_rebuild_skips_caching_when_invalidated_while_loading():
+    async def load():
+        await context_cache.invalidate(7)
+        return CONTEXT, 60
+
+    assert await context_cache.rebuild_context(7, load) == CONTEXT
+    assert await context_cache.get_context(7) is None
+
+def test_context_ttl_follows_duration():
+    assert context_cache.context_ttl(timedelta(minutes=10)) == 600 + context_cache.config.CONTEXT_CACHE_GRACE_SECONDS
@@ -2,7 +2,7 @@ import pytest
 import sqlalchemy
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from services.database import metadata, database
+from services.database import metadata
 
 DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -25,4 +25,18 @@ async def async_db_session(async_engine):
 @pytest.mark.asyncio
 async def test_database_connection(async_db_session: AsyncSession):
     result = await async_db_session.execute(sqlalchemy.text("SELECT 1"))
-    assert result.scalar() == 1
\ No newline at end of file
+    assert result.scalar() == 1
+
+def test_async_database_url_uses_async_drivers():
+    from services.database import async_database_url
+
+    assert async_database_url("postgresql://u:p@db/ihr").drivername == "postgresql+asyncpg"
+    assert async_database_url("sqlite:///db.sqlite3").drivername == "sqlite+aiosqlite"
+    assert async_database_url("sqlite+aiosqlite:///db.sqlite3").drivername == "sqlite+aiosqlite"
+
+
+def test_pool_status_reports_checkout_counters():
+    from services.database import pool_status
+
+    status = pool_status()
+    assert {"checkouts", "timeouts", "avg_wait_ms", "max_wait_ms"} <= status.keys()
@@ -1,7 +1,10 @@
 from datetime import datetime
 from io import BytesIO
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
+from services import context_cache
+from services.cache import LocalRedis
+from services.fake_llm import FakeStreamingChatModel
 from services.hr_manager import HRManager, AIResponse
 from utils.schemas import InterviewContext
 
@@ -17,7 +20,7 @@ async def test_updateScoreInsights():
 
     with patch('services.hr_manager.ChatOpenAI') as MockChatOpenAI:
         mock_model = MockChatOpenAI.return_value
-        mock_model.invoke.return_value = AIResponse(score=8.5, insights={"strengths": ["good communication"], "weaknesses": ["none"]})
+        mock_model.ainvoke = AsyncMock(return_value=AIResponse(score=8.5, insights={"strengths": ["good communication"], "weaknesses": ["none"]}))
 
         response = await HRManager.updateScoreInsights(interview, new_response)
 
@@ -30,7 +33,7 @@ async def test_update_interview():
     ai_response = AIResponse(score=5, insights={"strengths": ["good knowledge"], "weaknesses": ["needs improvement in coding"]})
 
     with patch('services.hr_manager.crud.get_interview_by_id', new_callable=AsyncMock) as mock_get_interview_by_id, \
-         patch('services.hr_manager.crud.update_interview', new_callable=AsyncMock) as mock_update_interview:
+         patch('services.hr_manager.progress.update_interview', new_callable=AsyncMock) as mock_update_interview:
         
         mock_get_interview_by_id.return_value = AsyncMock(
             id=1,
@@ -52,16 +55,22 @@ async def test_update_interview():
 async def test_get_conversation_context():
     interview_id = 1
 
-    with patch('services.hr_manager.redis_client.get') as mock_redis_get, \
-         patch('services.hr_manager.redis_client.set') as mock_redis_set:
-        
-        mock_redis_get.return_value = None
+    # The cache moved to services.context_cache; serve it from memory and
+    # load the context without a database
+    interview_ctx = MagicMock()
+    interview_ctx.model_dump.return_value = {
+        "id": interview_id, "job": {"title": "Junior Python Developer"}, "statements": [],
+    }
+    interview_ctx.duration = None
+
+    with patch('services.context_cache.redis_client', LocalRedis()), \
+         patch('services.hr_manager.HRManager.load_conversation_context', AsyncMock(return_value=interview_ctx)):
 
         context = await HRManager.get_conversation_context(interview_id)
 
         assert context["id"] == interview_id
         assert context["job"]["title"] == "Junior Python Developer"
-        mock_redis_set.assert_called_once()
+        assert await context_cache.get_context(interview_id) == context
 
 @pytest.mark.asyncio
 async def test_get_ai_response():
@@ -98,4 +107,67 @@ def test_convert_text_to_audio():
         mock_gtts_instance.write_to_fp.return_value = mock_audio_buffer
 
         audio_data = HRManager.convert_text_to_audio(text)
-        assert isinstance(audio_data, bytes)
\ No newline at end of file
+        assert isinstance(audio_data, bytes)
+
+class FakeSession:
+    interview_id = 1
+
+    def __init__(self):
+        self.context = {"hr_ai": "iHR AI", "difficulty": "Beginner", "job": {"title": "Junior Python Developer"}, "statements": []}
+
+    def recent_statements(self, limit):
+        return self.context["statements"][-limit:]
+
+    def last_question(self):
+        return None
+
+    def add_statement(self, speaker, content, is_question=False, replies_to=None):
+        statement = {"id": len(self.context["statements"]) + 1, "speaker": speaker, "content": content}
+        self.context["statements"].append(statement)
+        return statement
+
+    async def wait_stored(self, statement, timeout=None):
+        return statement["id"]
+
+@pytest.mark.asyncio
+async def test_stream_text_input_sends_deltas_then_final_frame():
+    session = FakeSession()
+    with patch.object(HRManager, "chat_model", return_value=FakeStreamingChatModel(reply="Tell me more.")), \
+         patch.object(HRManager, "queue_scoring", new_callable=AsyncMock) as mock_queue_scoring:
+        frames = [frame async for frame in HRManager.stream_text_input("I like Python.", session)]
+
+    mock_queue_scoring.assert_awaited_once()
+
+    assert [frame["content"] for frame in frames if frame["type"] == "delta"] == ["Tell", " me", " more."]
+    assert frames[-1] == {"type": "final", "role": "AI", "content": "Tell me more.", "statement_id": 2}
+    assert [statement["speaker"] for statement in session.context["statements"]] == ["USER", "AI"]
+
+@pytest.mark.asyncio
+async def test_stream_text_input_reports_llm_failure_without_storing_the_answer():
+    async def failing(prompt, interview_ctx, history=None):
+        yield "Tell"
+        raise RuntimeError("provider unavailable")
+
+    session = FakeSession()
+    with patch.object(HRManager, "stream_ai_response", failing), \
+         patch.object(HRManager, "queue_scoring", new_callable=AsyncMock) as mock_queue_scoring:
+        frames = [frame async for frame in HRManager.stream_text_input("I like Python.", session)]
+
+    assert frames[0] == {"type": "delta", "role": "AI", "content": "Tell"}
+    assert "error" in frames[-1]
+    assert session.context["statements"] == []
+    mock_queue_scoring.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_generate_question_is_cached_only_when_deterministic():
+    interview_ctx = {"hr_ai": "iHR AI", "difficulty": "Beginner", "job": {"title": "Cache Test Developer"}, "statements": []}
+    model = FakeStreamingChatModel(reply="What draws you to this role?")
+
+    with patch.object(HRManager, "chat_model", return_value=model) as mock_chat_model:
+        first = await HRManager.generate_question(interview_ctx, temperature=0)
+        second = await HRManager.generate_question(interview_ctx, temperature=0)
+        assert first == second == "What draws you to this role?"
+        assert mock_chat_model.call_count == 1
+
+        await HRManager.generate_question(interview_ctx, temperature=0.9)
+        assert mock_chat_model.call_count == 2
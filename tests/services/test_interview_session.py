@@ -0,0 +1,65 @@
+import pytest
+from services import interview_session
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.interview_session import InterviewSession
+from utils import crud, schemas
+
+
+async def _create_interview(db: AsyncSession, name: str = "session-user") -> int:
+    industry = await crud.create_industry(db, schemas.IndustryCreate(name=f"{name} Tech"))
+    job = await crud.create_job(db, schemas.JobCreate(title="Junior Python Developer", level=1, industry_id=industry.id))
+    user = await crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com", password="password"))
+    interview = await crud.create_interview(db, schemas.InterviewCreate(user_id=user.id, job_id=job.id, difficulty="Beginner", start_time="2024-12-01T10:53:24"))
+    return interview.id
+
+@pytest.mark.asyncio
+async def test_session_appends_and_flushes_statements(async_db_session: AsyncSession):
+    interview_id = await _create_interview(async_db_session)
+    session = await InterviewSession.open(interview_id)
+    assert session.context["job"]["title"] == "Junior Python Developer"
+
+    question = session.add_statement("AI", "Why Python?", is_question=True)
+    answer = session.add_statement("USER", "It is readable.", replies_to=question)
+    assert [statement["content"] for statement in session.statements] == ["Why Python?", "It is readable."]
+
+    await session.close(timeout=5)
+    assert session.pending_count == 0
+    assert question["id"] is not None
+
+    stored = await crud.get_interview_statements(async_db_session, interview_id)
+    assert [statement.content for statement in stored] == ["Why Python?", "It is readable."]
+    assert stored[1].replies_id == question["id"] == answer["id"] - 1
+
+@pytest.mark.asyncio
+async def test_close_retries_failed_writes_until_the_timeout(async_db_session: AsyncSession, monkeypatch):
+    interview_id = await _create_interview(async_db_session, "retry-user")
+    session = await InterviewSession.open(interview_id)
+    monkeypatch.setattr(interview_session, "FLUSH_RETRY_DELAY", 0.01)
+    store = crud.create_statements_bulk
+    attempts = []
+
+    async def flaky(db, statements, **kwargs):
+        attempts.append(len(statements))
+        if len(attempts) < 3:
+            raise RuntimeError("database unavailable")
+        return await store(db, statements, **kwargs)
+
+    monkeypatch.setattr(crud, "create_statements_bulk", flaky)
+    session.add_statement("AI", "Why Python?", is_question=True)
+    assert await session.close(timeout=5) == 0
+    assert len(attempts) >= 3
+    assert session.statements[0]["id"] is not None
+
+    async def down(db, statements, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(crud, "create_statements_bulk", down)
+    session = await InterviewSession.open(interview_id)
+    session.add_statement("USER", "It is readable.")
+    # Whatever could not be written in time is reported, not lost silently
+    assert await session.close(timeout=0.1) == 1
+    assert session not in interview_session.live_sessions
+
+@pytest.mark.asyncio
+async def test_open_unknown_interview_returns_none(async_db_session: AsyncSession):
+    assert await InterviewSession.open(987654) is None
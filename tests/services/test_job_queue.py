@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from services.job_queue import KeyedJobQueue
+
+@pytest.mark.asyncio
+async def test_jobs_with_same_key_run_in_order():
+    seen = []
+
+    async def handler(key, value):
+        await asyncio.sleep(0.001 * (5 - value))
+        seen.append((key, value))
+
+    queue = KeyedJobQueue(handler, workers=3, maxsize=30)
+    for value in range(5):
+        for key in ["a", "b"]:
+            assert await queue.submit(key, key, value)
+    await queue.stop(timeout=5)
+
+    assert [value for key, value in seen if key == "a"] == list(range(5))
+    assert [value for key, value in seen if key == "b"] == list(range(5))
+    assert queue.stats()["completed"] == 10
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure():
+    release = asyncio.Event()
+
+    async def handler():
+        await release.wait()
+
+    queue = KeyedJobQueue(handler, workers=1, maxsize=1)
+    assert await queue.submit(1)
+    await asyncio.sleep(0)  # the worker takes the first job
+    assert await queue.submit(1)
+    assert await queue.submit(1, timeout=0.01) is False
+    assert queue.stats()["rejected"] == 1
+
+    release.set()
+    await queue.stop(timeout=5)
+    assert queue.stats()["completed"] == 2
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_counted():
+    async def handler():
+        raise RuntimeError("LLM unavailable")
+
+    queue = KeyedJobQueue(handler, workers=1, maxsize=4)
+    await queue.submit("x")
+    await queue.stop(timeout=5)
+    assert queue.stats()["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_stopped_queue_rejects_submits_until_restarted():
+    seen = []
+
+    async def handler(value):
+        seen.append(value)
+
+    queue = KeyedJobQueue(handler, workers=1, maxsize=4)
+    assert await queue.submit("x", 1)
+    await queue.stop(timeout=5)
+    assert await queue.submit("x", 2) is False
+    assert queue.submit_nowait("x", 3) is False
+    assert not queue.running
+    assert queue.stats()["rejected"] == 2
+
+    queue.start()
+    assert await queue.submit("x", 4)
+    await queue.stop(timeout=5)
+    assert seen == [1, 4]
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import config
+from services import context_cache, interview_session, lifecycle
+from services.interview_session import InterviewSession
+from services.job_queue import KeyedJobQueue
+from utils import crud, schemas
+
+
+async def _create_interview(db: AsyncSession, name: str, status: str = "Scheduled") -> int:
+    industry = await crud.create_industry(db, schemas.IndustryCreate(name=f"{name} Tech"))
+    job = await crud.create_job(db, schemas.JobCreate(title="Backend Engineer", level=2, industry_id=industry.id))
+    user = await crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com", password="password"))
+    interview = await crud.create_interview(db, schemas.InterviewCreate(
+        user_id=user.id, job_id=job.id, status=status, difficulty="Beginner", start_time="2024-12-01T10:53:24",
+    ))
+    return interview.id
+
+@pytest.mark.asyncio
+async def test_drain_flushes_live_sessions(async_db_session: AsyncSession):
+    interview_id = await _create_interview(async_db_session, "drain-user")
+    session = await InterviewSession.open(interview_id)
+    assert session in interview_session.live_sessions
+    question = session.add_statement("AI", "What did you ship last?", is_question=True)
+    session.add_statement("USER", "A billing service.", replies_to=question)
+
+    report = await lifecycle.drain(timeout=5)
+    assert report["sessions"] == 1
+    assert report["dropped_statements"] == 0
+    assert session not in interview_session.live_sessions
+    stored = await crud.get_interview_statements(async_db_session, interview_id)
+    assert [statement.content for statement in stored] == ["What did you ship last?", "A billing service."]
+    # Drain closed the shared job queues; reopen them as startup does
+    lifecycle.scoring_queue.start()
+    lifecycle.question_bank.refill_queue.start()
+
+@pytest.mark.asyncio
+async def test_drain_reports_jobs_left_at_the_deadline(monkeypatch):
+    async def slow(key):
+        await asyncio.sleep(10)
+    queue = KeyedJobQueue(slow, workers=1, maxsize=8, name="slow")
+    for _ in range(3):
+        assert queue.submit_nowait(1, 1)
+    await asyncio.sleep(0)
+    monkeypatch.setattr(lifecycle, "scoring_queue", queue)
+
+    report = await lifecycle.drain(timeout=0.1)
+    # One job was cut off while running, two never started
+    assert report["dropped_scores"] == 3
+    assert not queue.running
+
+@pytest.mark.asyncio
+async def test_startup_opens_connections_and_warms_ongoing_contexts(async_db_session: AsyncSession, monkeypatch):
+    ongoing = await _create_interview(async_db_session, "ongoing-user", status="Ongoing")
+    await context_cache.invalidate(ongoing)
+    monkeypatch.setattr(config, "WARMUP_ENABLED", False)
+    monkeypatch.setattr(config, "STARTUP_DB_CONNECTIONS", 2)
+
+    await lifecycle.startup()
+    assert lifecycle.status["ready"] is True
+    steps = lifecycle.status["startup"]
+    assert steps["database"]["result"] == 2
+    assert "error" not in steps["redis"]
+    assert steps["contexts"]["result"] >= 1
+    assert (await context_cache.get_context(ongoing))["id"] == ongoing
+
+@pytest.mark.asyncio
+async def test_shutdown_winds_down_pools_off_the_loop_within_the_deadline(monkeypatch):
+    class Pool:
+        def __init__(self, seconds):
+            self.seconds = seconds
+
+        def shutdown(self):
+            time.sleep(self.seconds)
+
+    async def drain(timeout):
+        return {}
+
+    monkeypatch.setattr(lifecycle, "drain", drain)
+    monkeypatch.setattr(lifecycle, "password_hasher", Pool(0))
+    monkeypatch.setattr(lifecycle, "transcriber", Pool(0))
+    monkeypatch.setattr(lifecycle, "synthesizer", Pool(1))
+    monkeypatch.setattr(lifecycle, "redis_client", AsyncMock())
+    monkeypatch.setattr(lifecycle, "async_engine", AsyncMock())
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    started = time.perf_counter()
+    await lifecycle.shutdown(timeout=0.2)
+    ticker.cancel()
+    assert time.perf_counter() - started < 0.9
+    # The loop kept running while the pools shut down
+    assert ticks >= 5
+    lifecycle.async_engine.dispose.assert_awaited_once()
@@ -0,0 +1,36 @@
+import pytest
+from services import llm_cache
+from services.cache import LocalRedis
+from services.llm_cache import TwoTierCache, prompt_key
+
+@pytest.fixture(autouse=True)
+def local_redis(monkeypatch):
+    client = LocalRedis()
+    monkeypatch.setattr(llm_cache, "redis_client", client)
+    return client
+
+def test_prompt_key_ignores_case_and_whitespace():
+    assert prompt_key("question", title="Python  Developer") == prompt_key("question", title="python developer")
+    assert prompt_key("question", title="Python Developer") != prompt_key("question", title="Go Developer")
+
+@pytest.mark.asyncio
+async def test_local_tier_evicts_least_recently_used():
+    cache = TwoTierCache(maxsize=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await cache.get("a")
+    await cache.set("c", "3")
+    assert list(cache._local) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+@pytest.mark.asyncio
+async def test_redis_hits_are_promoted_to_local_tier():
+    cache = TwoTierCache()
+    await cache.set("q", "Why Python?")
+    cache.clear_local()
+
+    assert await cache.get("q") == "Why Python?"
+    assert await cache.get("q") == "Why Python?"
+    assert await cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["redis_hits"], stats["local_hits"], stats["misses"]) == (1, 1, 1)
@@ -0,0 +1,97 @@
+import asyncio
+import httpx
+import pytest
+from config import config
+from services import hr_manager
+from services.llm_client import AsyncRetryTransport, LLMHttpClients, RetryPolicy, RetryTransport, TransportStats
+
+NO_WAIT = RetryPolicy(retries=3, base_delay=0, max_delay=0)
+
+def flaky(statuses: list[int], seen: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.content)
+        return httpx.Response(statuses[min(len(seen), len(statuses)) - 1], json={"ok": True})
+    return handler
+
+def test_backoff_is_jittered_capped_and_honours_short_retry_after():
+    policy = RetryPolicy(retries=5, base_delay=1.0, max_delay=4.0)
+    delays = [policy.delay(3) for _ in range(200)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+    assert policy.delay(0, httpx.Response(429, headers={"Retry-After": "2"})) == 2.0
+    # Waiting less than asked would only earn another 429
+    assert policy.delay(0, httpx.Response(429, headers={"Retry-After": "60"})) is None
+
+@pytest.mark.asyncio
+async def test_async_transport_returns_a_rate_limit_longer_than_it_waits():
+    seen = []
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(429, headers={"Retry-After": "60"})
+    stats = TransportStats()
+    transport = AsyncRetryTransport(httpx.MockTransport(handler), RetryPolicy(retries=3, base_delay=0, max_delay=8), stats)
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get("http://llm.test/v1/models")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "60"
+    assert len(seen) == 1
+    assert stats.retries == 0
+
+def test_sync_transport_retries_transient_statuses():
+    seen = []
+    stats = TransportStats()
+    transport = RetryTransport(httpx.MockTransport(flaky([503, 429, 200], seen)), NO_WAIT, stats)
+    with httpx.Client(transport=transport) as client:
+        response = client.post("http://llm.test/v1/chat/completions", content=b'{"n": 1}')
+    assert response.status_code == 200
+    # The body is sent again on every attempt
+    assert seen == [b'{"n": 1}'] * 3
+    assert (stats.requests, stats.retries) == (1, 2)
+
+@pytest.mark.asyncio
+async def test_async_transport_gives_up_after_the_last_retry():
+    seen = []
+    stats = TransportStats()
+    transport = AsyncRetryTransport(httpx.MockTransport(flaky([500], seen)), NO_WAIT, stats)
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get("http://llm.test/v1/models")
+    assert response.status_code == 500
+    assert len(seen) == 4
+    assert stats.retries == 3
+
+@pytest.mark.asyncio
+async def test_async_transport_retries_connection_errors_but_not_client_errors():
+    attempts = []
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(400)
+    transport = AsyncRetryTransport(httpx.MockTransport(handler), NO_WAIT, TransportStats())
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get("http://llm.test/v1/models")
+    assert response.status_code == 400
+    assert len(attempts) == 2
+
+def test_async_client_is_shared_per_event_loop():
+    clients = LLMHttpClients(base_url="http://llm.test/v1")
+
+    async def pick():
+        return clients.async_client(), clients.async_client()
+
+    first, again = asyncio.run(pick())
+    assert first is again
+    # Connections opened on the finished loop cannot be used on a new one
+    second, _ = asyncio.run(pick())
+    assert second is not first
+    assert first.is_closed
+    assert clients.client() is clients.client()
+
+@pytest.mark.asyncio
+async def test_chat_models_share_the_process_wide_clients(monkeypatch):
+    monkeypatch.setattr(config, "LLM_PROVIDER", "openai")
+    first = hr_manager.HRManager.chat_model()
+    second = hr_manager.HRManager.chat_model(temperature=0)
+    assert first.http_async_client is second.http_async_client is hr_manager.llm_http.async_client()
+    assert first.http_client is second.http_client
+    assert first.max_retries == 0
@@ -1,29 +1,61 @@
 import logging
+import logging.handlers
 import os
+import queue
+import orjson
 import pytest
-from services.logger import logger
+from services.logger import AccessLogSampler, DroppingQueueHandler, JSONFormatter, listener, logger
 
-def test_logger_has_stream_handler():
-    handlers = logger.handlers
-    assert any(isinstance(handler, logging.StreamHandler) for handler in handlers), "StreamHandler not found in logger handlers"
+def test_logger_enqueues_through_queue_handler():
+    assert any(isinstance(handler, DroppingQueueHandler) for handler in logger.handlers), "QueueHandler not found in logger handlers"
 
-def test_logger_has_file_handler():
-    handlers = logger.handlers
-    assert any(isinstance(handler, logging.FileHandler) for handler in handlers), "FileHandler not found in logger handlers"
+def test_listener_has_stream_handler():
+    handlers = listener.handlers
+    assert any(isinstance(handler, logging.StreamHandler) for handler in handlers), "StreamHandler not found in listener handlers"
 
-def test_logger_file_handler_path():
-    handlers = logger.handlers
+def test_listener_has_file_handler():
+    handlers = listener.handlers
+    assert any(isinstance(handler, logging.FileHandler) for handler in handlers), "FileHandler not found in listener handlers"
+
+def test_listener_file_handler_path():
+    handlers = listener.handlers
     file_handler = next((handler for handler in handlers if isinstance(handler, logging.FileHandler)), None)
-    assert file_handler is not None, "FileHandler not found in logger handlers"
+    assert file_handler is not None, "FileHandler not found in listener handlers"
+    assert isinstance(file_handler, logging.handlers.RotatingFileHandler)
     assert file_handler.baseFilename == "/logs/server.logs", f"FileHandler path is {file_handler.baseFilename}, expected '/logs/server.logs'"
 
 def test_logger_formatter():
-    handlers = logger.handlers
-    for handler in handlers:
-        assert handler.formatter._fmt == "%(asctime)s - %(levelname)s - %(message)s", "Formatter format is incorrect"
+    for handler in listener.handlers:
+        assert isinstance(handler.formatter, JSONFormatter), "Formatter is not the JSON formatter"
+
+def test_json_formatter_merges_dict_messages():
+    log_dict = {"url": "/health", "status_code": 200}
+    record = logging.LogRecord("root", logging.INFO, __file__, 1, log_dict, None, None)
+    line = orjson.loads(JSONFormatter().format(record))
+    assert line["level"] == "INFO"
+    assert line["url"] == "/health" and line["status_code"] == 200
+
+def test_full_queue_drops_info_but_keeps_warnings():
+    handler = DroppingQueueHandler(queue.SimpleQueue(), maxsize=1)
+    handler.handle(logging.LogRecord("root", logging.INFO, __file__, 1, "first", None, None))
+    handler.handle(logging.LogRecord("root", logging.INFO, __file__, 1, "second", None, None))
+    handler.handle(logging.LogRecord("root", logging.ERROR, __file__, 1, "boom", None, None))
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().msg == "boom"
+
+def test_sampler_only_thins_successful_access_logs():
+    sampler = AccessLogSampler(rate=0.0)
+    ok = logging.LogRecord("root", logging.INFO, __file__, 1, "ok", None, None)
+    ok.status_code = 200
+    failed = logging.LogRecord("root", logging.INFO, __file__, 1, "failed", None, None)
+    failed.status_code = 500
+    assert sampler.filter(ok) is False
+    assert sampler.filter(failed) is True
+    assert sampler.filter(logging.LogRecord("root", logging.INFO, __file__, 1, "plain", None, None)) is True
+    assert sampler.sampled_out == 1
 
 @pytest.fixture(autouse=True)
 def cleanup_log_file():
     yield
     if os.path.exists("/logs/server.logs"):
-        os.remove("/logs/server.logs")
\ No newline at end of file
+        os.remove("/logs/server.logs")
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from services.metrics import LatencyHistogram, LatencyMetric, bucket_index, bucket_midpoint, http_request_duration
+
+
+def test_bucket_error_is_bounded():
+    for value in [0, 1, 31, 32, 33, 1000, 123_456, 987_654_321]:
+        midpoint = bucket_midpoint(bucket_index(value))
+        assert abs(midpoint - value) <= value / 32 + 0.5
+
+def test_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value * 1000)
+    assert histogram.count == 1000
+    assert abs(histogram.quantile(0.5) - 500_000) / 500_000 < 0.04
+    assert abs(histogram.quantile(0.99) - 990_000) / 990_000 < 0.04
+    assert LatencyHistogram().quantile(0.5) == 0.0
+
+def test_summary_renders_in_prometheus_format():
+    metric = LatencyMetric("test_duration_seconds", "Test latency.", ("route",))
+    metric.record(2_000_000, "/jobs/")
+    lines = metric.render()
+    assert lines[1] == "# TYPE test_duration_seconds summary"
+    assert 'test_duration_seconds{route="/jobs/",quantile="0.5"} 0.002000000' in lines
+    assert 'test_duration_seconds_count{route="/jobs/"} 1' in lines
+
+def test_requests_are_recorded_by_route_template():
+    http_request_duration.reset()
+    client = TestClient(app)
+    client.get("/health/scoring-queue")
+    client.get("/does-not-exist")
+
+    assert http_request_duration.get("/health/scoring-queue", "GET", 200).count == 1
+    assert http_request_duration.get("unmatched", "GET", 404).count == 1
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds{route="/health/scoring-queue",method="GET",status="200",quantile="0.99"}' in response.text
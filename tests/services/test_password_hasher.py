@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from services.password_hasher import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_off_the_event_loop():
+    hasher = PasswordHasher(workers=2, rounds=4)
+    hashed = await hasher.hash("password123")
+    assert hashed.startswith("$2b$04$")
+    assert await hasher.verify("password123", hashed) is True
+    assert await hasher.verify("wrongpassword", hashed) is False
+    hasher.shutdown()
+
+@pytest.mark.asyncio
+async def test_stats_report_queue_depth():
+    hasher = PasswordHasher(workers=1, rounds=4)
+    await asyncio.gather(*(hasher.hash(f"password{index}") for index in range(4)))
+    await asyncio.sleep(0)
+    stats = hasher.stats()
+    assert stats["completed"] == 4
+    assert stats["max_queued"] == 4
+    assert (stats["queued"], stats["active"]) == (0, 0)
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queued_counter_recovers_from_cancelled_and_rejected_calls():
+    hasher = PasswordHasher(workers=1, rounds=4)
+    calls = [asyncio.ensure_future(hasher.hash(f"password{index}")) for index in range(3)]
+    await asyncio.sleep(0)
+    calls[-1].cancel()
+    await asyncio.gather(*calls, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert hasher.stats()["queued"] == 0
+
+    hasher.shutdown()
+    with pytest.raises(RuntimeError):
+        await hasher.hash("password")
+    assert hasher.stats()["queued"] == 0
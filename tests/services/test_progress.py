@@ -0,0 +1,106 @@
+import pytest
+from collections import Counter
+from datetime import date, datetime
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from services import progress
+from services.hr_manager import AIResponse, HRManager
+from utils import crud, models, schemas
+
+
+async def _setup(db: AsyncSession, name: str):
+    industry = await crud.create_industry(db, schemas.IndustryCreate(name=f"{name} Industry"))
+    job = await crud.create_job(db, schemas.JobCreate(title=f"{name} Engineer", level=1, industry_id=industry.id), commit=False)
+    user = await crud.create_user(db, schemas.UserCreate(username=f"{name}-user", email=f"{name}@example.com", password="password"))
+    return user.id, job.id, industry.id
+
+async def _stored(db: AsyncSession, scope: str, scope_id: int):
+    rollups = await db.execute(
+        select(*[getattr(models.ProgressRollup, name) for name in ("period", "bucket_start") + progress.METRICS])
+        .where(models.ProgressRollup.scope == scope, models.ProgressRollup.scope_id == scope_id)
+    )
+    tags = await db.execute(
+        select(models.ProgressTag.period, models.ProgressTag.bucket_start, models.ProgressTag.kind, models.ProgressTag.tag, models.ProgressTag.count)
+        .where(models.ProgressTag.scope == scope, models.ProgressTag.scope_id == scope_id, models.ProgressTag.count != 0)
+    )
+    return {tuple(row) for row in rollups.all() if any(row[2:])}, {tuple(row) for row in tags.all()}
+
+def test_contribution_buckets_by_day_and_week():
+    metrics, tags = progress.contribution({
+        "user_id": 1, "industry_id": 2, "start_time": datetime(2024, 12, 5, 9, 30),
+        "status": "Completed", "current_score": 7, "insights": {"strengths": ["clarity"], "weaknesses": []},
+    })
+    assert metrics[("user", 1, "week", date(2024, 12, 2)), "score_total"] == 7
+    assert metrics[("industry", 2, "day", date(2024, 12, 5)), "completed_interviews"] == 1
+    assert tags["user", 1, "day", date(2024, 12, 5), "strengths", "clarity"] == 1
+    assert progress.contribution({
+        "user_id": 1, "industry_id": 2, "start_time": datetime(2024, 12, 5),
+        "status": "Scheduled", "current_score": 0, "insights": {"strengths": [], "weaknesses": []},
+    }) == (Counter(), Counter())
+
+@pytest.mark.asyncio
+async def test_incremental_rollups_match_rebuild(async_db_session: AsyncSession):
+    db = async_db_session
+    user_id, job_id, industry_id = await _setup(db, "rollup")
+    first = await progress.create_interview(db, schemas.InterviewCreate(user_id=user_id, job_id=job_id, difficulty="Beginner", start_time="2024-12-02T10:00:00"))
+    second = await progress.create_interview(db, schemas.InterviewCreate(user_id=user_id, job_id=job_id, difficulty="Beginner", start_time="2024-12-10T10:00:00"))
+    third = await progress.create_interview(db, schemas.InterviewCreate(user_id=user_id, job_id=job_id, difficulty="Beginner", start_time="2024-12-11T10:00:00", status="Completed"))
+
+    await HRManager.update_interview(first.id, AIResponse(score=6, insights={"strengths": ["clarity"], "weaknesses": ["depth"]}))
+    await HRManager.update_interview(first.id, AIResponse(score=2, insights={"strengths": ["clarity", "pace"], "weaknesses": []}))
+    await HRManager.update_interview(second.id, AIResponse(score=4, insights={"strengths": ["clarity"], "weaknesses": []}))
+    await progress.update_interview(db, first.id, schemas.InterviewUpdate(status="Completed"))
+    await progress.update_interview(db, second.id, schemas.InterviewUpdate(current_score=9))
+    await progress.delete_interview(db, third.id)
+
+    summary = await progress.dashboard(db, "user", user_id, "week")
+    assert [point["bucket_start"] for point in summary["series"]] == [date(2024, 12, 2), date(2024, 12, 9)]
+    assert summary["series"][0]["average_completed_score"] == 8
+    assert summary["series"][1]["average_score"] == 9
+    assert summary["series"][1]["completed_interviews"] == 0
+    assert summary["strengths"][0] == {"tag": "clarity", "count": 2}
+    assert summary["weaknesses"] == [{"tag": "depth", "count": 1}]
+
+    incremental = [await _stored(db, "user", user_id), await _stored(db, "industry", industry_id)]
+    stats = await progress.rebuild(db)
+    assert stats["rollups"] > 0
+    assert [await _stored(db, "user", user_id), await _stored(db, "industry", industry_id)] == incremental
+
+@pytest.mark.asyncio
+async def test_score_updates_lock_the_interview_row_they_read(async_db_session: AsyncSession, monkeypatch):
+    user_id, job_id, _ = await _setup(async_db_session, "locking")
+    interview = await progress.create_interview(async_db_session, schemas.InterviewCreate(user_id=user_id, job_id=job_id, difficulty="Beginner", start_time="2024-12-05T09:30:00"))
+    statements = []
+    execute = async_db_session.execute
+
+    async def spy(statement, *args, **kwargs):
+        statements.append(statement)
+        return await execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(async_db_session, "execute", spy)
+    await progress.update_interview(async_db_session, interview.id, schemas.InterviewUpdate(current_score=4))
+    state_reads = [statement for statement in statements if getattr(statement, "_for_update_arg", None) is not None]
+    assert len(state_reads) == 1
+    assert "FOR UPDATE OF interviews" in str(state_reads[0].compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_job_industry_moves_and_deletes_keep_rollups_matching_rebuild(async_db_session: AsyncSession):
+    db = async_db_session
+    user_id, job_id, industry_id = await _setup(db, "moving")
+    other_industry = await crud.create_industry(db, schemas.IndustryCreate(name="Moving Target Industry"))
+    interview = await progress.create_interview(db, schemas.InterviewCreate(user_id=user_id, job_id=job_id, difficulty="Beginner", start_time="2024-12-16T10:00:00", status="Completed"))
+    await progress.update_interview(db, interview.id, schemas.InterviewUpdate(current_score=5))
+
+    await progress.update_job(db, job_id, schemas.JobUpdate(industry_id=other_industry.id))
+    assert await _stored(db, "industry", industry_id) == (set(), set())
+    moved = await _stored(db, "industry", other_industry.id)
+    assert moved[0]
+
+    # SQLite here does not enforce the foreign key, leaving the interview without a job
+    assert await progress.delete_job(db, job_id)
+    assert await _stored(db, "industry", other_industry.id) == (set(), set())
+    incremental = [await _stored(db, "user", user_id), await _stored(db, "industry", other_industry.id)]
+    await progress.rebuild(db)
+    assert [await _stored(db, "user", user_id), await _stored(db, "industry", other_industry.id)] == incremental
@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
+from services import question_bank
+from services.hr_manager import HRManager
+from services.interview_session import InterviewSession
+from utils import crud, schemas
+
+
+async def _create_job(db: AsyncSession, title: str) -> int:
+    industry = await crud.create_industry(db, schemas.IndustryCreate(name=f"{title} Industry"))
+    job = await crud.create_job(db, schemas.JobCreate(title=title, level=1, industry_id=industry.id), commit=False)
+    await db.commit()
+    return job.id
+
+@pytest.mark.asyncio
+async def test_refill_replaces_bank_per_difficulty(async_db_session: AsyncSession):
+    job_id = await _create_job(async_db_session, "Bank Backend Developer")
+    assert await question_bank.pick_question(async_db_session, job_id, "Beginner") is None
+
+    generate = AsyncMock(side_effect=[["Why Python?", "What is a list?"], ["What is the GIL?"]])
+    with patch.object(HRManager, "generate_question_set", generate):
+        await question_bank.refill(job_id, ["Beginner"])
+        await question_bank.refill(job_id, ["Beginner"])
+
+    assert await question_bank.count_questions(async_db_session, job_id, "Beginner") == 1
+    assert await question_bank.pick_question(async_db_session, job_id, "Beginner") == "What is the GIL?"
+    assert await question_bank.count_questions(async_db_session, job_id, "Expert") == 0
+
+@pytest.mark.asyncio
+async def test_schedule_refill_skips_refills_already_queued(async_db_session: AsyncSession):
+    job_id = await _create_job(async_db_session, "Bank Queue Developer")
+    generate = AsyncMock(return_value=["Why Python?"])
+    with patch.object(HRManager, "generate_question_set", generate):
+        # Every new interview on an empty bank asks for the same refill
+        for _ in range(3):
+            assert question_bank.schedule_refill(job_id, ["Beginner"])
+        assert question_bank.schedule_refill(job_id)
+        await question_bank.refill_queue.join()
+
+    assert generate.await_count == len(question_bank.DIFFICULTIES)
+    assert not question_bank.queued_refills
+    await question_bank.refill_queue.stop()
+
+@pytest.mark.asyncio
+async def test_generate_question_set_falls_back_to_lines():
+    model = AsyncMock()
+    model.ainvoke.return_value.content = "- Why Python?\n\n- What is a list?\n- Extra"
+    with patch.object(HRManager, "chat_model", return_value=model):
+        questions = await HRManager.generate_question_set({"title": "Developer"}, "Beginner", 2)
+    assert questions == ["Why Python?", "What is a list?"]
+
+@pytest.mark.asyncio
+async def test_open_interview_uses_bank_question(async_db_session: AsyncSession):
+    job_id = await _create_job(async_db_session, "Bank Data Engineer")
+    await question_bank.replace_questions(async_db_session, job_id, "Beginner", ["Tell me about a pipeline you built."])
+    user = await crud.create_user(async_db_session, schemas.UserCreate(username="bank-user", email="bank@example.com", password="password"))
+    interview = await crud.create_interview(async_db_session, schemas.InterviewCreate(user_id=user.id, job_id=job_id, difficulty="Beginner", start_time="2024-12-01T10:53:24"))
+
+    session = await InterviewSession.open(interview.id)
+    with patch.object(HRManager, "generate_question", AsyncMock()) as generate:
+        frame = await HRManager.open_interview(session)
+    await session.close(timeout=5)
+
+    generate.assert_not_called()
+    assert frame["content"] == "Tell me about a pipeline you built."
+    assert frame["statement_id"] is not None
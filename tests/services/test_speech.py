@@ -0,0 +1,126 @@
+import asyncio
+import numpy as np
+import pytest
+from services import speech
+
+RATE = 16000
+
+def pcm(seconds: float, amplitude: int = 0) -> bytes:
+    samples = np.arange(int(seconds * RATE))
+    return (amplitude * np.sin(2 * np.pi * 220 * samples / RATE)).astype("<i2").tobytes()
+
+def segmenter(**overrides) -> speech.AudioSegmenter:
+    options = {"sample_rate": RATE, "frame_ms": 30, "threshold": 500.0, "silence_ms": 600, "partial_ms": 1000, "max_segment_seconds": 5.0, "preroll_ms": 300}
+    return speech.AudioSegmenter(**{**options, **overrides})
+
+def seconds(audio: bytes) -> float:
+    return len(audio) / (2 * RATE)
+
+def test_ring_buffer_keeps_the_latest_bytes():
+    buffer = speech.RingBuffer(8)
+    buffer.write(b"abcdef")
+    buffer.write(b"ghij")
+    assert buffer.getvalue() == b"cdefghij"
+    buffer.write(b"0123456789")
+    assert buffer.getvalue() == b"23456789"
+    buffer.clear()
+    buffer.write(b"xy")
+    assert buffer.getvalue() == b"xy"
+
+def test_segmenter_splits_on_silence_with_partials():
+    vad = segmenter()
+    audio = pcm(1) + pcm(2.5, 3000) + pcm(1)
+    events = []
+    # Odd chunk sizes, as they arrive off the socket
+    for offset in range(0, len(audio), 4001):
+        events += vad.feed(audio[offset:offset + 4001])
+
+    assert [kind for kind, _ in events] == ["partial", "partial", "final"]
+    final = events[-1][1]
+    # Pre-roll + speech + the silence that closed it
+    assert seconds(final) == pytest.approx(0.3 + 2.5 + 0.6, abs=0.05)
+    assert vad.flush() == []
+
+def test_segmenter_memory_is_bounded_by_the_longest_segment():
+    vad = segmenter(partial_ms=100_000)
+    finals = [audio for kind, audio in vad.feed(pcm(12, 3000)) if kind == "final"]
+    finals += [audio for kind, audio in vad.flush()]
+    assert [round(seconds(audio)) for audio in finals] == [5, 5, 2]
+    assert vad.segment.capacity == 5 * RATE * 2
+
+@pytest.mark.asyncio
+async def test_audio_turn_sends_partials_and_joins_segments():
+    class Transcriber:
+        async def transcribe(self, audio: bytes) -> str:
+            return f"{seconds(audio):.1f}s"
+
+    frames = []
+    async def send(frame):
+        frames.append(frame)
+
+    turn = speech.AudioTurn(send, Transcriber(), segmenter())
+    audio = pcm(0.5) + pcm(1.5, 3000) + pcm(1) + pcm(1.2, 3000)
+    for offset in range(0, len(audio), 3200):
+        await turn.feed(audio[offset:offset + 3200])
+        # Let the partial transcription run, as between socket reads
+        await asyncio.sleep(0)
+    answer = await turn.finish()
+
+    assert answer == "2.4s 1.5s"
+    assert [(frame["type"], frame["segment"]) for frame in frames] == [
+        ("partial_transcript", 0), ("transcript", 0), ("partial_transcript", 1), ("transcript", 1),
+    ]
+
+@pytest.mark.asyncio
+async def test_transcriber_runs_the_stub_backend_in_a_process_pool():
+    transcriber = speech.Transcriber(workers=1, recognizer="services.recognizers:stub", sample_rate=RATE)
+    try:
+        assert await transcriber.transcribe(pcm(1.5, 3000)) == "[1.50s of speech]"
+    finally:
+        transcriber.shutdown()
+    assert transcriber.stats()["completed"] == 1
+
+@pytest.mark.asyncio
+async def test_transcriber_reaps_a_broken_pool_before_replacing_it():
+    class BrokenPool:
+        def submit(self, *args):
+            raise speech.BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            self.shutdown_with = kwargs
+
+    transcriber = speech.Transcriber(workers=1, recognizer="services.recognizers:stub", sample_rate=RATE)
+    broken = transcriber._executor = BrokenPool()
+    with pytest.raises(speech.BrokenProcessPool):
+        await transcriber.transcribe(pcm(0.5, 3000))
+    assert broken.shutdown_with == {"wait": False, "cancel_futures": True}
+    assert transcriber._executor is None
+    assert transcriber.stats()["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_audio_turn_waits_for_a_free_slot_before_the_next_segment():
+    release = asyncio.Event()
+    running = []
+
+    class Transcriber:
+        async def transcribe(self, audio: bytes) -> str:
+            running.append(audio)
+            await release.wait()
+            return "ok"
+
+    async def send(frame):
+        pass
+
+    turn = speech.AudioTurn(send, Transcriber(), segmenter(partial_ms=100_000), max_pending=1)
+    segment = pcm(0.6, 3000) + pcm(0.7)
+    await turn.feed(segment)
+    await asyncio.sleep(0)
+    # The second segment waits until the first is transcribed
+    blocked = asyncio.create_task(turn.feed(segment))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert len(running) == 1
+
+    release.set()
+    await blocked
+    assert await turn.finish() == "ok ok"
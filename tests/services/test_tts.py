@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from services import tts
+
+REPLY = "Thanks for joining today. Great. Could you walk me through a recent project? What was the hardest part of it?"
+
+def synthesizer(tmp_path, backend="disk", **options) -> tts.SpeechSynthesizer:
+    cache = tts.SpeechCache(backend=backend, directory=str(tmp_path), **options)
+    return tts.SpeechSynthesizer(engine="stub", voice="en", workers=2, cache=cache)
+
+def test_split_sentences_merges_short_fragments():
+    assert tts.split_sentences(REPLY) == [
+        "Thanks for joining today.",
+        "Great. Could you walk me through a recent project?",
+        "What was the hardest part of it?",
+    ]
+
+def test_sentence_splitter_matches_split_sentences_token_by_token():
+    splitter = tts.SentenceSplitter()
+    sentences = []
+    for token in REPLY.split(" "):
+        sentences += splitter.feed(token + " ")
+    sentences += splitter.flush()
+    assert sentences == tts.split_sentences(REPLY)
+
+def test_speech_key_ignores_case_and_spacing_but_not_voice():
+    key = tts.speech_key("Hello  there", "en", "iHR AI", "stub")
+    assert key == tts.speech_key("hello there", "en", "iHR AI", "stub")
+    assert key != tts.speech_key("hello there", "en:co.uk", "iHR AI", "stub")
+    assert key != tts.speech_key("hello there", "en", "Other AI", "stub")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["disk", "redis"])
+async def test_synthesize_renders_each_utterance_once(tmp_path, backend):
+    speech = synthesizer(tmp_path, backend)
+    try:
+        first, second = await asyncio.gather(speech.synthesize("Welcome to your interview."), speech.synthesize("welcome to your  interview."))
+        assert first == second
+        assert speech.rendered == 1
+
+        # A fresh process (empty memory tier) still finds it in the backend
+        fresh = tts.SpeechSynthesizer(engine="stub", voice="en", cache=tts.SpeechCache(backend=backend, directory=str(tmp_path)))
+        assert await fresh.synthesize("Welcome to your interview.") == first
+        assert fresh.rendered == 0
+        fresh.shutdown()
+    finally:
+        speech.shutdown()
+
+@pytest.mark.asyncio
+async def test_disk_cache_trims_oldest_entries(tmp_path):
+    cache = tts.SpeechCache(backend="disk", directory=str(tmp_path), max_bytes=250, memory_bytes=0)
+    for index in range(5):
+        await cache.set(f"tts:{index:064x}", bytes(100))
+    assert cache.stats()["disk_bytes"] <= 225
+    assert await cache.get(f"tts:{4:064x}") == bytes(100)
+    assert await cache.get(f"tts:{0:064x}") is None
+
+@pytest.mark.asyncio
+async def test_speech_stream_speaks_deltas_in_sentence_order(tmp_path):
+    speech = synthesizer(tmp_path)
+    frames = []
+
+    async def send(frame):
+        frames.append(frame)
+
+    async def send_bytes(audio):
+        frames.append(audio)
+
+    stream = tts.SpeechStream(send, send_bytes, speech, persona="iHR AI")
+    for token in REPLY.split(" "):
+        stream.relay({"type": "delta", "role": "AI", "content": token + " "})
+    stream.relay({"type": "final", "role": "AI", "content": REPLY})
+    for _ in range(100):
+        if len(frames) == 6:
+            break
+        await asyncio.sleep(0.01)
+    stream.close()
+    speech.shutdown()
+
+    headers, audio = frames[0::2], frames[1::2]
+    assert [header["sentence"] for header in headers] == [0, 1, 2]
+    assert [chunk.endswith(sentence.encode()) for chunk, sentence in zip(audio, tts.split_sentences(REPLY))] == [True] * 3
+
+@pytest.mark.asyncio
+async def test_a_caller_leaving_does_not_cancel_the_shared_render(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts.config, "TTS_STUB_SECONDS_PER_CHAR", 0.002)
+    speech = synthesizer(tmp_path)
+    try:
+        # The first caller starts the render, the second joins it, then the first leaves
+        leaving = asyncio.create_task(speech.synthesize("Tell me about your last project."))
+        while not speech.stats()["inflight"]:
+            await asyncio.sleep(0.001)
+        staying = asyncio.create_task(speech.synthesize("Tell me about your last project."))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        assert (await staying).endswith(b"Tell me about your last project.")
+        assert leaving.cancelled()
+        assert speech.rendered == 1
+        assert speech.stats()["inflight"] == 0
+    finally:
+        speech.shutdown()
+
+@pytest.mark.asyncio
+async def test_speech_stream_skips_a_cancelled_sentence():
+    class Synthesizer:
+        audio_format = "application/octet-stream"
+
+        async def synthesize(self, text, voice=None, persona=""):
+            if text.startswith("Cancelled"):
+                raise asyncio.CancelledError()
+            return text.encode()
+
+    frames = []
+
+    async def send(frame):
+        frames.append(frame)
+
+    async def send_bytes(audio):
+        frames.append(audio)
+
+    stream = tts.SpeechStream(send, send_bytes, Synthesizer())
+    stream.relay({"type": "final", "role": "AI", "content": "Cancelled before it was spoken. Still spoken afterwards."})
+    for _ in range(100):
+        if frames:
+            break
+        await asyncio.sleep(0.01)
+    assert not stream._sender.done()
+    stream.close()
+    assert frames[0]["sentence"] == 1
+    assert frames[1] == b"Still spoken afterwards."
+
+
+@pytest.mark.asyncio
+async def test_speech_stream_drops_a_reply_cut_off_by_an_error():
+    class Synthesizer:
+        audio_format = "application/octet-stream"
+
+        async def synthesize(self, text, voice=None, persona=""):
+            return text.encode()
+
+    frames = []
+
+    async def send(frame):
+        frames.append(frame)
+
+    async def send_bytes(audio):
+        frames.append(audio)
+
+    stream = tts.SpeechStream(send, send_bytes, Synthesizer())
+    for token in ["This reply never ", "gets to its end"]:
+        stream.relay({"type": "delta", "role": "AI", "content": token})
+    stream.relay({"error": "Could not get a reply, please send your answer again"})
+    # Nothing streamed for the new reply, so its final frame is spoken whole
+    stream.relay({"type": "final", "role": "AI", "content": "A fresh reply."})
+    for _ in range(100):
+        if frames:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+    stream.close()
+    assert frames[1::2] == [b"A fresh reply."]
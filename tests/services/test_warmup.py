@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from config import config
+from services import hr_manager, warmup
+
+def test_importing_main_leaves_heavy_libraries_unloaded():
+    code = (
+        "import sys, main; "
+        "print(','.join(m for m in ('langchain_openai', 'gtts', 'speech_recognition', 'nltk') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+def test_lazy_names_resolve_on_access_and_stay_patchable():
+    from langchain_core.messages import SystemMessage
+    assert hr_manager.SystemMessage is SystemMessage
+    with patch("services.hr_manager.gTTS") as MockGTTS:
+        MockGTTS.return_value.write_to_fp.side_effect = lambda buffer: buffer.write(b"mp3")
+        assert hr_manager.HRManager.convert_text_to_audio("Hello") == b"mp3"
+    assert hr_manager.gTTS is not MockGTTS
+    with pytest.raises(AttributeError):
+        hr_manager.NotALibrary
+
+@pytest.mark.asyncio
+async def test_warm_up_records_each_step(monkeypatch):
+    monkeypatch.setattr(config, "LLM_PROVIDER", "fake")
+    monkeypatch.setattr(config, "TTS_ENGINE", "stub")
+    status = await warmup.warm_up(timeout=30)
+    assert status["ready"] is True
+    assert list(status["steps"]) == ["llm", "speech"]
+    assert all("error" not in step for step in status["steps"].values())
+
+@pytest.mark.asyncio
+async def test_failed_step_does_not_block_startup(monkeypatch):
+    def broken():
+        raise RuntimeError("no network")
+    monkeypatch.setattr(warmup, "steps", lambda: [("llm", broken), ("speech", warmup.load_speech)])
+    status = await warmup.warm_up(timeout=30)
+    assert status["ready"] is True
+    assert status["steps"]["llm"]["error"] == "no network"
+    assert "error" not in status["steps"]["speech"]
@@ -1,4 +1,6 @@
 import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils import crud, schemas
 
@@ -42,4 +44,97 @@ async def test_create_industry(async_db_session: AsyncSession):
     industry = schemas.IndustryCreate(name="Tech", description="Technology industry")
     db_industry = await crud.create_industry(async_db_session, industry)
     assert db_industry.name == "Tech"
-    assert db_industry.description == "Technology industry"
\ No newline at end of file
+    assert db_industry.description == "Technology industry"
+
+@pytest.mark.asyncio
+async def test_update_industry_returns_updated_row(async_db_session: AsyncSession):
+    industry = await crud.create_industry(async_db_session, schemas.IndustryCreate(name="Finance"))
+    updated = await crud.update_industry(async_db_session, industry.id, schemas.IndustryUpdate(description="Banking"))
+    assert updated.id == industry.id
+    assert updated.name == "Finance"
+    assert updated.description == "Banking"
+
+@pytest.mark.asyncio
+async def test_update_missing_row_returns_none(async_db_session: AsyncSession):
+    assert await crud.update_job(async_db_session, 987654, schemas.JobUpdate(title="Nobody")) is None
+
+@pytest.mark.asyncio
+async def test_delete_statement(async_db_session: AsyncSession):
+    statement = schemas.StatementCreate(interview_id=1, speaker="AI", content="Tell me about yourself.", is_question=True)
+    db_statement = await crud.create_statement(async_db_session, statement)
+    assert await crud.delete_statement(async_db_session, db_statement.id) is True
+    assert await crud.delete_statement(async_db_session, db_statement.id) is False
+
+@pytest.mark.asyncio
+async def test_create_statements_bulk_links_replies(async_db_session: AsyncSession):
+    statements = [
+        schemas.StatementBulkCreate(interview_id=1, speaker="AI", content="Why this role?", is_question=True),
+        schemas.StatementBulkCreate(interview_id=1, speaker="USER", content="I like Python.", is_question=False, replies_index=0),
+    ]
+    ids = await crud.create_statements_bulk(async_db_session, statements)
+    assert len(ids) == 2
+    answer = await crud.get_statement_by_id(async_db_session, ids[1])
+    assert answer.replies_id == ids[0]
+
+@pytest.mark.asyncio
+async def test_get_jobs_as_rows_matches_response_model(async_db_session: AsyncSession):
+    industry = await crud.create_industry(async_db_session, schemas.IndustryCreate(name="Rows Tech"))
+    job = await crud.create_job(async_db_session, schemas.JobCreate(title="Rows Developer", level=2, industry_id=industry.id), commit=False)
+    await async_db_session.commit()
+
+    rows = await crud.get_jobs(async_db_session, search="Rows Developer", as_rows=True)
+    assert [dict(row) for row in rows] == [schemas.JobDetails.model_validate(job).model_dump()]
+
+@pytest.mark.asyncio
+async def test_statements_keyset_pages_cover_all_rows_once(async_db_session: AsyncSession):
+    same_time = datetime(2024, 12, 1, 10, 0, 0)
+    statements = [
+        schemas.StatementBulkCreate(interview_id=1, speaker="AI", content=f"Keyset {index}", is_question=True, timestamp=same_time + timedelta(seconds=index // 2))
+        for index in range(5)
+    ]
+    ids = await crud.create_statements_bulk(async_db_session, statements)
+
+    seen, after = [], None
+    while True:
+        page, after = await crud.get_statements_page(async_db_session, after, limit=2)
+        seen += [statement.id for statement in page if statement.id in ids]
+        if after is None:
+            break
+    assert seen == ids
+
+@pytest.mark.asyncio
+async def test_search_jobs_ranks_title_matches_first(async_db_session: AsyncSession):
+    industry = await crud.create_industry(async_db_session, schemas.IndustryCreate(name="Search Tech"))
+    for title, requirements in [("Data Analyst", "Kotlinsearch, SQL"), ("Kotlinsearch Developer", "Android"), ("Go Engineer", None)]:
+        await crud.create_job(async_db_session, schemas.JobCreate(title=title, requirements=requirements, level=3, industry_id=industry.id), commit=False)
+    await async_db_session.commit()
+
+    jobs = await crud.get_jobs(async_db_session, search="kotlinsearch")
+    assert [job.title for job in jobs] == ["Kotlinsearch Developer", "Data Analyst"]
+    assert await crud.get_jobs(async_db_session, search='" OR *') == []
+
+@pytest.mark.asyncio
+async def test_get_interview_context_loads_everything_in_two_queries(async_db_session: AsyncSession):
+    industry = await crud.create_industry(async_db_session, schemas.IndustryCreate(name="Context Tech"))
+    job = await crud.create_job(async_db_session, schemas.JobCreate(title="Context Developer", level=2, industry_id=industry.id), commit=False)
+    user = await crud.create_user(async_db_session, schemas.UserCreate(username="context-user", email="context@example.com", password="password"))
+    interview = await crud.create_interview(async_db_session, schemas.InterviewCreate(user_id=user.id, job_id=job.id, difficulty="Beginner", start_time="2024-12-01T10:53:24"))
+    await crud.create_statements_bulk(async_db_session, [
+        schemas.StatementBulkCreate(interview_id=interview.id, speaker="USER", content="Second", is_question=False, timestamp=datetime(2024, 12, 1, 11, 0)),
+        schemas.StatementBulkCreate(interview_id=interview.id, speaker="AI", content="First", is_question=True, timestamp=datetime(2024, 12, 1, 10, 55)),
+    ])
+    async_db_session.expunge_all()
+
+    statements = []
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = async_db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        loaded = await crud.get_interview_context(async_db_session, interview.id)
+        context = (loaded.user.username, loaded.job.title, [statement.content for statement in loaded.statements])
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    assert context == ("context-user", "Context Developer", ["First", "Second"])
+    assert len(statements) == 2
@@ -1,4 +1,7 @@
-from utils.helpers import hash_password, verify_password
+import pytest
+from datetime import datetime, timedelta
+from utils import schemas
+from utils.helpers import PayloadTooLarge, decode_cursor, encode_cursor, hash_password, iter_json_records, rows_response, verify_password
 
 def test_hash_password():
     password = "password"
@@ -9,4 +12,77 @@ def test_verify_password():
     password = "password"
     hashed_password = hash_password(password)
     assert verify_password(password, hashed_password) is True
-    assert verify_password("wrongpassword", hashed_password) is False
\ No newline at end of file
+    assert verify_password("wrongpassword", hashed_password) is False
+
+async def _chunked(data: bytes, size: int = 5):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+@pytest.mark.asyncio
+async def test_iter_json_records_ndjson():
+    records = [record async for record in iter_json_records(_chunked(b'{"a": 1}\n{"a": 2}\n'))]
+    assert records == [{"a": 1}, {"a": 2}]
+
+@pytest.mark.asyncio
+async def test_iter_json_records_array():
+    records = [record async for record in iter_json_records(_chunked(b'[{"a": 1}, {"a": 2}]'))]
+    assert records == [{"a": 1}, {"a": 2}]
+
+@pytest.mark.asyncio
+async def test_iter_json_records_stops_reading_past_max_bytes():
+    received = []
+    async def body():
+        async for chunk in _chunked(b'[{"a": 1}, {"a": 2}, {"a": 3}]'):
+            received.append(chunk)
+            yield chunk
+    with pytest.raises(PayloadTooLarge):
+        [record async for record in iter_json_records(body(), max_bytes=12)]
+    assert len(received) == 3
+
+@pytest.mark.asyncio
+async def test_iter_json_records_streams_arrays_record_by_record():
+    received = []
+    async def body():
+        for chunk in [b' [{"a": "x,]}\\"', b'"}, {"b": [1, {"c": 2}]}', b', {"d": {}}', b"]\n"]:
+            received.append(chunk)
+            yield chunk
+
+    records = []
+    async for record in iter_json_records(body()):
+        records.append((record, len(received)))
+    # Each record is decoded once its closing brace arrives, before the rest of the body
+    assert records == [({"a": 'x,]}"'}, 2), ({"b": [1, {"c": 2}]}, 3), ({"d": {}}, 4)]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b'[{"a": 1},]', b'[{"a": 1}', b'[{"a": 1}] {}', b'[}'])
+async def test_iter_json_records_rejects_malformed_arrays(body):
+    with pytest.raises(ValueError):
+        [record async for record in iter_json_records(_chunked(body, 3))]
+
+def test_rows_response_encodes_like_the_response_model():
+    row = {
+        "hr_ai": "iHR AI", "status": "Scheduled", "id": 1, "user_id": 1, "job_id": 1,
+        "difficulty": "Beginner", "duration": timedelta(minutes=30), "start_time": datetime(2024, 12, 1, 10, 53, 24),
+        "end_time": None, "current_score": 0, "insights": {"strengths": [], "weaknesses": []},
+    }
+    response = rows_response([row])
+    assert response.media_type == "application/json"
+    assert response.body == b"[" + schemas.InterviewResponse(**row).model_dump_json().encode() + b"]"
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([datetime(2024, 12, 1, 10, 53, 24), 42])
+    assert decode_cursor(cursor, datetime.fromisoformat, int) == [datetime(2024, 12, 1, 10, 53, 24), 42]
+    assert decode_cursor("", int) is None
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", int)
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([1, 2]), int)
+
+@pytest.mark.parametrize("key", [[None], [{}], [[1]]])
+def test_decode_cursor_rejects_values_of_the_wrong_type(key):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(key), int)
+
+def test_decode_cursor_rejects_a_number_for_a_timestamp():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([1733050404, 42]), datetime.fromisoformat, int)
@@ -0,0 +1,70 @@
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from utils import models
+
+# The access paths the app relies on, and the index each one must use
+ACCESS_PATHS = [
+    (
+        "interview conversation",
+        select(models.Statement).where(models.Statement.interview_id == 1).order_by(models.Statement.timestamp, models.Statement.id),
+        "ix_statements_interview_id_timestamp",
+    ),
+    (
+        "statements keyset page",
+        select(models.Statement)
+        .where(tuple_(models.Statement.timestamp, models.Statement.id) > tuple_(datetime(2024, 12, 1), 10))
+        .order_by(models.Statement.timestamp, models.Statement.id)
+        .limit(10),
+        "ix_statements_timestamp_id",
+    ),
+    (
+        "user interview history",
+        select(models.Interview).where(models.Interview.user_id == 1).order_by(models.Interview.start_time.desc()),
+        "ix_interviews_user_id_start_time",
+    ),
+    ("interviews by job", select(models.Interview).where(models.Interview.job_id == 1), "ix_interviews_job_id"),
+    ("interviews by status", select(models.Interview).where(models.Interview.status == "Completed"), "ix_interviews_status"),
+    ("jobs by industry", select(models.Job).where(models.Job.industry_id == 1), "ix_jobs_industry_id"),
+]
+
+
+async def explain(db: AsyncSession, stmt) -> str:
+    conn = await db.connection()
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup) if compiled.positional else compiled.params
+    if conn.dialect.name == "sqlite":
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+        return "\n".join(row[-1] for row in result)
+    # Tables in a test database are tiny; make the planner show whether an
+    # index can serve the query rather than what is cheapest right now
+    await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    result = await conn.exec_driver_sql(f"EXPLAIN {compiled}", params)
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name, stmt, index", ACCESS_PATHS, ids=[path[0] for path in ACCESS_PATHS])
+async def test_sqlite_plan_uses_index(async_db_session: AsyncSession, name, stmt, index):
+    plan = await explain(async_db_session, stmt)
+    assert index in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("POSTGRES_TEST_URL"), reason="POSTGRES_TEST_URL not set")
+@pytest.mark.parametrize("name, stmt, index", ACCESS_PATHS, ids=[path[0] for path in ACCESS_PATHS])
+async def test_postgres_plan_uses_index(name, stmt, index):
+    engine = create_async_engine(os.environ["POSTGRES_TEST_URL"])
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            plan = await explain(db, stmt)
+        assert index in plan, plan
+    finally:
+        await engine.dispose()
@@ -1,50 +1,161 @@
+from datetime import datetime
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy.future import select
+from sqlalchemy import delete, insert, literal, select, tuple_, update
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import config
+from services import job_search
+from services.logger import logger
 from utils.helpers import hash_password
 import utils.models as models
 import utils.schemas as schemas
-from utils.dependencies import async_db_session_dependency
+
+
+# --- SHARED WRITE HELPERS ---
+async def _finish_write(db: AsyncSession, commit: bool):
+    """
+    Commit, or just flush when the caller is batching several writes into
+    one transaction and will commit itself.
+    """
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+
+
+async def _insert(db: AsyncSession, instance, commit: bool = True):
+    """
+    Insert a new row. The primary key comes back on the INSERT itself and
+    expire_on_commit is off, so no follow-up refresh is needed.
+    """
+    try:
+        db.add(instance)
+        await _finish_write(db, commit)
+        return instance
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+
+
+async def _update_returning(db: AsyncSession, model, row_id, values: dict, commit: bool = True):
+    """
+    Apply `values` to one row with a single UPDATE ... RETURNING.
+    Returns the updated instance, or None when the row does not exist.
+    """
+    if not values:
+        result = await db.execute(select(model).where(model.id == row_id))
+        return result.scalars().first()
+
+    stmt = (
+        update(model)
+        .where(model.id == row_id)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    try:
+        result = await db.execute(stmt)
+        instance = result.scalars().first()
+        await _finish_write(db, commit)
+        return instance
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+
+
+async def _delete_returning(db: AsyncSession, model, row_id, commit: bool = True) -> bool:
+    """
+    Delete one row with a single DELETE ... RETURNING.
+    Returns True when a row was removed.
+    """
+    stmt = delete(model).where(model.id == row_id).returning(model.id)
+    try:
+        result = await db.execute(stmt.execution_options(synchronize_session=False))
+        deleted = result.scalar_one_or_none() is not None
+        await _finish_write(db, commit)
+        return deleted
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+
+
+def _row_columns(model, schema) -> list:
+    """
+    The model's columns for each field of a response schema, so selected
+    rows can be serialized straight into that schema's shape.
+    """
+    return [getattr(model, field) for field in schema.model_fields]
+
+
+async def _keyset_page(db: AsyncSession, stmt, keys: list, after: Optional[list], limit: int, as_rows: bool = False):
+    """
+    One page of `stmt` ordered by the `keys` columns, starting after the
+    key values `after`. Seeks through the index on the keys instead of
+    skipping rows, so every page costs the same. Returns the page and the
+    key of its last row, or None if there are no more rows.
+    """
+    if after is not None:
+        stmt = stmt.where(tuple_(*keys) > tuple_(*[literal(value, key.type) for key, value in zip(keys, after)]))
+    stmt = stmt.order_by(*keys).limit(limit + 1)
+    result = await db.execute(stmt)
+    items = result.mappings().all() if as_rows else result.scalars().all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, [last[key.key] if as_rows else getattr(last, key.key) for key in keys]
+
+
+def _changes(update_schema) -> dict:
+    """
+    Fields the client actually sent on a PATCH, ignoring nulls.
+    """
+    return {
+        field: value.value if hasattr(value, "value") else value
+        for field, value in update_schema.model_dump(exclude_unset=True, exclude_none=True).items()
+    }
 
 
 # --- CRUD FOR aUSERS ---
-def create_user(db: Session, user: schemas.UserCreate):
+async def create_user(db: AsyncSession, user: schemas.UserCreate, commit: bool = True, hashed_password: Optional[str] = None):
+    """
+    Create a user. Async callers should hash the password off the event
+    loop (services.password_hasher) and pass it as `hashed_password`;
+    otherwise it is hashed here, blocking.
+    """
     try:
-        hashed_password = hash_password(user.password)
+        hashed_password = hashed_password or hash_password(user.password, rounds=config.BCRYPT_ROUNDS)
         db_user = models.User(username=user.username, email=user.email, password=hashed_password)
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        return await _insert(db, db_user, commit)
     except Exception as e:
         print("Error-: ", e)
         return None
-    return db_user
 
-def get_users(db: Session) -> list[models.User]:
+async def get_users(db: AsyncSession) -> list[models.User]:
     """
     Retrieve all users from the database.
     :param db: SQLAlchemy database session
     :return: List of User objects
     """
-    try: 
-        db_users = db.query(models.User).all() 
+    try:
+        result = await db.execute(select(models.User))
+        db_users = result.scalars().all()
     except Exception as e:
         print("Error: ", e)
         return None
     return db_users
 
-def get_user(db: Session, user_id: int) -> models.User:
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    return db_user
+async def get_user(db: AsyncSession, user_id: int) -> models.User:
+    result = await db.execute(select(models.User).where(models.User.id == user_id))
+    return result.scalars().first()
 
 
 
 
 # --- CRUD FOR JOBS ---
-async def create_job(db: AsyncSession, job: schemas.JobCreate) -> models.Job:
+async def create_job(db: AsyncSession, job: schemas.JobCreate, commit: bool = True) -> models.Job:
     """
     Create a new job in the database.
     """
@@ -55,41 +166,64 @@ async def create_job(db: AsyncSession, job: schemas.JobCreate) -> models.Job:
         level=job.level,
         industry_id=job.industry_id
     )
-    try: 
-        db.add(new_job)
-        await db.commit()
-        await db.refresh(new_job)  
-        return new_job
+    try:
+        new_job = await _insert(db, new_job, commit)
     except SQLAlchemyError as e:
-        await db.rollback()  # Rollback the transaction in case of an error
         print(f"Error during job creation: {str(e)}")
         raise
+    return new_job
 
 
 async def get_jobs(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 10,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    as_rows: bool = False
 ) -> List[models.Job]:
     """
     Get a list of jobs with optional filters for pagination and search.
+    Search covers title, description and requirements through the search
+    index, best matches first. With `as_rows`, returns plain row mappings
+    shaped like JobDetails instead of ORM instances.
     """
-    stmt = select(models.Job)  # Start with a select statement for the Job model
-    
+    if as_rows:
+        stmt = select(*_row_columns(models.Job, schemas.JobDetails))
+    else:
+        stmt = select(models.Job)  # Start with a select statement for the Job model
+
     if search:
-        stmt = stmt.where(models.Job.title.ilike(f"%{search}%"))  # Add search filter
-    
+        stmt = job_search.apply_search(stmt, db.get_bind().dialect.name, search)  # Add ranked search filter
+
     stmt = stmt.offset(skip).limit(limit)  # Add pagination
 
     # Execute the query
     result = await db.execute(stmt)
 
     # Fetch all results
+    if as_rows:
+        return result.mappings().all()
     jobs = result.scalars().all()
 
     return jobs
 
+async def get_jobs_page(
+    db: AsyncSession,
+    after: Optional[list] = None,
+    limit: int = 10,
+    search: Optional[str] = None,
+    as_rows: bool = False
+):
+    """
+    Get a page of jobs ordered by id, after the cursor key `after`.
+    Search results are filtered through the search index but keep id order,
+    since ranks cannot be resumed from a cursor.
+    """
+    stmt = select(*_row_columns(models.Job, schemas.JobDetails)) if as_rows else select(models.Job)
+    if search:
+        stmt = job_search.apply_search(stmt, db.get_bind().dialect.name, search, ranked=False)
+    return await _keyset_page(db, stmt, [models.Job.id], after, limit, as_rows)
+
 async def get_job_by_id(db: AsyncSession, job_id: int) -> Optional[models.Job]:
     """
     Get a single job by ID.
@@ -102,99 +236,117 @@ async def get_job_by_id(db: AsyncSession, job_id: int) -> Optional[models.Job]:
 async def update_job(
     db: AsyncSession,
     job_id: int,
-    job_update: schemas.JobUpdate
+    job_update: schemas.JobUpdate,
+    commit: bool = True
 ) -> Optional[models.Job]:
     """
     Update a job's details by its ID.
     """
-    stmt = select(models.Job).where(models.Job.id == job_id)
-    result = await db.execute(stmt)
-    job = result.scalars().first()
-
-    if not job:
-        return None
-
-    # Update fields if provided
-    if job_update.title:
-        job.title = job_update.title
-    if job_update.description:
-        job.description = job_update.description
-    if job_update.requirements:
-        job.requirements = job_update.requirements
-    if job_update.level:
-        job.level = job_update.level
-    if job_update.industry_id:
-        job.industry_id = job_update.industry_id
+    return await _update_returning(db, models.Job, job_id, _changes(job_update), commit)
 
-    try:
-        await db.commit()
-        await db.refresh(job)  # Refresh the job instance
-    except Exception as e:
-        await db.rollback()
-        raise e
-
-    return job
-
-async def delete_job(db: AsyncSession, job_id: int) -> bool:
+async def delete_job(db: AsyncSession, job_id: int, commit: bool = True) -> bool:
     """
     Delete a job by its ID.
     """
-    stmt = select(models.Job).where(models.Job.id == job_id)
-    result = await db.execute(stmt)
-    job = result.scalars().first()
-
-    if not job:
-        return False
-
-    try:
-        await db.delete(job)
-        await db.commit()
-        return True
-    except Exception as e:
-        await db.rollback()
-        raise e
+    return await _delete_returning(db, models.Job, job_id, commit)
 
 
 # --- CRUD FOR INTERVIEWS ---
-def create_interview(db: async_db_session_dependency, interview: schemas.InterviewCreate) -> models.Interview:
+async def create_interview(db: AsyncSession, interview: schemas.InterviewCreate, commit: bool = True) -> models.Interview:
     db_interview = models.Interview(
         user_id=interview.user_id,
         job_id=interview.job_id,
         difficulty=interview.difficulty.value if isinstance(interview.difficulty, schemas.InterviewDifficulty) else interview.difficulty,
+        status=interview.status.value if isinstance(interview.status, schemas.InterviewStatus) else interview.status,
         duration=interview.duration,
         start_time=interview.start_time,
     )
-    db.add(db_interview)
-    db.commit()
-    db.refresh(db_interview)
-    return db_interview
+    return await _insert(db, db_interview, commit)
+
 
+async def get_interviews(db: AsyncSession, skip: int = 0, limit: int = 10, as_rows: bool = False) -> List[models.Interview]:
+    if as_rows:
+        result = await db.execute(select(*_row_columns(models.Interview, schemas.InterviewResponse)).offset(skip).limit(limit))
+        return result.mappings().all()
+    result = await db.execute(select(models.Interview).offset(skip).limit(limit))
+    return result.scalars().all()
 
-def get_interviews(db: async_db_session_dependency, skip: int = 0, limit: int = 10):
-    return db.query(models.Interview).offset(skip).limit(limit).all()
+
+async def get_interviews_page(db: AsyncSession, after: Optional[list] = None, limit: int = 10, as_rows: bool = False):
+    stmt = select(*_row_columns(models.Interview, schemas.InterviewResponse)) if as_rows else select(models.Interview)
+    return await _keyset_page(db, stmt, [models.Interview.id], after, limit, as_rows)
+
+
+async def get_interview_by_id(db: AsyncSession, interview_id: int, for_update: bool = False) -> Optional[models.Interview]:
+    """
+    With `for_update` the row stays locked until the transaction ends.
+    """
+    stmt = select(models.Interview).where(models.Interview.id == interview_id)
+    if for_update:
+        stmt = stmt.with_for_update()
+    result = await db.execute(stmt)
+    return result.scalars().first()
 
 
-def get_interview_by_id(db: async_db_session_dependency, interview_id: str) -> models.Interview:
-    return db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+async def get_interview_ids_by_status(db: AsyncSession, status: str, limit: int = 100) -> List[int]:
+    """
+    Ids of the most recently started interviews in `status`.
+    """
+    result = await db.execute(
+        select(models.Interview.id)
+        .where(models.Interview.status == status)
+        .order_by(models.Interview.start_time.desc(), models.Interview.id.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
 
 
-def update_interview(db: async_db_session_dependency, interview_id: str, interview_update: schemas.InterviewUpdate) -> models.Interview:
-    db_interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
-    if db_interview:
-        for var, value in vars(interview_update).items():
-            setattr(db_interview, var, value) if value is not None else None
-        db.commit()
-        db.refresh(db_interview)
+async def get_interview_context(db: AsyncSession, interview_id: int) -> Optional[models.Interview]:
+    """
+    An interview with its user, job and statements (in conversation order)
+    loaded up front: one joined query for the interview, user and job, one
+    more for the statements. Nothing is left to lazy load.
+    """
+    stmt = (
+        select(models.Interview)
+        .where(models.Interview.id == interview_id)
+        .options(
+            joinedload(models.Interview.user),
+            joinedload(models.Interview.job),
+            selectinload(models.Interview.statements),
+        )
+    )
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+async def update_interview(
+    db: AsyncSession,
+    interview_id: int,
+    interview_update: schemas.InterviewUpdate,
+    commit: bool = True,
+    answer_score: Optional[schemas.AnswerScoreCreate] = None,
+) -> Optional[models.Interview]:
+    """
+    Patch an interview, storing `answer_score` (the scored answer behind a
+    new score) in the same transaction.
+    """
+    changes = _changes(interview_update)
+    if answer_score is None:
+        return await _update_returning(db, models.Interview, interview_id, changes, commit)
+    try:
+        db_interview = await _update_returning(db, models.Interview, interview_id, changes, commit=False)
+        if db_interview:
+            db.add(models.AnswerScore(**answer_score.model_dump()))
+        await _finish_write(db, commit)
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
     return db_interview
 
 
-def delete_interview(db: async_db_session_dependency, interview_id: str):
-    db_interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
-    if db_interview:
-        db.delete(db_interview)
-        db.commit()
-        return True
-    return False
+async def delete_interview(db: AsyncSession, interview_id: int, commit: bool = True) -> bool:
+    return await _delete_returning(db, models.Interview, interview_id, commit)
 
 
 
@@ -202,71 +354,137 @@ def delete_interview(db: async_db_session_dependency, interview_id: str):
 
 
 # --- CRUD FOR STATEMENTS ---
-def create_statement(db: async_db_session_dependency, statement: schemas.StatementCreate):
+async def create_statement(db: AsyncSession, statement: schemas.StatementCreate, commit: bool = True):
     db_statement = models.Statement(
         interview_id=statement.interview_id,
         speaker=statement.speaker,
         content=statement.content,
         replies_id=statement.replies_id,
         is_question=statement.is_question,
-        timestamp=statement.timestamp
+        timestamp=statement.timestamp or datetime.now()
     )
-    db.add(db_statement)
-    db.commit()
-    db.refresh(db_statement)
+    try:
+        await _insert(db, db_statement, commit)
+    except SQLAlchemyError as e:
+        print(f"Error during statement creation: {str(e)}")
+        raise
     return db_statement
 
-async def async_create_statement(db: AsyncSession, statement: schemas.StatementCreate):
-    print("\nIn crud.py: \n", statement)
-    db_statement = models.Statement(
-        interview_id=statement.interview_id,
-        speaker=statement.speaker,
-        content=statement.content,
-        replies_id=statement.replies_id,
-        is_question=statement.is_question,
-        timestamp=statement.timestamp
-    )
-    try:   
-        db.add(db_statement)  # Use add() without an explicit argument, as instance is provided here
-        await db.commit()  # Commit the transaction
-        await db.refresh(db_statement)  # Refresh to get updated data
-        return db_statement
+# Older name used by the WebSocket flow
+async_create_statement = create_statement
+
+
+async def create_statements_bulk(
+    db: AsyncSession,
+    statements: List[schemas.StatementBulkCreate],
+    commit: bool = True
+) -> List[int]:
+    """
+    Insert a batch of statements with one multi-row INSERT ... RETURNING and
+    return their ids in input order. `replies_index` links between rows of the
+    same batch are resolved afterwards with a single executemany UPDATE.
+    """
+    if not statements:
+        return []
+
+    now = datetime.now()
+    rows = [
+        {
+            "interview_id": statement.interview_id,
+            "speaker": statement.speaker,
+            "content": statement.content,
+            "replies_id": statement.replies_id,
+            "is_question": statement.is_question,
+            "timestamp": statement.timestamp or now,
+        }
+        for statement in statements
+    ]
+    try:
+        result = await db.execute(
+            insert(models.Statement).returning(models.Statement.id, sort_by_parameter_order=True),
+            rows,
+        )
+        ids = list(result.scalars().all())
+
+        links = [
+            {"id": ids[position], "replies_id": ids[statement.replies_index]}
+            for position, statement in enumerate(statements)
+            if statement.replies_index is not None
+        ]
+        if links:
+            await db.execute(update(models.Statement), links)
+
+        await _finish_write(db, commit)
     except SQLAlchemyError as e:
-        await db.rollback()  # Rollback the transaction in case of an error
-        print(f"Error during statement creation: {str(e)}")
+        await db.rollback()
+        logger.error(f"Error during bulk statement creation: {e}")
         raise
 
+    return ids
 
-def get_statements(db: async_db_session_dependency, skip: int = 0, limit: int = 10):
-    return db.query(models.Statement).offset(skip).limit(limit).all()
 
+async def get_statements(db: AsyncSession, skip: int = 0, limit: int = 10, as_rows: bool = False) -> List[models.Statement]:
+    if as_rows:
+        result = await db.execute(select(*_row_columns(models.Statement, schemas.StatementResponse)).offset(skip).limit(limit))
+        return result.mappings().all()
+    result = await db.execute(select(models.Statement).offset(skip).limit(limit))
+    return result.scalars().all()
 
-def get_statement_by_id(db: async_db_session_dependency, statement_id: str):
-    return db.query(models.Statement).filter(models.Statement.id == statement_id).first()
 
+async def get_statements_page(db: AsyncSession, after: Optional[list] = None, limit: int = 10, as_rows: bool = False):
+    """
+    A page of statements in (timestamp, id) order, after the cursor key `after`.
+    """
+    stmt = select(*_row_columns(models.Statement, schemas.StatementResponse)) if as_rows else select(models.Statement)
+    return await _keyset_page(db, stmt, [models.Statement.timestamp, models.Statement.id], after, limit, as_rows)
 
-def update_statement(db: async_db_session_dependency, statement_id: str, statement_update: schemas.StatementUpdate):
-    db_statement = db.query(models.Statement).filter(models.Statement.id == statement_id).first()
-    if db_statement:
-        for var, value in vars(statement_update).items():
-            setattr(db_statement, var, value) if value is not None else None
-        db.commit()
-        db.refresh(db_statement)
-    return db_statement
+
+async def get_interview_statements(db: AsyncSession, interview_id: int) -> List[models.Statement]:
+    """
+    All statements of one interview in conversation order.
+    """
+    stmt = (
+        select(models.Statement)
+        .where(models.Statement.interview_id == interview_id)
+        .order_by(models.Statement.timestamp, models.Statement.id)
+    )
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def get_statement_by_id(db: AsyncSession, statement_id: int) -> Optional[models.Statement]:
+    result = await db.execute(select(models.Statement).where(models.Statement.id == statement_id))
+    return result.scalars().first()
 
 
-def delete_statement(db: async_db_session_dependency, statement_id: str):
-    db_statement = db.query(models.Statement).filter(models.Statement.id == statement_id).first()
-    if db_statement:
-        db.delete(db_statement)
-        db.commit()
-        return True
-    return False
+async def update_statement(db: AsyncSession, statement_id: int, statement_update: schemas.StatementUpdate, commit: bool = True) -> Optional[models.Statement]:
+    return await _update_returning(db, models.Statement, statement_id, _changes(statement_update), commit)
+
+
+async def delete_statement(db: AsyncSession, statement_id: int, commit: bool = True) -> bool:
+    return await delete_statement_returning(db, statement_id, commit) is not None
+
+
+async def delete_statement_returning(db: AsyncSession, statement_id: int, commit: bool = True) -> Optional[int]:
+    """
+    Delete a statement and return the id of its interview, or None if
+    there was no such statement.
+    """
+    stmt = delete(models.Statement).where(models.Statement.id == statement_id).returning(models.Statement.interview_id)
+    try:
+        result = await db.execute(stmt.execution_options(synchronize_session=False))
+        interview_id = result.scalar_one_or_none()
+        await _finish_write(db, commit)
+    except SQLAlchemyError:
+        await db.rollback()
+        raise
+
+    return interview_id
 
 
 
 # --- CRUD FOR INDUSTRIES ---
-def create_industry(db: async_db_session_dependency, industry: schemas.IndustryCreate):
+async def create_industry(db: AsyncSession, industry: schemas.IndustryCreate, commit: bool = True):
     """
     Create a new industry entry.
     """
@@ -274,46 +492,41 @@ def create_industry(db: async_db_session_dependency, industry: schemas.IndustryC
         name=industry.name,
         description=industry.description
     )
-    db.add(db_industry)
-    db.commit()
-    db.refresh(db_industry)
-    return db_industry
+    return await _insert(db, db_industry, commit)
 
 
-def get_industries(db: async_db_session_dependency, skip: int = 0, limit: int = 10):
+async def get_industries(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[models.Industry]:
     """
     Fetch a list of industries with pagination.
     """
-    return db.query(models.Industry).offset(skip).limit(limit).all()
+    result = await db.execute(select(models.Industry).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def get_industries_page(db: AsyncSession, after: Optional[list] = None, limit: int = 10):
+    """
+    Fetch a page of industries ordered by id, after the cursor key `after`.
+    """
+    return await _keyset_page(db, select(models.Industry), [models.Industry.id], after, limit)
 
 
-def get_industry_by_id(db: async_db_session_dependency, industry_id: int):
+async def get_industry_by_id(db: AsyncSession, industry_id: int) -> Optional[models.Industry]:
     """
     Fetch a single industry by ID.
     """
-    return db.query(models.Industry).filter(models.Industry.id == industry_id).first()
+    result = await db.execute(select(models.Industry).where(models.Industry.id == industry_id))
+    return result.scalars().first()
 
 
-def update_industry(db: async_db_session_dependency, industry_id: int, industry_update: schemas.IndustryUpdate):
+async def update_industry(db: AsyncSession, industry_id: int, industry_update: schemas.IndustryUpdate, commit: bool = True) -> Optional[models.Industry]:
     """
     Update an industry's details by its ID.
     """
-    db_industry = db.query(models.Industry).filter(models.Industry.id == industry_id).first()
-    if db_industry:
-        for var, value in vars(industry_update).items():
-            setattr(db_industry, var, value) if value is not None else None
-        db.commit()
-        db.refresh(db_industry)
-    return db_industry  
+    return await _update_returning(db, models.Industry, industry_id, _changes(industry_update), commit)
 
 
-def delete_industry(db: async_db_session_dependency, industry_id: int):
+async def delete_industry(db: AsyncSession, industry_id: int, commit: bool = True) -> bool:
     """
     Delete an industry by its ID.
     """
-    db_industry = db.query(models.Industry).filter(models.Industry.id == industry_id).first()
-    if db_industry:
-        db.delete(db_industry)
-        db.commit()
-        return True
-    return False
+    return await _delete_returning(db, models.Industry, industry_id, commit)
@@ -1,14 +1,12 @@
 from typing import Annotated
 from fastapi import Depends
-from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from services.database import database
+from services.database import get_async_db_session
 
 
 
-db_session_dependency = Annotated[Session, Depends(database)]
-async_db_session_dependency = Annotated[AsyncSession, Depends(database)]
+async_db_session_dependency = Annotated[AsyncSession, Depends(get_async_db_session)]
 
 
 
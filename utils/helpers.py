@@ -1,8 +1,23 @@
+import base64
+import re
+from typing import AsyncIterator, Callable, Optional
+
 import bcrypt
+import orjson
+from fastapi import Response
+from pydantic_core import to_jsonable_python
+
+def hash_password(password: str, rounds: int = 12) -> str:
+    """
+    Hashes a password with bcrypt. Blocking; async code should go through
+    services.password_hasher instead.
 
-def hash_password(password: str) -> str:
+    :param password: The plaintext password.
+    :param rounds: The bcrypt work factor (log2 of the iteration count).
+    :return: The bcrypt hash.
+    """
     password_bytes = password.encode("utf-8")
-    hashed_password = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
+    hashed_password = bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=rounds))
     return hashed_password.decode("utf-8")
 
 
@@ -20,3 +35,194 @@ def verify_password(plaintext_password: str, hashed_password: str) -> bool:
     hashed_password_bytes = hashed_password.encode("utf-8")
     # Compare the passwords
     return bcrypt.checkpw(password_bytes, hashed_password_bytes)
+
+
+class PayloadTooLarge(Exception):
+    """
+    Raised by iter_json_records when a body exceeds its byte limit.
+    """
+
+
+# Skips over everything up to the next structural character, whole strings
+# included; stops at a string's opening quote while its end is yet to arrive
+_ARRAY_TOKEN = re.compile(rb'(?:[^"\[\]{},]+|"[^"\\]*(?:\\.[^"\\]*)*")*([\[\]{},"]?)', re.DOTALL)
+
+
+class _ArrayReader:
+    """
+    Splits a JSON array arriving in chunks into the raw bytes of its
+    elements, so each is decoded as soon as it is complete and only the
+    current element is buffered.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.pos = 0
+        self.depth = 0
+        self.start = 0
+        self.count = 0
+        self.closed = False
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        buffer = self.buffer
+        buffer += chunk
+        elements = []
+        pos = self.pos
+        while not self.closed:
+            match = _ARRAY_TOKEN.match(buffer, pos)
+            token = match.group(1)
+            if token in (b"", b'"'):
+                # Out of data, or the rest of a string is in a later chunk
+                pos = match.start(1)
+                break
+            pos = match.end()
+            if token in (b"[", b"{"):
+                self.depth += 1
+                if self.depth == 1:
+                    if token != b"[":
+                        raise ValueError("Expected a JSON array")
+                    self.start = pos
+            elif self.depth == 1 and token in (b",", b"]"):
+                element = bytes(buffer[self.start:match.start()]).strip()
+                # Empty elements ("[1,,2]", "[1,]") are left for orjson to reject
+                if element or token == b"," or self.count:
+                    elements.append(element)
+                    self.count += 1
+                self.start = pos
+                if token == b"]":
+                    self.depth = 0
+                    self.closed = True
+            elif token in (b"]", b"}") and self.depth > 1:
+                self.depth -= 1
+            elif token == b"," and self.depth > 1:
+                continue
+            else:
+                raise ValueError(f"Unexpected {token.decode()} in JSON array")
+
+        # Keep only the element still arriving
+        keep = pos if self.closed else min(self.start, pos)
+        del buffer[:keep]
+        self.pos = pos - keep
+        self.start -= min(self.start, keep)
+        return elements
+
+    def finish(self):
+        if not self.closed:
+            raise ValueError("Unterminated JSON array")
+        if bytes(self.buffer[self.pos:]).strip():
+            raise ValueError("Unexpected data after JSON array")
+
+
+async def iter_json_records(chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None) -> AsyncIterator[dict]:
+    """
+    Yield JSON objects from a streamed request body, either newline-delimited
+    JSON or a JSON array. Both are decoded record by record as chunks
+    arrive, so only the record being received is buffered.
+
+    :param chunks: The raw body, e.g. `request.stream()`.
+    :param max_bytes: Raise PayloadTooLarge as soon as more than this many
+                      bytes have been received.
+    :return: An async iterator of decoded records.
+    :raises ValueError: If the body is not valid JSON of either form.
+    """
+    buffer = bytearray()
+    received = 0
+    array = None
+    is_array = None
+    async for chunk in chunks:
+        received += len(chunk)
+        if max_bytes is not None and received > max_bytes:
+            raise PayloadTooLarge(f"Request body exceeds {max_bytes} bytes")
+        if array is not None:
+            for element in array.feed(chunk):
+                yield orjson.loads(element)
+            continue
+        buffer += chunk
+        if is_array is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            is_array = stripped.startswith(b"[")
+            if is_array:
+                array = _ArrayReader()
+                for element in array.feed(bytes(buffer)):
+                    yield orjson.loads(element)
+                continue
+        end = buffer.rfind(b"\n")
+        if end < 0:
+            continue
+        lines = bytes(buffer[:end]).split(b"\n")
+        del buffer[:end + 1]
+        for line in lines:
+            if line.strip():
+                yield orjson.loads(line)
+
+    if array is not None:
+        array.finish()
+    elif buffer.strip():
+        yield orjson.loads(buffer)
+
+
+def rows_response(rows) -> Response:
+    """
+    Serialize selected rows straight to a JSON response with orjson,
+    skipping ORM instances and response model validation. The rows must
+    already have the response schema's shape; types orjson does not know
+    (e.g. timedelta) are encoded the way pydantic would.
+
+    :param rows: Row mappings, e.g. from `result.mappings().all()`.
+    :return: A JSON response.
+    """
+    content = orjson.dumps([dict(row) for row in rows], default=to_jsonable_python)
+    return Response(content=content, media_type="application/json")
+
+
+def encode_cursor(key: list) -> str:
+    """
+    Opaque pagination cursor for the sort key of the last row on a page.
+
+    :param key: The sort key values, e.g. `[timestamp, id]`.
+    :return: A URL-safe cursor string.
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable) -> Optional[list]:
+    """
+    Decode a cursor made by `encode_cursor`, converting each key value with
+    the matching type (e.g. `datetime.fromisoformat`). An empty cursor
+    means the first page and decodes to None.
+
+    :param cursor: The cursor from the client.
+    :param types: One converter per sort key column.
+    :return: The sort key values, or None for the first page.
+    :raises ValueError: If the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        key = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(key, list) or len(key) != len(types):
+        raise ValueError("Invalid cursor")
+    try:
+        return [convert(value) for convert, value in zip(types, key)]
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def page_response(rows, next_key: Optional[list]) -> Response:
+    """
+    Cursor page counterpart of `rows_response`: the rows under `items`
+    plus the cursor of the next page, null on the last page.
+
+    :param rows: Row mappings shaped like the response schema.
+    :param next_key: Sort key of the last row, if there are more rows.
+    :return: A JSON response.
+    """
+    page = {
+        "items": [dict(row) for row in rows],
+        "next_cursor": encode_cursor(next_key) if next_key is not None else None,
+    }
+    return Response(content=orjson.dumps(page, default=to_jsonable_python), media_type="application/json")
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, Integer, ForeignKey, DateTime, Interval, Enum, Boolean, Text
+    Column, String, Integer, Float, ForeignKey, Date, DateTime, Interval, Enum, Boolean, Text, Index, UniqueConstraint, DDL, event
 )
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import relationship
@@ -74,10 +74,47 @@ class Job(Base):
     description = Column(Text, nullable=True)
     requirements = Column(Text, nullable=True)
     level = Column(Integer, nullable=False )   # Enum(JobRoleLevels), nullable=False)
-    industry_id = Column(Integer, ForeignKey("industries.id"), nullable=False)
+    industry_id = Column(Integer, ForeignKey("industries.id"), nullable=False, index=True)
 
     industry = relationship("Industry", back_populates="jobs")
     interviews = relationship("Interview", back_populates="job")
+    bank_questions = relationship("BankQuestion", back_populates="job", cascade="all, delete-orphan", passive_deletes=True)
+
+# Job search indexes live outside the mapped columns since they are
+# dialect specific; the job_search migration creates the same objects.
+# Postgres: weighted tsvector (title > requirements > description) plus
+# a trigram index on titles. SQLite: an FTS5 table kept in sync by triggers.
+JOB_SEARCH_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "ALTER TABLE jobs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(requirements, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+        "CREATE INDEX ix_jobs_search_vector ON jobs USING gin (search_vector)",
+        "CREATE INDEX ix_jobs_title_trgm ON jobs USING gin (title gin_trgm_ops)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+        "title, description, requirements, content='jobs', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN "
+        "INSERT INTO jobs_fts(rowid, title, description, requirements) "
+        "VALUES (new.id, new.title, new.description, new.requirements); END",
+        "CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN "
+        "INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements) "
+        "VALUES ('delete', old.id, old.title, old.description, old.requirements); END",
+        "CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE ON jobs BEGIN "
+        "INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements) "
+        "VALUES ('delete', old.id, old.title, old.description, old.requirements); "
+        "INSERT INTO jobs_fts(rowid, title, description, requirements) "
+        "VALUES (new.id, new.title, new.description, new.requirements); END",
+    ],
+}
+
+for dialect, statements in JOB_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Job.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
+event.listen(Job.__table__, "before_drop", DDL("DROP TABLE IF EXISTS jobs_fts").execute_if(dialect="sqlite"))
 
 # --- Interview Model ---
 class Interview(Base):
@@ -97,7 +134,14 @@ class Interview(Base):
 
     user = relationship("User", back_populates="interviews")
     job = relationship("Job", back_populates="interviews")
-    statements = relationship("Statement", back_populates="interview")
+    statements = relationship("Statement", back_populates="interview", order_by="(Statement.timestamp, Statement.id)")
+
+    __table_args__ = (
+        # A user's interviews, newest or oldest first (dashboards, history)
+        Index("ix_interviews_user_id_start_time", "user_id", "start_time"),
+        Index("ix_interviews_job_id", "job_id"),
+        Index("ix_interviews_status", "status"),
+    )
 
 # ---- Statement Model ---
 class Statement(Base):
@@ -112,3 +156,78 @@ class Statement(Base):
 
     interview = relationship("Interview", back_populates="statements")
     replies = relationship("Statement", remote_side=[id])
+
+    __table_args__ = (
+        # One interview's conversation in order (context build)
+        Index("ix_statements_interview_id_timestamp", "interview_id", "timestamp", "id"),
+        # Keyset pagination over all statements
+        Index("ix_statements_timestamp_id", "timestamp", "id"),
+    )
+
+# --- Question Bank Model ---
+class BankQuestion(Base):
+    __tablename__ = "question_bank"
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    difficulty = Column(String, nullable=False)
+    question = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    job = relationship("Job", back_populates="bank_questions")
+
+    __table_args__ = (
+        Index("ix_question_bank_job_id_difficulty", "job_id", "difficulty"),
+    )
+
+
+# --- Answer Score Model ---
+# One row per scored answer, so interviews can be re-scored in bulk
+class AnswerScore(Base):
+    __tablename__ = "answer_scores"
+    id = Column(Integer, primary_key=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+    dimensions = Column(JSON, default=dict)  # e.g. {"communication": 7, "technical": 5}
+    strengths = Column(JSON, default=list)
+    weaknesses = Column(JSON, default=list)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_answer_scores_interview_id_id", "interview_id", "id"),
+    )
+
+
+# --- Progress Rollup Models ---
+# Per-user and per-industry score aggregates by day and week, kept up to date
+# as interviews are scored so the dashboard never scans interviews.
+class ProgressRollup(Base):
+    __tablename__ = "progress_rollups"
+    id = Column(Integer, primary_key=True)
+    scope = Column(String, nullable=False)  # "user" or "industry"
+    scope_id = Column(Integer, nullable=False)
+    period = Column(String, nullable=False)  # "day" or "week"
+    bucket_start = Column(Date, nullable=False)
+    scored_interviews = Column(Integer, nullable=False, default=0)
+    score_total = Column(Integer, nullable=False, default=0)
+    completed_interviews = Column(Integer, nullable=False, default=0)
+    completed_score_total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_id", "period", "bucket_start", name="uq_progress_rollups_bucket"),
+    )
+
+class ProgressTag(Base):
+    __tablename__ = "progress_rollup_tags"
+    id = Column(Integer, primary_key=True)
+    scope = Column(String, nullable=False)
+    scope_id = Column(Integer, nullable=False)
+    period = Column(String, nullable=False)
+    bucket_start = Column(Date, nullable=False)
+    kind = Column(String, nullable=False)  # "strengths" or "weaknesses"
+    tag = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_id", "period", "bucket_start", "kind", "tag", name="uq_progress_rollup_tags_bucket"),
+    )
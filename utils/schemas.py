@@ -1,8 +1,16 @@
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Generic, List, Optional, TypeVar
+from datetime import date, datetime, timedelta
 from pydantic import BaseModel, ConfigDict, Field
 import enum 
 
+# ---- PAGINATION SCHEMAS ---
+T = TypeVar("T")
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page; null on the last page.")
+
+
 # ---- AUTH SCHEMAS ---
 class AuthSignIn(BaseModel):
     email: str
@@ -63,11 +71,11 @@ class JobCreate(JobBase):
     industry_id: int = Field(..., description="The ID of the industry the job belongs to.")
 
 class JobUpdate(BaseModel):
-    title: Optional[str]
-    description: Optional[str]
-    requirements: Optional[str]
-    level: Optional[int]
-    industry_id: Optional[int]
+    title: Optional[str] = None
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    level: Optional[int] = None
+    industry_id: Optional[int] = None
 
 class JobDetails(JobBase):
     id: int
@@ -84,6 +92,19 @@ class StatementBase(BaseModel):
 class StatementCreate(StatementBase):
     interview_id: int
     replies_id: Optional[int] = None
+    timestamp: Optional[datetime] = None
+
+class StatementBulkCreate(StatementCreate):
+    replies_index: Optional[int] = Field(None, description="Position of an earlier statement in the same batch that this one replies to.")
+
+class StatementBulkResponse(BaseModel):
+    ids: List[int]
+
+class StatementUpdate(BaseModel):
+    speaker: Optional[str] = None
+    content: Optional[str] = None
+    is_question: Optional[bool] = None
+    replies_id: Optional[int] = None
 
 class StatementResponse(StatementBase):
     id: int
@@ -104,7 +125,7 @@ class InterviewStatus(enum.Enum):
 
 class InterviewBase(BaseModel):
     hr_ai: str = "iHR AI"
-    status: InterviewStatus
+    status: InterviewStatus = InterviewStatus.SCHEDULED
 
 class InterviewCreate(InterviewBase):
     user_id: int
@@ -126,12 +147,12 @@ class InterviewResponse(InterviewBase):
     model_config = ConfigDict(from_attributes=True)
 
 class InterviewUpdate(InterviewBase):
-    status: Optional[str]
-    difficulty: Optional[str]
-    duration: Optional[timedelta]
-    end_time: Optional[datetime]
-    current_score: Optional[int]
-    insights: Optional[dict]
+    status: Optional[str] = None
+    difficulty: Optional[str] = None
+    duration: Optional[timedelta] = None
+    end_time: Optional[datetime] = None
+    current_score: Optional[int] = None
+    insights: Optional[dict] = None
 
 class InterviewContext(InterviewBase):
     id: int
@@ -147,6 +168,13 @@ class InterviewContext(InterviewBase):
     insights: dict
     statements: List[StatementResponse]
 
+class AnswerScoreCreate(BaseModel):
+    interview_id: int
+    score: float
+    dimensions: Dict[str, float] = {}
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+
 # --- INDUSTRY SCHEMAS ---
 class IndustryBase(BaseModel):
     name: str
@@ -161,5 +189,25 @@ class IndustryResponse(IndustryBase):
     model_config = ConfigDict(from_attributes=True)
 
 class IndustryUpdate(BaseModel):
-    name: Optional[str]
-    description: Optional[str]
+    name: Optional[str] = None
+    description: Optional[str] = None
+
+# --- PROGRESS DASHBOARD SCHEMAS ---
+class ProgressPoint(BaseModel):
+    bucket_start: date
+    scored_interviews: int
+    average_score: Optional[float]
+    completed_interviews: int
+    average_completed_score: Optional[float]
+
+class ProgressTagCount(BaseModel):
+    tag: str
+    count: int
+
+class ProgressDashboard(BaseModel):
+    scope: str
+    scope_id: int
+    period: str
+    series: List[ProgressPoint]
+    strengths: List[ProgressTagCount]
+    weaknesses: List[ProgressTagCount]